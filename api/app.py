@@ -1,5 +1,7 @@
 """FastAPI application setup."""
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from config.settings import settings
@@ -7,14 +9,34 @@ from models.schemas import (
     TripRequest, WeatherRequest, AttractionRequest,
     HotelRequest, CurrencyRequest, NearbyPlacesRequest
 )
+from tools.exchange_rates import exchange_rates
+from utils import http
 from . import routes
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start shared resources (connection pools, planning workers) and stop them on shutdown.
+    
+    Graph compilation and LLM client setup run in the background, so the app
+    serves requests (and health checks) straight away.
+    """
+    await http.startup()
+    exchange_rates.warm()
+    await routes.planning_queue.start()
+    warmup = asyncio.create_task(asyncio.to_thread(routes.warm_up)) if settings.WARMUP_ON_STARTUP else None
+    yield
+    await routes.planning_queue.stop()
+    if warmup is not None:
+        await warmup
+    await http.shutdown()
+
 def create_app():
     """Create and configure FastAPI application."""
     app = FastAPI(
         title=settings.API_TITLE,
         description=settings.API_DESCRIPTION,
-        version=settings.API_VERSION
+        version=settings.API_VERSION,
+        lifespan=lifespan
     )
     
     # Add CORS middleware
@@ -29,13 +51,19 @@ def create_app():
     # Add routes
     app.get("/")(routes.root)
     app.post("/plan-trip")(routes.plan_trip)
+    app.post("/plan-trip/stream")(routes.plan_trip_stream)
+    app.post("/plan-trips/batch")(routes.plan_trips_batch)
     app.get("/trip/{trip_id}")(routes.get_trip)
+    app.get("/trip/{trip_id}/status")(routes.get_trip_status)
     app.get("/trip/{trip_id}/export")(routes.export_trip)
+    app.post("/trips/export")(routes.export_trips)
     app.post("/weather")(routes.get_weather)
     app.post("/attractions")(routes.get_attractions)
     app.post("/hotels")(routes.get_hotels)
     app.post("/currency")(routes.get_currency)
     app.post("/nearby-places")(routes.get_nearby)
     app.get("/health")(routes.health_check)
+    if settings.METRICS_ENABLED:
+        app.get("/metrics")(routes.metrics)
     
     return app
\ No newline at end of file
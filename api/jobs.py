@@ -0,0 +1,91 @@
+"""Background job queue for trip planning."""
+
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+
+class QueueFull(Exception):
+    """Raised when the planning queue has no room for another job."""
+
+class PlanningQueue:
+    """Bounded queue drained by a fixed pool of async workers.
+
+    ``max_concurrency`` workers run jobs, so at most that many plans are in
+    flight at once; ``max_depth`` caps how many jobs may wait behind them.
+    Job statuses are kept for the most recent ``status_retention`` jobs.
+    """
+
+    def __init__(self, handler, max_concurrency=4, max_depth=100, status_retention=10000):
+        self.handler = handler
+        self.max_concurrency = max_concurrency
+        self.max_depth = max_depth
+        self.status_retention = status_retention
+        self._queue = None
+        self._workers = []
+        self._jobs = OrderedDict()
+        self._running = 0
+
+    async def start(self):
+        """Start the worker pool (FastAPI startup hook)."""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_depth)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"planning-worker-{i}")
+            for i in range(self.max_concurrency)
+        ]
+
+    async def stop(self):
+        """Cancel the worker pool (FastAPI shutdown hook)."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def submit(self, job_id, payload):
+        """Enqueue a job, raising QueueFull when the queue is at its depth limit."""
+        if self._queue is None:
+            raise RuntimeError("Planning queue is not running")
+        try:
+            self._queue.put_nowait((job_id, payload))
+        except asyncio.QueueFull:
+            raise QueueFull("Planning queue is full")
+        self._record(job_id, status="queued", submitted_at=datetime.now().isoformat())
+
+    def status(self, job_id):
+        """Return the status record for a job, or None if it is unknown."""
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    def stats(self):
+        """Return queue depth and worker utilisation."""
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": self._running,
+            "max_concurrency": self.max_concurrency,
+            "max_depth": self.max_depth
+        }
+
+    def _record(self, job_id, **fields):
+        """Update a job's status record, evicting the oldest records past retention."""
+        job = self._jobs.setdefault(job_id, {"trip_id": job_id})
+        job.update(fields)
+        self._jobs.move_to_end(job_id)
+        while len(self._jobs) > self.status_retention:
+            self._jobs.popitem(last=False)
+
+    async def _worker(self):
+        """Run queued jobs one at a time until cancelled."""
+        while True:
+            job_id, payload = await self._queue.get()
+            self._running += 1
+            self._record(job_id, status="running", started_at=datetime.now().isoformat())
+            try:
+                result = await self.handler(job_id, payload)
+                self._record(job_id, status="completed", finished_at=datetime.now().isoformat(), result=result)
+            except Exception as e:
+                self._record(job_id, status="failed", finished_at=datetime.now().isoformat(), error=str(e))
+            finally:
+                self._running -= 1
+                self._queue.task_done()
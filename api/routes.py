@@ -1,25 +1,106 @@
 """API routes for the travel planner."""
 
+import asyncio
 import json
+import time
 import uuid
 from datetime import datetime
 from fastapi import HTTPException
-from fastapi.responses import FileResponse, JSONResponse
-from langchain_core.messages import HumanMessage
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 
 from models.schemas import (
-    TripRequest, WeatherRequest, AttractionRequest, 
-    HotelRequest, CurrencyRequest, NearbyPlacesRequest
+    TripRequest, BatchTripRequest, WeatherRequest, AttractionRequest, 
+    HotelRequest, CurrencyRequest, NearbyPlacesRequest, BulkExportRequest
 )
-from tools.weather import get_weather_info
-from tools.attractions import get_top_attractions, get_nearby_places
-from tools.hotels import get_hotel_recommendations
-from tools.currency import convert_currency
-from utils.export import export_to_excel
-from graph.workflow import app_graph
+import tools
+from tools.gazetteer import get_gazetteer
+from utils.singleflight import tool_flights
+from utils.metrics import registry, export_duration, timed_iter
+from utils.export import (
+    ExportCache, XLSX_MEDIA_TYPE, export_to_excel_bytes, iter_chunks,
+    iter_workbook_zip, iter_csv_zip, iter_consolidated_workbook
+)
+from graph.memo import ToolCallMemo
+from llm.config import shared_llm
+from llm.priority import llm_priority, TOOLS, BACKGROUND
+from config.settings import settings
+from storage.trip_store import create_trip_store, trip_version
+from .jobs import PlanningQueue, QueueFull
+
+# LangChain, LangGraph and the tools are imported on first use (see
+# _graph_for and the tool endpoints) so the API process starts quickly
+
+def _graph_for(name: str):
+    """Compiled workflow by name, loading LangGraph on first use."""
+    from graph.workflow import get_graph
+    return get_graph(name)
+
+# Progress of the startup warm-up, reported by /health
+warmup_status = {"status": "pending"}
+
+def warm_up():
+    """Compile the graphs, build the LLM client, load the gazetteer and openpyxl ahead of the first request.
+    
+    Runs in a worker thread from the app lifespan, so health checks are
+    answered while it is still in progress.
+    """
+    started = time.perf_counter()
+    try:
+        for name in ("agentic", "fast"):
+            _graph_for(name)
+        shared_llm()
+        get_gazetteer()
+        import openpyxl  # noqa: F401
+        warmup_status.update(status="ready", seconds=round(time.perf_counter() - started, 3))
+    except Exception as e:
+        warmup_status.update(status="failed", error=str(e))
 
 # Storage for trip plans
-trip_plans = {}
+trip_store = create_trip_store()
+
+# Finished Excel exports, keyed by trip id and record version
+export_cache = ExportCache(max_bytes=settings.EXPORT_CACHE_MAX_BYTES)
+
+def _export_cache_families():
+    return [("trip_planner_export_cache_lookups_total", "counter", "Workbook export cache lookups by result", [
+        ({"result": "hit"}, export_cache.hits),
+        ({"result": "miss"}, export_cache.misses)
+    ])]
+
+registry.register_collector(_export_cache_families)
+
+def _node_updates(update):
+    """State updates in one node's output; a node returning Commands yields a list."""
+    if isinstance(update, list):
+        return [u for u in update if u]
+    return [update] if update else []
+
+def _merge_output(final_state, output):
+    """Fold one streamed graph update into the accumulated state."""
+    if final_state is None:
+        final_state = {}
+    for update in output.values():
+        for part in _node_updates(update):
+            final_state.update(part)
+    return final_state
+
+def _run_graph_sync(graph, initial_state, config):
+    """Drive the graph with the blocking stream API."""
+    final_state = None
+    for output in graph.stream(initial_state, config):
+        final_state = _merge_output(final_state, output)
+    return final_state
+
+async def run_graph(graph, initial_state, config):
+    """Run a trip planner graph without blocking the event loop."""
+    if settings.GRAPH_EXECUTION_MODE == "sync":
+        return await run_in_threadpool(_run_graph_sync, graph, initial_state, config)
+    
+    final_state = None
+    async for output in graph.astream(initial_state, config):
+        final_state = _merge_output(final_state, output)
+    return final_state
 
 async def root():
     """Root endpoint with API information."""
@@ -28,19 +109,22 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "POST /plan-trip": "Create a complete trip plan",
+            "POST /plan-trip/stream": "Create a trip plan, streaming progress as Server-Sent Events",
+            "POST /plan-trips/batch": "Plan many trips together, sharing identical tool calls",
             "GET /trip/{trip_id}": "Get trip plan details",
+            "GET /trip/{trip_id}/status": "Get the status of a background planning job",
             "GET /trip/{trip_id}/export": "Export trip plan to Excel",
+            "POST /trips/export": "Export many trip plans as one ZIP or workbook",
             "POST /weather": "Get weather information",
             "POST /attractions": "Get top attractions",
             "POST /hotels": "Get hotel recommendations",
-            "POST /currency": "Get currency conversion"
+            "POST /currency": "Get currency conversion",
+            "GET /metrics": "Prometheus-style latency, LLM token and cache metrics"
         }
     }
 
-async def plan_trip(request: TripRequest):
-    """Create a complete trip plan."""
-    trip_id = str(uuid.uuid4())
-    
+def build_initial_state(request: TripRequest):
+    """Build the graph's initial state from a trip request."""
     initial_message = f"""I need help planning a trip:
 From: {request.from_city} → To: {request.to_city}
 Arrival: {request.arrival_date} at {request.arrival_time}
@@ -48,8 +132,9 @@ Duration: {request.num_days} days
 Travelers: {request.num_adults} adults, {request.num_kids} children
 
 Get weather forecast, top attractions, hotels, currency conversion, and nearby places."""
+    from langchain_core.messages import HumanMessage
     
-    initial_state = {
+    return {
         "messages": [HumanMessage(content=initial_message)],
         "from_city": request.from_city,
         "to_city": request.to_city,
@@ -59,40 +144,226 @@ Get weather forecast, top attractions, hotels, currency conversion, and nearby p
         "num_adults": request.num_adults,
         "num_kids": request.num_kids
     }
-    
+
+def trip_summary(request: TripRequest):
+    """Short summary of a trip request for API responses."""
+    return {
+        "from": request.from_city,
+        "to": request.to_city,
+        "duration": f"{request.num_days} days",
+        "travelers": f"{request.num_adults} adults, {request.num_kids} kids"
+    }
+
+async def execute_plan(trip_id: str, request: TripRequest, tool_memo: ToolCallMemo = None):
+    """Run the selected workflow for a request and store the resulting plan."""
+    initial_state = build_initial_state(request)
     config = {"configurable": {"thread_id": trip_id}}
+    if tool_memo is not None:
+        config["configurable"]["tool_memo"] = tool_memo
     
-    try:
-        final_state = None
-        for output in app_graph.stream(initial_state, config):
-            node_name = list(output.keys())[0]
-            if final_state is None:
-                final_state = output[node_name]
-            else:
-                final_state.update(output[node_name])
-        
-        # Store trip plan
-        trip_plans[trip_id] = final_state
-        
-        return {
+    started = time.perf_counter()
+    final_state = await run_graph(_graph_for(request.workflow), initial_state, config)
+    elapsed = time.perf_counter() - started
+    
+    # Store trip plan (node updates do not repeat the request fields)
+    await run_in_threadpool(trip_store.put, trip_id, {**initial_state, **final_state})
+    
+    return {
+        "trip_id": trip_id,
+        "status": "completed",
+        "workflow": request.workflow,
+        "elapsed_seconds": round(elapsed, 3),
+        "itinerary_prompt_tokens": final_state.get("itinerary_prompt_tokens"),
+        "summary": trip_summary(request)
+    }
+
+async def execute_queued_plan(trip_id: str, request: TripRequest):
+    """Run a queued plan; its LLM calls yield to interactive requests."""
+    with llm_priority(BACKGROUND):
+        return await execute_plan(trip_id, request)
+
+# Bounded worker pool for background planning jobs
+planning_queue = PlanningQueue(
+    handler=execute_queued_plan,
+    max_concurrency=settings.PLAN_QUEUE_MAX_CONCURRENCY,
+    max_depth=settings.PLAN_QUEUE_MAX_DEPTH,
+    status_retention=settings.PLAN_QUEUE_STATUS_RETENTION
+)
+
+async def plan_trip(request: TripRequest, background: bool = False):
+    """Create a complete trip plan.
+    
+    With ``?background=true`` the plan is queued and a 202 response with the
+    trip id is returned immediately; poll ``GET /trip/{trip_id}/status``.
+    """
+    trip_id = str(uuid.uuid4())
+    
+    if background:
+        try:
+            planning_queue.submit(trip_id, request)
+        except QueueFull as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(settings.PLAN_QUEUE_RETRY_AFTER)})
+        return JSONResponse(status_code=202, content={
             "trip_id": trip_id,
-            "status": "completed",
-            "summary": {
-                "from": request.from_city,
-                "to": request.to_city,
-                "duration": f"{request.num_days} days",
-                "travelers": f"{request.num_adults} adults, {request.num_kids} kids"
-            }
-        }
+            "status": "queued",
+            "status_url": f"/trip/{trip_id}/status",
+            "summary": trip_summary(request)
+        })
+    
+    try:
+        return await execute_plan(trip_id, request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def plan_trips_batch(request: BatchTripRequest):
+    """Plan a batch of trips, computing each distinct tool input only once.
+    
+    Trips run concurrently (up to BATCH_MAX_CONCURRENCY at a time) and share
+    one tool memo, so a group going to the same city fetches its weather,
+    attractions, nearby places and currency rate once for the whole batch.
+    """
+    if len(request.trips) > settings.BATCH_MAX_TRIPS:
+        raise HTTPException(status_code=413, detail=f"A batch may contain at most {settings.BATCH_MAX_TRIPS} trips")
+    
+    tool_memo = ToolCallMemo()
+    semaphore = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY)
+    
+    async def plan_one(trip: TripRequest):
+        trip_id = str(uuid.uuid4())
+        async with semaphore:
+            try:
+                return await execute_plan(trip_id, trip, tool_memo=tool_memo)
+            except Exception as e:
+                return {"trip_id": trip_id, "status": "failed", "error": str(e), "summary": trip_summary(trip)}
+    
+    started = time.perf_counter()
+    results = await asyncio.gather(*(plan_one(trip) for trip in request.trips))
+    elapsed = time.perf_counter() - started
+    
+    completed = sum(1 for result in results if result["status"] == "completed")
+    if completed == len(results):
+        status = "completed"
+    else:
+        status = "partial" if completed else "failed"
+    return {
+        "status": status,
+        "completed": completed,
+        "failed": len(results) - completed,
+        "elapsed_seconds": round(elapsed, 3),
+        "tool_calls": tool_memo.stats(),
+        "trips": results
+    }
+
+async def get_trip_status(trip_id: str):
+    """Get the status of a trip planning job."""
+    job = planning_queue.status(trip_id)
+    if job is not None:
+        job.pop("result", None)
+        return job
+    if await run_in_threadpool(trip_store.__contains__, trip_id):
+        return {"trip_id": trip_id, "status": "completed"}
+    raise HTTPException(status_code=404, detail="Trip plan not found")
+
+# SSE event names for tool results and final state fields
+TOOL_EVENTS = {
+    "get_weather_info": "weather",
+    "get_top_attractions": "attractions",
+    "get_hotel_recommendations": "hotels",
+    "convert_currency": "currency",
+    "get_nearby_places": "nearby_places"
+}
+STATE_EVENTS = {
+    "itinerary": "itinerary",
+    "expenses_data": "expenses"
+}
+
+def _sse(event: str, data) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def _update_events(node_name: str, update):
+    """Yield SSE events describing one node's state update."""
+    from langchain_core.messages import ToolMessage
+    
+    yield _sse("node", {"node": node_name})
+    for part in _node_updates(update):
+        results = part.get("tool_results") or {}
+        for msg in part.get("messages", []):
+            if isinstance(msg, ToolMessage) and msg.name in TOOL_EVENTS:
+                data = results.get(msg.name)
+                if data is None:
+                    try:
+                        data = json.loads(msg.content)
+                    except ValueError:
+                        data = msg.content
+                yield _sse(TOOL_EVENTS[msg.name], data)
+            elif isinstance(msg, ToolMessage) and msg.name == "get_destination_profile":
+                # One event per section, as if the single-section tools had run
+                try:
+                    data = json.loads(msg.content)
+                except ValueError:
+                    data = {"error": msg.content}
+                if "error" in data:
+                    yield _sse("destination_profile", data)
+                    continue
+                for section, items in data.items():
+                    yield _sse(section, items)
+        
+        for key, event in STATE_EVENTS.items():
+            if key in part:
+                yield _sse(event, part[key])
+
+async def plan_trip_stream(request: TripRequest):
+    """Plan a trip and stream progress as Server-Sent Events.
+    
+    Emits a ``node`` event as each graph node completes, one event per tool
+    result (``weather``, ``hotels``, ...), ``token`` events while the itinerary
+    is generated, and a final ``done`` event carrying the trip id.
+    """
+    trip_id = str(uuid.uuid4())
+    initial_state = build_initial_state(request)
+    config = {"configurable": {"thread_id": trip_id}}
+    graph = _graph_for(request.workflow)
+    
+    async def events():
+        yield _sse("start", {"trip_id": trip_id, "workflow": request.workflow})
+        started = time.perf_counter()
+        final_state = None
+        try:
+            async for mode, chunk in graph.astream(initial_state, config, stream_mode=["updates", "messages"]):
+                if mode == "messages":
+                    message, metadata = chunk
+                    if metadata.get("langgraph_node") == "create_itinerary" and message.content:
+                        yield _sse("token", {"content": message.content})
+                    continue
+                
+                final_state = _merge_output(final_state, chunk)
+                for node_name, update in chunk.items():
+                    for event in _update_events(node_name, update):
+                        yield event
+            
+            await run_in_threadpool(trip_store.put, trip_id, {**initial_state, **final_state})
+            yield _sse("done", {
+                "trip_id": trip_id,
+                "status": "completed",
+                "elapsed_seconds": round(time.perf_counter() - started, 3),
+                "summary": trip_summary(request)
+            })
+        except Exception as e:
+            yield _sse("error", {"trip_id": trip_id, "detail": str(e)})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 async def get_trip(trip_id: str):
     """Get complete trip plan details."""
-    if trip_id not in trip_plans:
+    state = await run_in_threadpool(trip_store.get, trip_id)
+    if state is None:
         raise HTTPException(status_code=404, detail="Trip plan not found")
     
-    state = trip_plans[trip_id]
     return {
         "trip_id": trip_id,
         "trip_details": {
@@ -112,52 +383,115 @@ async def get_trip(trip_id: str):
 
 async def export_trip(trip_id: str):
     """Export trip plan to Excel file."""
-    if trip_id not in trip_plans:
+    state = await run_in_threadpool(trip_store.get, trip_id)
+    if state is None:
         raise HTTPException(status_code=404, detail="Trip plan not found")
     
-    state = trip_plans[trip_id]
     filename = f"trip_plan_{trip_id}.xlsx"
     
     try:
-        export_to_excel(state, filename)
-        return FileResponse(
-            filename,
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            filename=filename
+        content = await run_in_threadpool(export_cache.get_or_build, trip_id, trip_version(state), state)
+        return StreamingResponse(
+            iter_chunks(content),
+            media_type=XLSX_MEDIA_TYPE,
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                "Content-Length": str(len(content))
+            }
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _iter_trips(trip_ids):
+    """Load stored trips one at a time, skipping any that have expired meanwhile."""
+    for trip_id in trip_ids:
+        record = trip_store.get(trip_id)
+        if record is not None:
+            yield trip_id, record
+
+def _any_stored(trip_ids):
+    return any(trip_id in trip_store for trip_id in trip_ids)
+
+def _cached_workbook(trip_id, record):
+    """Workbook bytes for a trip, reusing the export cache without filling it."""
+    content = export_cache.get(trip_id, trip_version(record))
+    return content if content is not None else export_to_excel_bytes(record)
+
+async def export_trips(request: BulkExportRequest):
+    """Export many trip plans in a single streaming response."""
+    if request.trip_ids:
+        trip_ids = list(dict.fromkeys(request.trip_ids))[:request.limit]
+        if not await run_in_threadpool(_any_stored, trip_ids):
+            trip_ids = []
+    else:
+        since = request.since.timestamp() if request.since else None
+        trip_ids = await run_in_threadpool(
+            trip_store.find, request.from_city, request.to_city, since, request.limit
+        )
+    if not trip_ids:
+        raise HTTPException(status_code=404, detail="No trip plans match the request")
+
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if request.format == "xlsx":
+        body = iter_consolidated_workbook(lambda: _iter_trips(trip_ids))
+        media_type, filename = XLSX_MEDIA_TYPE, f"trip_plans_{stamp}.xlsx"
+    elif request.format == "csv":
+        body = iter_csv_zip(lambda: _iter_trips(trip_ids))
+        media_type, filename = "application/zip", f"trip_plans_{stamp}_csv.zip"
+    else:
+        body = iter_workbook_zip(_iter_trips(trip_ids), _cached_workbook)
+        media_type, filename = "application/zip", f"trip_plans_{stamp}.zip"
+
+    if settings.METRICS_ENABLED:
+        body = timed_iter(export_duration, body, f"bulk_{request.format}")
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 async def get_weather(request: WeatherRequest):
     """Get weather information for a city."""
-    result = get_weather_info.invoke({"city": request.city, "date": request.date})
+    result = await tools.get_weather_info.ainvoke({"city": request.city, "date": request.date})
     return JSONResponse(content=json.loads(result))
 
 async def get_attractions(request: AttractionRequest):
     """Get top attractions for a city."""
-    result = get_top_attractions.invoke({"city": request.city, "num_days": request.num_days})
+    with llm_priority(TOOLS):
+        result = await tools.get_top_attractions.ainvoke({"city": request.city, "num_days": request.num_days})
     return JSONResponse(content=json.loads(result))
 
 async def get_hotels(request: HotelRequest):
     """Get hotel recommendations."""
-    result = get_hotel_recommendations.invoke({
-        "city": request.city,
-        "num_adults": request.num_adults,
-        "num_kids": request.num_kids,
-        "num_days": request.num_days
-    })
+    with llm_priority(TOOLS):
+        result = await tools.get_hotel_recommendations.ainvoke({
+            "city": request.city,
+            "num_adults": request.num_adults,
+            "num_kids": request.num_kids,
+            "num_days": request.num_days
+        })
     return JSONResponse(content=json.loads(result))
 
 async def get_currency(request: CurrencyRequest):
     """Get currency conversion information."""
-    result = convert_currency.invoke({"from_city": request.from_city, "to_city": request.to_city})
+    result = await tools.convert_currency.ainvoke({"from_city": request.from_city, "to_city": request.to_city})
     return JSONResponse(content=json.loads(result))
 
 async def get_nearby(request: NearbyPlacesRequest):
     """Get nearby places to visit."""
-    result = get_nearby_places.invoke({"city": request.city})
+    with llm_priority(TOOLS):
+        result = await tools.get_nearby_places.ainvoke({"city": request.city})
     return JSONResponse(content=json.loads(result))
 
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
\ No newline at end of file
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "warmup": dict(warmup_status),
+        "tool_calls": tool_flights.stats()
+    }
+
+async def metrics():
+    """Prometheus text-format metrics."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,271 @@
+"""Deterministic stand-in chat model for offline benchmarks.
+
+It answers the prompts the planner actually sends: the agent turn gets one
+tool call per data-gathering tool, the attractions, hotels and nearby places
+prompts get JSON item lists (all three at once for a destination profile),
+and anything else gets a day-by-day itinerary. The same prompt always
+produces the same reply, so runs are comparable.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+CATEGORIES = ["Museum", "Park", "Monument", "Market", "Gallery", "Viewpoint"]
+TRANSPORTS = ["Train", "Bus", "Car", "Ferry"]
+
+# Replies given per prompt kind, across every FakeChatModel in the process
+llm_calls = Counter()
+
+# Picks the slow replies; seeded so the latency tail is the same every run
+_tail = random.Random(0)
+
+# Burst the fake provider's rate limit allows, in seconds of its rate
+PROVIDER_BURST_SECONDS = 10
+
+class FakeRateLimitError(Exception):
+    """What the fake provider raises for a request over its rate limit."""
+    status_code = 429
+
+class _ProviderBudget:
+    """Requests-per-minute budget shared by every FakeChatModel, like a provider account."""
+
+    def __init__(self):
+        self._level = None
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def admit(self, per_minute: float) -> bool:
+        rate = per_minute / 60
+        capacity = rate * PROVIDER_BURST_SECONDS
+        now = time.monotonic()
+        with self._lock:
+            level = capacity if self._level is None else min(capacity, self._level + (now - self._updated) * rate)
+            self._updated = now
+            admitted = level >= 1
+            self._level = level - 1 if admitted else level
+        return admitted
+
+_provider = _ProviderBudget()
+
+def _seed(*parts):
+    """Stable integer derived from the given values."""
+    return int(hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:8], 16)
+
+def _match(pattern, text, default=None):
+    """First capture group of ``pattern`` in ``text``, or ``default``."""
+    found = re.search(pattern, text)
+    return found.group(1).strip() if found else default
+
+def _content(message):
+    """Message text as a plain string."""
+    return message.content if isinstance(message.content, str) else json.dumps(message.content)
+
+def attractions_reply(city, count):
+    """Attractions JSON for a city."""
+    return json.dumps([{
+        "name": f"{city} {CATEGORIES[(_seed(city, i)) % len(CATEGORIES)]} {i + 1}",
+        "description": f"A well-known spot in {city} worth a visit.",
+        "category": CATEGORIES[_seed(city, i) % len(CATEGORIES)],
+        "ticket_price": _seed(city, i, "price") % 40,
+        "currency": "USD",
+        "duration": f"{1 + _seed(city, i, 'time') % 4} hours",
+        "rating": round(3.5 + (_seed(city, i, "rating") % 15) / 10, 1)
+    } for i in range(count)])
+
+def hotels_reply(city, num_days):
+    """Hotel recommendations JSON for a city."""
+    hotels = []
+    for i in range(5):
+        price = 60 + _seed(city, i, "hotel") % 240
+        hotels.append({
+            "name": f"{city} Hotel {i + 1}",
+            "star_rating": 2 + i % 4,
+            "price_per_night": price,
+            "currency": "USD",
+            "guest_rating": round(6.5 + (_seed(city, i, "guest") % 35) / 10, 1),
+            "amenities": ["WiFi", "Breakfast", "Air conditioning"][:1 + i % 3],
+            "location": f"District {1 + i} of {city}",
+            "total_price": price * num_days
+        })
+    return json.dumps(hotels)
+
+def nearby_reply(city):
+    """Nearby places JSON for a city."""
+    return json.dumps([{
+        "name": f"Near {city} {i + 1}",
+        "distance_km": 15 + _seed(city, i, "km") % 180,
+        "transport": TRANSPORTS[_seed(city, i, "transport") % len(TRANSPORTS)],
+        "famous_for": "Old town and local food",
+        "recommended_duration": "Full day" if i % 2 else "Half day",
+        "estimated_cost": f"{20 + _seed(city, i, 'cost') % 80} USD"
+    } for i in range(6)])
+
+def itinerary_reply(prompt, words):
+    """Day-by-day itinerary text of roughly ``words`` words."""
+    num_days = int(_match(r"Duration: (\d+) days", prompt, "3"))
+    city = _match(r"To: ([^\n]+)", prompt, "the city")
+    per_day = max(1, words // num_days)
+    lines = []
+    for day in range(1, num_days + 1):
+        lines.append(f"Day {day}: exploring {city}")
+        lines.append(" ".join(["visit"] * per_day))
+    return "\n".join(lines)
+
+def profile_reply(city, count, num_days):
+    """Destination profile JSON: attractions, hotels and nearby places together."""
+    return json.dumps({
+        "attractions": json.loads(attractions_reply(city, count)),
+        "hotels": json.loads(hotels_reply(city, num_days)),
+        "nearby_places": json.loads(nearby_reply(city))
+    })
+
+def trip_tool_calls(request, tool_names=()):
+    """One tool call per data-gathering tool bound to the model for a trip planning request."""
+    from_city = _match(r"From: ([^→\n]+)", request, "Mumbai")
+    to_city = _match(r"To: ([^\n]+)", request, "Paris")
+    num_days = int(_match(r"Duration: (\d+) days", request, "3"))
+    num_adults = int(_match(r"Travelers: (\d+) adults", request, "2"))
+    num_kids = int(_match(r"(\d+) children", request, "0"))
+    date = _match(r"Arrival: (\S+)", request)
+    calls = [
+        ("get_weather_info", {"city": to_city, "date": date}),
+        ("get_top_attractions", {"city": to_city, "num_days": num_days}),
+        ("get_hotel_recommendations", {"city": to_city, "num_adults": num_adults, "num_kids": num_kids, "num_days": num_days}),
+        ("convert_currency", {"from_city": from_city, "to_city": to_city}),
+        ("get_nearby_places", {"city": to_city}),
+        ("get_destination_profile", {"city": to_city, "num_adults": num_adults, "num_kids": num_kids, "num_days": num_days})
+    ]
+    # The profile replaces the three single-section tools when it is bound
+    if "get_destination_profile" in tool_names:
+        skipped = ("get_top_attractions", "get_hotel_recommendations", "get_nearby_places")
+    else:
+        skipped = ("get_destination_profile",)
+    calls = [call for call in calls if call[0] not in skipped and (not tool_names or call[0] in tool_names)]
+    return [{"name": name, "args": args, "id": f"call_{i}"} for i, (name, args) in enumerate(calls)]
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that returns canned, prompt-derived replies after a configurable delay.
+
+    ``latency`` is the delay before the reply (or before the first streamed
+    token) and ``token_latency`` the delay between streamed tokens. A
+    ``slow_fraction`` of calls waits ``slow_latency`` instead, to model a
+    latency tail. With ``requests_per_minute`` set, calls over that rate
+    fail with a 429 as a provider would.
+    """
+
+    latency: float = 0.05
+    token_latency: float = 0.0
+    slow_fraction: float = 0.0
+    slow_latency: float = 1.0
+    requests_per_minute: float = 0.0
+    itinerary_words: int = 200
+    tools_bound: bool = False
+    tool_names: tuple = ()
+
+    @property
+    def _llm_type(self):
+        return "benchmark-fake"
+
+    def bind_tools(self, tools, **kwargs):
+        names = tuple(getattr(tool, "name", None) or tool.__name__ for tool in tools)
+        return self.model_copy(update={"tools_bound": True, "tool_names": names})
+
+    def _reply(self, messages, response_format=None):
+        """Build the deterministic reply for a conversation.
+
+        With a ``response_format`` (JSON or schema mode), item lists are
+        wrapped in an ``{"items": [...]}`` object as the real model returns them.
+        """
+        prompt = _content(messages[-1]) if messages else ""
+        input_tokens = sum(len(_content(m)) for m in messages) // 4
+
+        if self.tools_bound:
+            kind = "agent"
+            if any(isinstance(m, ToolMessage) for m in messages):
+                content, tool_calls = "All trip data has been gathered.", []
+            else:
+                request = next((_content(m) for m in messages if isinstance(m, HumanMessage)), prompt)
+                content, tool_calls = "", trip_tool_calls(request, self.tool_names)
+        else:
+            tool_calls = []
+            city = _match(r"attractions in ([^.\n]+)\.", prompt)
+            if "Build a travel profile of" in prompt:
+                kind = "destination_profile"
+                content = profile_reply(_match(r"profile of (.+?) for", prompt, "City"),
+                                        int(_match(r"the top (\d+) attractions", prompt, "5")),
+                                        int(_match(r"staying (\d+) nights", prompt, "3")))
+            elif city and "List the top" in prompt:
+                kind = "attractions"
+                content = attractions_reply(city, int(_match(r"List the top (\d+)", prompt, "5")))
+            elif "Suggest 5 hotels in" in prompt:
+                kind = "hotels"
+                content = hotels_reply(_match(r"hotels in (.+?) for", prompt, "City"),
+                                       int(_match(r"for (\d+) nights", prompt, "3")))
+            elif "cities near" in prompt:
+                kind = "nearby_places"
+                content = nearby_reply(_match(r"cities near ([^.\n]+)\.", prompt, "City"))
+            else:
+                kind = "itinerary"
+                content = itinerary_reply(prompt, self.itinerary_words)
+            if response_format and kind not in ("itinerary", "destination_profile"):
+                content = json.dumps({"items": json.loads(content)})
+
+        llm_calls[kind] += 1
+        output_tokens = len(content) // 4 + 10 * len(tool_calls)
+        return AIMessage(
+            content=content,
+            tool_calls=tool_calls,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens
+            }
+        )
+
+    def _admit(self):
+        if self.requests_per_minute and not _provider.admit(self.requests_per_minute):
+            llm_calls["rate_limited"] += 1
+            raise FakeRateLimitError("Rate limit reached for requests per minute")
+
+    def _delay(self) -> float:
+        return self.slow_latency if self.slow_fraction and _tail.random() < self.slow_fraction else self.latency
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self._admit()
+        time.sleep(self._delay())
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages, kwargs.get("response_format")))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self._admit()
+        await asyncio.sleep(self._delay())
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages, kwargs.get("response_format")))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        self._admit()
+        reply = self._reply(messages, kwargs.get("response_format"))
+        await asyncio.sleep(self._delay())
+        if reply.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+                    for i, c in enumerate(reply.tool_calls)
+                ]
+            ))
+            return
+        for i, word in enumerate(reply.content.split(" ")):
+            if i and self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            token = word if i == 0 else f" {word}"
+            # BaseChatModel.astream reports each chunk to the callbacks
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
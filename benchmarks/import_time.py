@@ -0,0 +1,85 @@
+"""Measure how long a fresh API process takes to import and answer /health.
+
+Each run starts a new interpreter, imports ``api.app``, builds the app, runs
+its startup hooks and sends one ``GET /health`` request. The script prints
+the timings as JSON and exits non-zero when the median time to healthy is
+over budget, or when a module that should be deferred was loaded.
+
+    python benchmarks/import_time.py --runs 5 --budget 1.0
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must not be imported before the first planning request
+DEFERRED_MODULES = ["pandas", "openpyxl", "langchain_groq", "langgraph", "langchain_core"]
+
+PROBE = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import api.app
+imported = time.perf_counter()
+app = api.app.create_app()
+loaded = [m for m in {deferred!r} if m in sys.modules]
+
+async def probe():
+    import httpx
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://probe") as client:
+            response = await client.get("/health")
+            healthy = time.perf_counter()
+            return response.status_code, healthy
+
+status, healthy = asyncio.run(probe())
+print(json.dumps({{
+    "import_seconds": imported - started,
+    "healthy_seconds": healthy - started,
+    "status_code": status,
+    "deferred_loaded": loaded
+}}))
+"""
+
+def run_once(warmup):
+    """Run the probe in a fresh interpreter and return its measurements."""
+    env = dict(os.environ, WARMUP_ON_STARTUP="true" if warmup else "false")
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(deferred=DEFERRED_MODULES)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh processes to measure")
+    parser.add_argument("--budget", type=float, default=1.0, help="Maximum median seconds to healthy")
+    parser.add_argument("--warmup", action="store_true", help="Keep the background warm-up enabled")
+    args = parser.parse_args()
+
+    runs = [run_once(args.warmup) for _ in range(args.runs)]
+    report = {
+        "runs": args.runs,
+        "warmup": args.warmup,
+        "budget_seconds": args.budget,
+        "import_seconds_median": round(statistics.median(r["import_seconds"] for r in runs), 3),
+        "healthy_seconds_median": round(statistics.median(r["healthy_seconds"] for r in runs), 3),
+        "healthy_seconds_max": round(max(r["healthy_seconds"] for r in runs), 3),
+        "deferred_loaded": sorted({m for r in runs for m in r["deferred_loaded"]}),
+        "status_codes": sorted({r["status_code"] for r in runs})
+    }
+    report["within_budget"] = (
+        report["healthy_seconds_median"] <= args.budget
+        and not report["deferred_loaded"]
+        and report["status_codes"] == [200]
+    )
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["within_budget"] else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""Offline end-to-end benchmarks for the travel planner API.
+
+The app runs in-process with a deterministic fake chat model and local stub
+weather and exchange-rate servers, so no API keys or network are needed.
+Each scenario is driven at every requested concurrency level and reported
+as JSON (latency percentiles, throughput, peak RSS, upstream and LLM calls).
+
+    python -m benchmarks.run --scenarios plan_fast,export --concurrency 1,8,32 --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from .fake_llm import FakeChatModel, llm_calls
+from .stubs import StubAPIServer
+
+DESTINATIONS = ["Paris", "Tokyo", "London", "Rome", "Dubai", "Singapore", "Sydney", "New York"]
+ORIGINS = ["Mumbai", "Delhi", "Berlin", "Toronto"]
+
+def trip_body(i, workflow):
+    """The i-th trip request; destinations repeat so caches see realistic reuse."""
+    return {
+        "from_city": ORIGINS[i % len(ORIGINS)],
+        "to_city": DESTINATIONS[i % len(DESTINATIONS)],
+        "arrival_date": "2026-11-01",
+        "num_days": 2 + i % 4,
+        "num_adults": 1 + i % 3,
+        "num_kids": i % 2,
+        "workflow": workflow
+    }
+
+def tool_request(i):
+    """The i-th standalone tool endpoint call, cycling through all five tools."""
+    city = DESTINATIONS[i % len(DESTINATIONS)]
+    requests = [
+        ("/weather", {"city": city}),
+        ("/attractions", {"city": city, "num_days": 3}),
+        ("/hotels", {"city": city, "num_adults": 2, "num_kids": 0, "num_days": 3}),
+        ("/currency", {"from_city": ORIGINS[i % len(ORIGINS)], "to_city": city}),
+        ("/nearby-places", {"city": city})
+    ]
+    path, body = requests[(i // len(DESTINATIONS)) % len(requests)]
+    return "POST", path, body
+
+async def setup_trips(client, count):
+    """Plan ``count`` trips on the fast workflow and return their ids."""
+    ids = []
+    for i in range(count):
+        response = await client.post("/plan-trip", json=trip_body(i, "fast"))
+        response.raise_for_status()
+        ids.append(response.json()["trip_id"])
+    return ids
+
+# Scenario name -> (setup coroutine or None, request builder taking (index, setup result))
+SCENARIOS = {
+    "plan_fast": (None, lambda i, _: ("POST", "/plan-trip", trip_body(i, "fast"))),
+    "plan_agentic": (None, lambda i, _: ("POST", "/plan-trip", trip_body(i, "agentic"))),
+    "export": (setup_trips, lambda i, ids: ("GET", f"/trip/{ids[i % len(ids)]}/export", None)),
+    "tools": (None, lambda i, _: tool_request(i))
+}
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / 1024 if sys.platform != "darwin" else peak / (1024 * 1024), 1)
+
+async def run_level(client, build, setup_result, requests, concurrency):
+    """Send ``requests`` requests with ``concurrency`` workers and collect latencies."""
+    indexes = iter(range(requests))
+    latencies = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for i in indexes:
+            method, path, body = build(i, setup_result)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                await response.aread()
+                if response.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+def summarize(name, concurrency, latencies, errors, wall, upstream, llm):
+    """Result record for one scenario at one concurrency level."""
+    ordered = sorted(latencies)
+    to_ms = lambda seconds: round(seconds * 1000, 2) if seconds is not None else None
+    return {
+        "scenario": name,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else None,
+        "latency_ms": {
+            "p50": to_ms(percentile(ordered, 50)),
+            "p95": to_ms(percentile(ordered, 95)),
+            "p99": to_ms(percentile(ordered, 99)),
+            "mean": to_ms(sum(ordered) / len(ordered)) if ordered else None,
+            "max": to_ms(ordered[-1] if ordered else None)
+        },
+        "peak_rss_mb": peak_rss_mb(),
+        "upstream_calls": upstream,
+        "llm_calls": llm
+    }
+
+def git_revision():
+    """Current commit hash, if the tree is a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run_benchmarks(args, stub):
+    """Start the app in-process and run every scenario at every concurrency level."""
+    import httpx
+    from api.app import create_app
+    from api import routes
+    from llm.config import set_llm
+
+    llm = FakeChatModel(latency=args.llm_latency, token_latency=args.token_latency,
+                        slow_fraction=args.slow_fraction, slow_latency=args.slow_latency,
+                        requests_per_minute=args.llm_rpm)
+    if args.hedge_delay:
+        from llm.router import RoutedChatModel
+
+        llm = RoutedChatModel(models=[llm], hedge_delay=args.hedge_delay)
+    set_llm(llm)
+    app = create_app()
+    results = []
+    async with app.router.lifespan_context(app):
+        routes.warm_up()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+            for name in args.scenarios:
+                setup, build = SCENARIOS[name]
+                for concurrency in args.concurrency:
+                    setup_result = await setup(client, args.requests) if setup else None
+                    if args.warmup_requests:
+                        await run_level(client, build, setup_result, args.warmup_requests, 1)
+                    upstream_before, llm_before = dict(stub.hits), dict(llm_calls)
+                    latencies, errors, wall = await run_level(client, build, setup_result, args.requests, concurrency)
+                    upstream = {k: v - upstream_before.get(k, 0) for k, v in stub.hits.items() if v - upstream_before.get(k, 0)}
+                    llm = {k: v - llm_before.get(k, 0) for k, v in llm_calls.items() if v - llm_before.get(k, 0)}
+                    result = summarize(name, concurrency, latencies, errors, wall, upstream, llm)
+                    results.append(result)
+                    if not args.quiet:
+                        print(f"{name:>13} c={concurrency:<4} p50={result['latency_ms']['p50']}ms "
+                              f"p95={result['latency_ms']['p95']}ms p99={result['latency_ms']['p99']}ms "
+                              f"{result['throughput_rps']} req/s errors={errors}", file=sys.stderr)
+    return results
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmarks for the travel planner API")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated scenarios ({', '.join(SCENARIOS)})")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=64, help="Measured requests per scenario and level")
+    parser.add_argument("--warmup-requests", type=int, default=2, help="Unmeasured requests before each level")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Fake LLM seconds before each reply")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Fake LLM seconds between streamed tokens")
+    parser.add_argument("--slow-fraction", type=float, default=0.0, help="Fraction of fake LLM calls that are slow")
+    parser.add_argument("--slow-latency", type=float, default=1.0, help="Fake LLM seconds before a slow reply")
+    parser.add_argument("--llm-rpm", type=float, default=0.0,
+                        help="Fake LLM requests per minute before it answers 429 (0 = unlimited)")
+    parser.add_argument("--hedge-delay", type=float, default=0.0,
+                        help="Route the fake LLM through the router, hedging after this many seconds")
+    parser.add_argument("--stub-latency", type=float, default=0.01, help="Stub API seconds per response")
+    parser.add_argument("--cache", action="store_true", help="Keep the tool result cache enabled")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-request timeout in seconds")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--quiet", action="store_true", help="Do not print per-level progress to stderr")
+    args = parser.parse_args(argv)
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    args.concurrency = [int(level) for level in args.concurrency.split(",")]
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    with StubAPIServer(latency=args.stub_latency) as stub:
+        # Settings are read at import time, so configure the environment first
+        os.environ.update(stub.env())
+        os.environ.update({
+            "CACHE_ENABLED": "true" if args.cache else "false",
+            "CACHE_DB_PATH": "",
+            "TRIP_STORE_BACKEND": "memory",
+            "WARMUP_ON_STARTUP": "false"
+        })
+        results = asyncio.run(run_benchmarks(args, stub))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "llm_latency": args.llm_latency,
+            "token_latency": args.token_latency,
+            "stub_latency": args.stub_latency,
+            "cache": args.cache
+        },
+        "results": results
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Local stand-ins for the OpenWeather and exchange-rate APIs."""
+
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Units per US dollar for every currency the currency tool can resolve
+RATES = {
+    "USD": 1.0, "EUR": 0.92, "GBP": 0.79, "INR": 83.2, "JPY": 151.4, "CNY": 7.23,
+    "AUD": 1.52, "CAD": 1.36, "SGD": 1.35, "AED": 3.67, "BRL": 5.05, "MXN": 16.9,
+    "ZAR": 18.7, "RUB": 92.5, "EGP": 47.3, "NGN": 1450.0, "CHF": 0.9, "THB": 36.5
+}
+
+class StubAPIServer:
+    """Threaded HTTP server answering geocoding, forecast and exchange-rate requests.
+
+    Every response waits ``latency`` seconds first. ``hits`` counts requests
+    per endpoint so a benchmark can report how many upstream calls it made.
+    """
+
+    def __init__(self, latency=0.01, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.hits = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        """Environment variables pointing the planner at this server."""
+        return {
+            "OPENWEATHER_API_URL": self.url,
+            "OPENWEATHER_API_KEY": "benchmark",
+            "EXCHANGE_RATE_API_URL": f"{self.url}/rates"
+        }
+
+    def _record(self, endpoint):
+        with self._lock:
+            self.hits[endpoint] += 1
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                if parsed.path == "/geo/1.0/direct":
+                    endpoint, body = "geocode", geocode_body(query.get("q", ""))
+                elif parsed.path == "/data/2.5/forecast":
+                    endpoint, body = "forecast", forecast_body(query.get("lat", "0"), query.get("lon", "0"))
+                elif parsed.path.startswith("/rates/"):
+                    endpoint, body = "rates", rates_body(parsed.path.rsplit("/", 1)[-1])
+                else:
+                    self.send_error(404)
+                    return
+                stub._record(endpoint)
+                if stub.latency:
+                    time.sleep(stub.latency)
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def _unit(*parts):
+    """Stable value in [0, 1) derived from the given values."""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return int(digest[:8], 16) / 0x100000000
+
+def geocode_body(city):
+    """Geocoding response with stable coordinates for a city name."""
+    return [{
+        "name": city,
+        "lat": round(-60 + 120 * _unit(city.casefold(), "lat"), 4),
+        "lon": round(-180 + 360 * _unit(city.casefold(), "lon"), 4),
+        "country": "XX"
+    }]
+
+def forecast_body(lat, lon):
+    """Five days of 3-hourly forecasts starting from the current slot."""
+    start = int(time.time()) // 10800 * 10800
+    entries = []
+    for i in range(40):
+        temperature = 5 + 25 * _unit(lat, lon, i)
+        entries.append({
+            "dt": start + i * 10800,
+            "main": {"temp": temperature, "feels_like": temperature - 1.5, "humidity": 40 + int(50 * _unit(lat, i))},
+            "weather": [{"description": ["clear sky", "light rain", "scattered clouds"][i % 3]}],
+            "wind": {"speed": 1 + 8 * _unit(lon, i)}
+        })
+    return {"list": entries}
+
+def rates_body(base):
+    """Exchange-rate table relative to ``base``."""
+    base_rate = RATES.get(base.upper(), 1.0)
+    return {"base": base.upper(), "rates": {code: rate / base_rate for code, rate in RATES.items()}}
@@ -18,6 +18,108 @@ class Settings:
     # LLM Configuration
     LLM_MODEL = "openai/gpt-oss-120b"
     LLM_TEMPERATURE = 0.7
+    # Seconds before an LLM request gives up (and the router may fall back)
+    LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))
+    # Secondary model tried on a timeout, 429 or 5xx from the primary; empty disables
+    LLM_FALLBACK_MODEL = os.getenv("LLM_FALLBACK_MODEL", "")
+    # Send a duplicate request after this many seconds without an answer; 0 disables
+    LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "0"))
+    
+    # Process-wide LLM rate limiting: provider budgets (0 = unlimited) and the
+    # range the adaptive concurrency limit moves in
+    LLM_RATE_LIMIT_ENABLED = os.getenv("LLM_RATE_LIMIT_ENABLED", "true").lower() == "true"
+    LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))
+    LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "64"))
+    LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+    # Retries of a call rejected with 429, each after waiting for a new permit
+    LLM_RATE_LIMIT_RETRIES = int(os.getenv("LLM_RATE_LIMIT_RETRIES", "2"))
+    
+    # Output constraint for the attractions, hotels and nearby places tools:
+    # "json_schema" (schema-constrained), "json_object" (JSON mode) or "none"
+    LLM_STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "json_schema")
+    
+    # Plan with one destination-profile LLM call instead of separate
+    # attractions, hotels and nearby places calls (standalone endpoints keep theirs)
+    DESTINATION_PROFILE_ENABLED = os.getenv("DESTINATION_PROFILE_ENABLED", "false").lower() == "true"
+    
+    # Itinerary prompt size; 0 disables trimming
+    ITINERARY_PROMPT_TOKEN_BUDGET = int(os.getenv("ITINERARY_PROMPT_TOKEN_BUDGET", "1000"))
+    
+    # Agent loop history sent to the LLM, after tool outputs become receipts;
+    # 0 disables dropping old tool-call rounds
+    AGENT_CONTEXT_TOKEN_BUDGET = int(os.getenv("AGENT_CONTEXT_TOKEN_BUDGET", "1500"))
+    
+    # Compile graphs and build the LLM client in the background at startup
+    # (otherwise on the first planning request)
+    WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
+    
+    # Graph Execution ("async" streams the graph on the event loop,
+    # "sync" runs the blocking stream in a worker thread)
+    GRAPH_EXECUTION_MODE = os.getenv("GRAPH_EXECUTION_MODE", "async")
+    
+    # Tool Result Cache (empty CACHE_DB_PATH keeps the cache memory-only)
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", ".cache/tool_cache.sqlite3")
+    CACHE_MEMORY_MAX_ENTRIES = 512
+    CACHE_DISK_MAX_ENTRIES = 20000
+    CACHE_DEFAULT_TTL = 6 * 3600
+    CACHE_TTLS = {
+        "get_top_attractions": 7 * 24 * 3600,
+        "get_hotel_recommendations": 24 * 3600,
+        "get_nearby_places": 30 * 24 * 3600,
+        "geocode": 365 * 24 * 3600,
+        "forecast": 3 * 3600
+    }
+    
+    # City gazetteer (empty uses the bundled tools/data/gazetteer.tsv.gz)
+    GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", "")
+    
+    # Weather API
+    OPENWEATHER_API_URL = os.getenv("OPENWEATHER_API_URL", "http://api.openweathermap.org")
+    
+    # Exchange Rates (one base table, cross rates derived locally)
+    EXCHANGE_RATE_API_URL = os.getenv("EXCHANGE_RATE_API_URL", "https://api.exchangerate-api.com/v4/latest")
+    EXCHANGE_RATE_BASE_CURRENCY = "USD"
+    EXCHANGE_RATE_TTL = 3600
+    EXCHANGE_RATE_TIMEOUT = 5
+    
+    # Graph Checkpointing ("bounded", "sqlite", "memory" or "none")
+    CHECKPOINTER_BACKEND = os.getenv("CHECKPOINTER_BACKEND", "bounded")
+    FAST_CHECKPOINTER_BACKEND = os.getenv("FAST_CHECKPOINTER_BACKEND", "none")
+    CHECKPOINTER_MAX_THREADS = int(os.getenv("CHECKPOINTER_MAX_THREADS", "1000"))
+    CHECKPOINTER_DB_PATH = os.getenv("CHECKPOINTER_DB_PATH", ".cache/checkpoints.sqlite3")
+    
+    # Trip Store ("sqlite" persists plans, "memory" keeps them in-process)
+    TRIP_STORE_BACKEND = os.getenv("TRIP_STORE_BACKEND", "sqlite")
+    TRIP_STORE_DB_PATH = os.getenv("TRIP_STORE_DB_PATH", ".cache/trips.sqlite3")
+    TRIP_STORE_MAX_ENTRIES = int(os.getenv("TRIP_STORE_MAX_ENTRIES", "50000"))
+    TRIP_STORE_MAX_AGE = 30 * 24 * 3600
+    TRIP_STORE_CACHE_SIZE = 256
+    
+    # Excel Export Cache
+    EXPORT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    
+    # Background Planning Queue
+    PLAN_QUEUE_MAX_CONCURRENCY = int(os.getenv("PLAN_QUEUE_MAX_CONCURRENCY", "4"))
+    PLAN_QUEUE_MAX_DEPTH = int(os.getenv("PLAN_QUEUE_MAX_DEPTH", "100"))
+    PLAN_QUEUE_STATUS_RETENTION = 10000
+    PLAN_QUEUE_RETRY_AFTER = 5
+    
+    # Batch Planning
+    BATCH_MAX_TRIPS = int(os.getenv("BATCH_MAX_TRIPS", "100"))
+    BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+    # Seconds a blocking trip waits for another trip's shared tool call
+    # before running the call itself
+    BATCH_MEMO_WAIT_TIMEOUT = float(os.getenv("BATCH_MEMO_WAIT_TIMEOUT", "30"))
+    
+    # Shared HTTP Connection Pools
+    HTTP_TIMEOUT = 10
+    HTTP_MAX_CONNECTIONS = 100
+    HTTP_MAX_KEEPALIVE = 20
+    
+    # Prometheus-style metrics on /metrics (latency histograms, LLM tokens, upstream status codes)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
     
     # API Configuration
     API_TITLE = "AI Travel Planner API"
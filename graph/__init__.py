@@ -1,3 +1,20 @@
-from .workflow import app_graph, create_workflow
+import importlib
 
-__all__ = ['app_graph', 'create_workflow']
\ No newline at end of file
+# Submodules are imported on first access, so importing graph.memo or the
+# package itself does not load LangGraph or compile any workflow
+_EXPORTS = {
+    'app_graph': '.workflow',
+    'fast_graph': '.workflow',
+    'create_workflow': '.workflow',
+    'create_fast_workflow': '.workflow',
+    'get_graph': '.workflow',
+    'ToolCallMemo': '.memo'
+}
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
+
+__all__ = ['app_graph', 'fast_graph', 'create_workflow', 'create_fast_workflow', 'get_graph', 'ToolCallMemo']
@@ -0,0 +1,201 @@
+"""Checkpointer backends with retention limits for the trip planner graphs.
+
+Every plan runs on its own thread (the trip id) and nothing resumes an old
+run, so only the latest checkpoint of each thread is worth keeping. None of
+the graph channels are DeltaChannels, which makes "keep latest" pruning safe.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+from collections import OrderedDict, defaultdict
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+from config.settings import settings
+
+class BoundedMemorySaver(InMemorySaver):
+    """In-memory saver that keeps the latest checkpoint per thread and caps thread count.
+
+    Threads are evicted least-recently-used once more than ``max_threads``
+    have checkpoints. With ``keep_latest_only`` each new checkpoint replaces
+    the previous ones of its thread, along with their writes and blobs.
+    """
+
+    def __init__(self, max_threads=1000, keep_latest_only=True):
+        super().__init__()
+        self.max_threads = max_threads
+        self.keep_latest_only = keep_latest_only
+        self._threads = OrderedDict()
+        self._blob_keys = defaultdict(set)
+        self._write_keys = defaultdict(set)
+        self._lock = threading.RLock()
+
+    def _touch(self, thread_id):
+        """Mark a thread as recently used and evict the least recently used ones."""
+        self._threads[thread_id] = None
+        self._threads.move_to_end(thread_id)
+        while len(self._threads) > self.max_threads:
+            oldest, _ = self._threads.popitem(last=False)
+            self.delete_thread(oldest)
+
+    def get_tuple(self, config):
+        with self._lock:
+            return super().get_tuple(config)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        with self._lock:
+            return iter(list(super().list(config, filter=filter, before=before, limit=limit)))
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            result = super().put(config, checkpoint, metadata, new_versions)
+            for channel, version in new_versions.items():
+                self._blob_keys[thread_id].add((thread_id, checkpoint_ns, channel, version))
+            if self.keep_latest_only:
+                self._keep_latest(thread_id, checkpoint_ns, checkpoint)
+            self._touch(thread_id)
+        return result
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+            self._write_keys[thread_id].add((
+                thread_id,
+                config["configurable"].get("checkpoint_ns", ""),
+                config["configurable"]["checkpoint_id"]
+            ))
+
+    def _keep_latest(self, thread_id, checkpoint_ns, checkpoint):
+        """Drop every checkpoint of a namespace except ``checkpoint`` plus its stale data."""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        for checkpoint_id in [cid for cid in checkpoints if cid != checkpoint["id"]]:
+            del checkpoints[checkpoint_id]
+
+        write_keys = self._write_keys[thread_id]
+        for key in [k for k in write_keys if k[1] == checkpoint_ns and k[2] != checkpoint["id"]]:
+            self.writes.pop(key, None)
+            write_keys.discard(key)
+
+        live_versions = checkpoint["channel_versions"]
+        blob_keys = self._blob_keys[thread_id]
+        for key in [k for k in blob_keys if k[1] == checkpoint_ns and live_versions.get(k[2]) != k[3]]:
+            self.blobs.pop(key, None)
+            blob_keys.discard(key)
+
+    def delete_thread(self, thread_id):
+        with self._lock:
+            self.storage.pop(thread_id, None)
+            for key in self._write_keys.pop(thread_id, ()):
+                self.writes.pop(key, None)
+            for key in self._blob_keys.pop(thread_id, ()):
+                self.blobs.pop(key, None)
+            self._threads.pop(thread_id, None)
+
+    def stats(self):
+        """Return the number of retained threads, checkpoints, writes and blobs."""
+        with self._lock:
+            return {
+                "threads": len(self._threads),
+                "checkpoints": sum(len(ns) for t in self.storage.values() for ns in t.values()),
+                "writes": len(self.writes),
+                "blobs": len(self.blobs)
+            }
+
+def create_sqlite_checkpointer(db_path, max_threads=10000, prune_every=50):
+    """Create a SQLite checkpointer that prunes to the latest checkpoint per thread.
+
+    Uses the ``langgraph-checkpoint-sqlite`` package from requirements.txt.
+    """
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError as e:
+        raise ImportError(
+            "CHECKPOINTER_BACKEND=sqlite requires the langgraph-checkpoint-sqlite package"
+        ) from e
+
+    class PrunedSqliteSaver(SqliteSaver):
+        """SqliteSaver with thread-offloaded async methods and periodic pruning."""
+
+        def __init__(self, conn):
+            super().__init__(conn)
+            self._puts_since_prune = 0
+
+        def put(self, config, checkpoint, metadata, new_versions):
+            result = super().put(config, checkpoint, metadata, new_versions)
+            self._puts_since_prune += 1
+            if self._puts_since_prune >= prune_every:
+                self.prune_all()
+            return result
+
+        def prune_all(self):
+            """Keep only the latest checkpoint per thread and the newest ``max_threads`` threads."""
+            self._puts_since_prune = 0
+            with self.cursor() as cur:
+                cur.execute(
+                    "DELETE FROM checkpoints WHERE (thread_id, checkpoint_ns, checkpoint_id) NOT IN ("
+                    "SELECT thread_id, checkpoint_ns, MAX(checkpoint_id) FROM checkpoints "
+                    "GROUP BY thread_id, checkpoint_ns)"
+                )
+                cur.execute(
+                    "DELETE FROM writes WHERE (thread_id, checkpoint_ns, checkpoint_id) NOT IN ("
+                    "SELECT thread_id, checkpoint_ns, checkpoint_id FROM checkpoints)"
+                )
+                for table in ("checkpoints", "writes"):
+                    cur.execute(
+                        f"DELETE FROM {table} WHERE thread_id NOT IN ("
+                        "SELECT thread_id FROM checkpoints GROUP BY thread_id "
+                        "ORDER BY MAX(checkpoint_id) DESC LIMIT ?)",
+                        (max_threads,)
+                    )
+
+        async def aget_tuple(self, config):
+            return await asyncio.to_thread(self.get_tuple, config)
+
+        async def alist(self, config, *, filter=None, before=None, limit=None):
+            items = await asyncio.to_thread(
+                lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+            )
+            for item in items:
+                yield item
+
+        async def aput(self, config, checkpoint, metadata, new_versions):
+            return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+        async def aput_writes(self, config, writes, task_id, task_path=""):
+            return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+        async def adelete_thread(self, thread_id):
+            return await asyncio.to_thread(self.delete_thread, thread_id)
+
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    return PrunedSqliteSaver(conn)
+
+def create_checkpointer(backend=None):
+    """Build the checkpointer for a backend name.
+
+    ``bounded`` keeps the latest checkpoint per thread for at most
+    CHECKPOINTER_MAX_THREADS threads, ``sqlite`` does the same on disk,
+    ``memory`` is the unbounded MemorySaver and ``none`` disables
+    checkpointing.
+    """
+    backend = backend or settings.CHECKPOINTER_BACKEND
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return InMemorySaver()
+    if backend == "bounded":
+        return BoundedMemorySaver(max_threads=settings.CHECKPOINTER_MAX_THREADS)
+    if backend == "sqlite":
+        return create_sqlite_checkpointer(
+            settings.CHECKPOINTER_DB_PATH,
+            max_threads=settings.CHECKPOINTER_MAX_THREADS
+        )
+    raise ValueError(f"Unknown checkpointer backend: {backend}")
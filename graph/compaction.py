@@ -0,0 +1,94 @@
+"""Message-history compaction for the agent loop.
+
+The agent only decides which tools to call next; the data each tool returned
+already lives in the ``tool_results`` slots. Before every agent call, tool
+outputs that were recorded in a slot are replaced with a one-line receipt,
+so later turns do not resend every hotel, attraction and forecast. If the
+history is still over the context budget, the oldest tool-call rounds are
+dropped whole (an AI message together with its tool messages, so every
+remaining tool call keeps its answer) and summarized in a short note.
+"""
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from .prompt import estimate_tokens
+from .results import RESULT_TYPES, recorded_result
+
+# Rough per-message overhead for role and framing, in tokens
+MESSAGE_OVERHEAD_TOKENS = 4
+
+def _is_error(content) -> bool:
+    return isinstance(content, str) and content.startswith(('{"error"', '[{"error"'))
+
+def receipt(tool_name: str, data) -> str:
+    """Short stand-in for a tool output whose full result is stored in its slot."""
+    if tool_name == "get_weather_info":
+        detail = f"{len(data.get('forecasts', []))} daily forecasts for {data.get('city', 'the destination')}"
+    elif tool_name == "convert_currency":
+        detail = data.get("message") or f"{data.get('from_currency')} -> {data.get('to_currency')}"
+    elif tool_name == "get_destination_profile":
+        detail = ", ".join(f"{len(items)} {section.replace('_', ' ')}" for section, items in data.items())
+    elif isinstance(data, list):
+        detail = f"{len(data)} results"
+    else:
+        detail = "result"
+    return f"OK: {detail} recorded for the itinerary (full output omitted)."
+
+def _compact_tool_message(message, tool_results):
+    """Receipt version of a successful, recorded tool output; other messages unchanged."""
+    if not isinstance(message, ToolMessage) or message.name not in RESULT_TYPES:
+        return message
+    data = recorded_result(message.name, tool_results)
+    if data is None or _is_error(message.content):
+        return message
+    return ToolMessage(content=receipt(message.name, data), name=message.name, tool_call_id=message.tool_call_id)
+
+def message_tokens(message) -> int:
+    """Estimated tokens for one message, including any tool calls it carries."""
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    tokens = estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+    for call in getattr(message, "tool_calls", None) or ():
+        tokens += estimate_tokens(call["name"]) + estimate_tokens(str(call["args"]))
+    return tokens
+
+def _rounds(messages):
+    """Split a history into its leading messages and tool-call rounds.
+
+    A round starts at an AI message and runs until the next one, so an AI
+    message is never separated from the tool messages answering it.
+    """
+    start = next((i for i, m in enumerate(messages) if isinstance(m, AIMessage)), len(messages))
+    rounds = []
+    for message in messages[start:]:
+        if isinstance(message, AIMessage) or not rounds:
+            rounds.append([])
+        rounds[-1].append(message)
+    return messages[:start], rounds
+
+def _omitted_note(dropped) -> HumanMessage:
+    names = sorted({m.name for round_ in dropped for m in round_ if isinstance(m, ToolMessage) and m.name})
+    completed = ", ".join(names) if names else "none"
+    return HumanMessage(content=f"(Earlier tool calls omitted to save context. Completed tools: {completed}.)")
+
+def compact_messages(messages, tool_results=None, token_budget: int = 0):
+    """Return the history to send to the agent: receipts for recorded tool outputs,
+    then whole old rounds dropped while over ``token_budget`` tokens.
+
+    ``token_budget`` of 0 or less disables dropping; the latest round is
+    always kept. ``messages`` itself is not modified.
+    """
+    tool_results = tool_results or {}
+    compacted = [_compact_tool_message(m, tool_results) for m in messages]
+    if token_budget <= 0:
+        return compacted
+
+    head, rounds = _rounds(compacted)
+    sizes = [sum(message_tokens(m) for m in round_) for round_ in rounds]
+    total = sum(message_tokens(m) for m in head) + sum(sizes)
+    dropped = 0
+    while total > token_budget and dropped < len(rounds) - 1:
+        total -= sizes[dropped]
+        dropped += 1
+    if not dropped:
+        return compacted
+    return head + [_omitted_note(rounds[:dropped])] + [m for round_ in rounds[dropped:] for m in round_]
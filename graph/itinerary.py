@@ -1,17 +1,14 @@
 """Itinerary and expense calculation nodes."""
 
-import pandas as pd
-from models.schemas import TripPlannerState
-from llm.config import llm
+from config.settings import settings
+from models.state import TripPlannerState
+from llm.config import shared_llm
+from .prompt import collect_tables, render_sections, fit_to_budget, estimate_tokens
 
-def create_itinerary_node(state: TripPlannerState):
-    """Create a detailed itinerary based on collected data."""
-    weather_text = str(pd.DataFrame(state.get("weather_data", {}).get("forecasts", []))) if state.get("weather_data") else "No data"
-    attractions_text = str(pd.DataFrame(state.get("attractions_data", {}).get("items", []))) if state.get("attractions_data") else "No data"
-    hotels_text = str(pd.DataFrame(state.get("hotel_data", {}).get("items", []))) if state.get("hotel_data") else "No data"
-    nearby_text = str(pd.DataFrame(state.get("nearby_places_data", {}).get("items", []))) if state.get("nearby_places_data") else "No data"
-    
-    prompt = f"""Create a comprehensive travel itinerary:
+def _render_prompt(state: TripPlannerState, tables):
+    """Fill the itinerary prompt template with the serialized sections."""
+    sections = render_sections(tables)
+    return f"""Create a comprehensive travel itinerary:
 
 TRIP DETAILS:
 - From: {state['from_city']} → To: {state['to_city']}
@@ -19,19 +16,55 @@ TRIP DETAILS:
 - Duration: {state['num_days']} days
 - Travelers: {state['num_adults']} adults, {state['num_kids']} children
 
-WEATHER FORECAST: {weather_text}
-TOP ATTRACTIONS: {attractions_text}
-HOTELS: {hotels_text}
-CURRENCY: {state.get('currency_info', 'No info')}
-NEARBY PLACES: {nearby_text}
+WEATHER FORECAST:
+{sections['weather']}
+TOP ATTRACTIONS:
+{sections['attractions']}
+HOTELS:
+{sections['hotels']}
+CURRENCY: {state.get('currency_info') or 'No info'}
+NEARBY PLACES:
+{sections['nearby']}
 
 Create a detailed day-by-day itinerary with activities, meal suggestions, transportation tips, and packing recommendations."""
+
+def build_itinerary_prompt(state: TripPlannerState, token_budget: int = None):
+    """Build the itinerary prompt from collected data.
+    
+    Sections are serialized as compact tables and trimmed to fit
+    ITINERARY_PROMPT_TOKEN_BUDGET (or ``token_budget``).
+    """
+    if token_budget is None:
+        token_budget = settings.ITINERARY_PROMPT_TOKEN_BUDGET
+    return fit_to_budget(collect_tables(state), lambda tables: _render_prompt(state, tables), token_budget)
+
+def _itinerary_update(prompt, response):
+    """State update for an itinerary reply, including the prompt size in tokens."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    return {
+        "itinerary": response.content,
+        "itinerary_prompt_tokens": usage.get("input_tokens") or estimate_tokens(prompt)
+    }
+
+def create_itinerary_node(state: TripPlannerState):
+    """Create a detailed itinerary based on collected data."""
+    prompt = build_itinerary_prompt(state)
+    
+    try:
+        response = shared_llm().invoke(prompt)
+        return _itinerary_update(prompt, response)
+    except Exception as e:
+        return {"itinerary": f"Error: {str(e)}", "itinerary_prompt_tokens": estimate_tokens(prompt)}
+
+async def acreate_itinerary_node(state: TripPlannerState):
+    """Async variant of create_itinerary_node."""
+    prompt = build_itinerary_prompt(state)
     
     try:
-        response = llm.invoke(prompt)
-        return {"itinerary": response.content}
+        response = await shared_llm().ainvoke(prompt)
+        return _itinerary_update(prompt, response)
     except Exception as e:
-        return {"itinerary": f"Error: {str(e)}"}
+        return {"itinerary": f"Error: {str(e)}", "itinerary_prompt_tokens": estimate_tokens(prompt)}
 
 def calculate_expenses_node(state: TripPlannerState):
     """Calculate detailed expense breakdown."""
@@ -0,0 +1,115 @@
+"""Per-batch memo that shares identical tool calls between trip plans.
+
+A batch of trips is planned with one ToolCallMemo passed through the graph
+config as ``configurable["tool_memo"]``. The first trip to need a tool input
+runs the tool; every other trip in the batch waiting on the same input gets
+that result instead of calling the tool again.
+
+The memo holds each tool's output as its string content, whichever workflow
+produced it; the fast fetch nodes and the agent's ToolNode each wrap it in
+their own ToolMessage.
+"""
+
+import asyncio
+import threading
+
+from config.settings import settings
+from utils.cache import cache_key
+
+class ToolCallMemo:
+    """Results of tool calls keyed by tool name and arguments, for one batch."""
+
+    def __init__(self):
+        self._results = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def call(self, tool_name, args, func, timeout=None):
+        """Return ``func()`` for this tool input, running it at most once per batch.
+        
+        A waiter that has not seen the owner finish within ``timeout`` seconds
+        (BATCH_MEMO_WAIT_TIMEOUT by default) runs ``func()`` itself, so a
+        blocked worker thread cannot stall the batch.
+        """
+        key = cache_key(tool_name, **args)
+        with self._lock:
+            entry = self._results.get(key)
+            owner = entry is None
+            if owner:
+                entry = self._results[key] = {"done": threading.Event()}
+                self.calls += 1
+            else:
+                self.shared += 1
+        if owner:
+            try:
+                entry["result"] = func()
+            except Exception as e:
+                entry["error"] = e
+            finally:
+                entry["done"].set()
+        elif not entry["done"].wait(settings.BATCH_MEMO_WAIT_TIMEOUT if timeout is None else timeout):
+            return func()
+        if "error" in entry:
+            raise entry["error"]
+        return entry["result"]
+
+    async def acall(self, tool_name, args, coro_func):
+        """Async variant of ``call``; waiters share one task per tool input."""
+        key = cache_key(tool_name, **args)
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(coro_func())
+            self.calls += 1
+        else:
+            self.shared += 1
+        # Shield so one cancelled trip does not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def stats(self):
+        """Return how many tool calls ran and how many were served from the memo."""
+        return {"tool_calls": self.calls, "shared_calls": self.shared}
+
+def get_tool_memo(config):
+    """Return the batch memo carried in a runnable config, or None."""
+    return ((config or {}).get("configurable") or {}).get("tool_memo")
+
+def _memo_for(request):
+    """Batch memo for a ToolNode request, if the graph run carries one."""
+    runtime = request.runtime
+    return get_tool_memo(runtime.config) if runtime is not None else None
+
+def tool_content(result) -> str:
+    """The string content of a tool result, as the memo stores it."""
+    content = getattr(result, "content", result)
+    return content if isinstance(content, str) else str(content)
+
+def _message(content, request):
+    """ToolMessage answering the tool call in ``request`` with shared content."""
+    from langchain_core.messages import ToolMessage
+
+    call = request.tool_call
+    return ToolMessage(content=content, name=call["name"], tool_call_id=call["id"])
+
+def memo_tool_call(request, execute):
+    """ToolNode wrapper sharing agent tool calls through the batch memo."""
+    memo = _memo_for(request)
+    if memo is None:
+        return execute(request)
+    call = request.tool_call
+    content = memo.call(call["name"], call["args"], lambda: tool_content(execute(request)))
+    return _message(content, request)
+
+async def amemo_tool_call(request, execute):
+    """Async ToolNode wrapper sharing agent tool calls through the batch memo."""
+    memo = _memo_for(request)
+    if memo is None:
+        return await execute(request)
+    call = request.tool_call
+
+    async def run():
+        return tool_content(await execute(request))
+
+    content = await memo.acall(call["name"], call["args"], run)
+    return _message(content, request)
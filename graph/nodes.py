@@ -1,18 +1,34 @@
 """Graph nodes for the trip planner workflow."""
 
-import json
-import pandas as pd
-from models.schemas import TripPlannerState
-from llm.config import get_llm_with_tools
-from tools.all_tools import all_tools
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableLambda
+from config.settings import settings
+from models.state import TripPlannerState
+from llm.config import shared_llm_with_tools
+from tools.all_tools import planning_tools
+from tools.weather import get_weather_info
+from tools.attractions import get_top_attractions, get_nearby_places
+from tools.hotels import get_hotel_recommendations
+from tools.currency import convert_currency
+from tools.destination import get_destination_profile
+from .memo import get_tool_memo, tool_content
+from .results import tool_result_update
+from .compaction import compact_messages
 
-# Get LLM with tools
-llm_with_tools = get_llm_with_tools(all_tools)
+def _agent_messages(state: TripPlannerState):
+    """History for the next agent call, with recorded tool outputs compacted to receipts."""
+    return compact_messages(state["messages"], state.get("tool_results"), settings.AGENT_CONTEXT_TOKEN_BUDGET)
 
 def agent_node(state: TripPlannerState):
     """Main agent node that processes requests and calls tools."""
-    messages = state["messages"]
-    response = llm_with_tools.invoke(messages)
+    messages = _agent_messages(state)
+    response = shared_llm_with_tools(planning_tools()).invoke(messages)
+    return {"messages": [response]}
+
+async def aagent_node(state: TripPlannerState):
+    """Async agent node used when the graph is driven with astream."""
+    messages = _agent_messages(state)
+    response = await shared_llm_with_tools(planning_tools()).ainvoke(messages)
     return {"messages": [response]}
 
 def should_continue(state: TripPlannerState):
@@ -23,28 +39,85 @@ def should_continue(state: TripPlannerState):
         return "tools"
     return "process_results"
 
-def process_results_node(state: TripPlannerState):
-    """Process the results from tool calls and organize data."""
-    messages = state["messages"]
-    weather_data = attractions_data = hotels_data = currency_data = nearby_data = None
+def make_fetch_node(tool, build_args):
+    """Build a node that calls one tool directly with arguments taken from the state.
+    
+    The result is emitted as a ToolMessage, like output from the agent loop,
+    and parsed once into the tool's ``tool_results`` slot. When the run
+    belongs to a batch, identical calls are shared through the batch's tool memo.
+    """
+    def _to_message(result):
+        return {
+            "messages": [ToolMessage(content=result, name=tool.name, tool_call_id=f"fast_{tool.name}")],
+            **tool_result_update(tool.name, result)
+        }
+    
+    def fetch(state: TripPlannerState, config):
+        args = build_args(state)
+        memo = get_tool_memo(config)
+        if memo is None:
+            return _to_message(tool.invoke(args))
+        return _to_message(memo.call(tool.name, args, lambda: tool_content(tool.invoke(args))))
     
-    for msg in messages:
-        if hasattr(msg, '__class__') and msg.__class__.__name__ == 'ToolMessage':
-            try:
-                content = json.loads(msg.content)
-                if "forecasts" in content:
-                    weather_data = content
-                elif isinstance(content, list) and len(content) > 0:
-                    if "ticket_price" in content[0]:
-                        attractions_data = {"items": content}
-                    elif "star_rating" in content[0]:
-                        hotels_data = {"items": content}
-                    elif "distance_km" in content[0]:
-                        nearby_data = {"items": content}
-                elif "exchange_rate" in content:
-                    currency_data = content
-            except:
-                continue
+    async def afetch(state: TripPlannerState, config):
+        args = build_args(state)
+        memo = get_tool_memo(config)
+        if memo is None:
+            return _to_message(await tool.ainvoke(args))
+        
+        async def run():
+            return tool_content(await tool.ainvoke(args))
+        
+        return _to_message(await memo.acall(tool.name, args, run))
+    
+    return RunnableLambda(fetch, afunc=afetch, name=f"fetch_{tool.name}")
+
+# Deterministic tool calls for the fast workflow, keyed by node name
+fetch_nodes = {
+    "fetch_weather": make_fetch_node(
+        get_weather_info,
+        lambda s: {"city": s["to_city"], "date": s["arrival_date"]}
+    ),
+    "fetch_attractions": make_fetch_node(
+        get_top_attractions,
+        lambda s: {"city": s["to_city"], "num_days": s["num_days"]}
+    ),
+    "fetch_hotels": make_fetch_node(
+        get_hotel_recommendations,
+        lambda s: {"city": s["to_city"], "num_adults": s["num_adults"], "num_kids": s["num_kids"], "num_days": s["num_days"]}
+    ),
+    "fetch_currency": make_fetch_node(
+        convert_currency,
+        lambda s: {"from_city": s["from_city"], "to_city": s["to_city"]}
+    ),
+    "fetch_nearby": make_fetch_node(
+        get_nearby_places,
+        lambda s: {"city": s["to_city"]}
+    ),
+}
+
+# With DESTINATION_PROFILE_ENABLED, one profile call replaces the attractions,
+# hotels and nearby places nodes
+profile_fetch_nodes = {
+    "fetch_weather": fetch_nodes["fetch_weather"],
+    "fetch_profile": make_fetch_node(
+        get_destination_profile,
+        lambda s: {"city": s["to_city"], "num_adults": s["num_adults"], "num_kids": s["num_kids"], "num_days": s["num_days"]}
+    ),
+    "fetch_currency": fetch_nodes["fetch_currency"]
+}
+
+def planning_fetch_nodes():
+    """Fetch nodes the fast workflow fans out to under the current settings."""
+    return profile_fetch_nodes if settings.DESTINATION_PROFILE_ENABLED else fetch_nodes
+
+def _items(data):
+    return {"items": data} if data else {}
+
+def process_results_node(state: TripPlannerState):
+    """Assemble the tool results recorded in the state's typed slots."""
+    results = state.get("tool_results") or {}
+    currency_data = results.get("convert_currency")
     
     currency_str = ""
     if currency_data:
@@ -54,9 +127,9 @@ To: {currency_data.get('to_currency', 'N/A')} ({currency_data.get('to_city', 'N/
 Exchange Rate: 1 {currency_data.get('from_currency', '')} = {currency_data.get('exchange_rate', 0)} {currency_data.get('to_currency', '')}"""
     
     return {
-        "weather_data": weather_data or {},
-        "attractions_data": attractions_data or {},
-        "hotel_data": hotels_data or {},
+        "weather_data": results.get("get_weather_info") or {},
+        "attractions_data": _items(results.get("get_top_attractions")),
+        "hotel_data": _items(results.get("get_hotel_recommendations")),
         "currency_info": currency_str,
-        "nearby_places_data": nearby_data or {}
-    }
\ No newline at end of file
+        "nearby_places_data": _items(results.get("get_nearby_places"))
+    }
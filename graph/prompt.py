@@ -0,0 +1,140 @@
+"""Compact, token-budgeted serialization of trip data for the itinerary prompt.
+
+Each section is written as a pipe-separated table with one header line, so
+no whitespace padding or column truncation reaches the LLM. When the prompt
+is over its token budget, the lowest-value fields are dropped first, then
+rows of the least important sections.
+"""
+
+# Sections in prompt order: (title, state field, list key)
+SECTIONS = {
+    "weather": ("WEATHER FORECAST", "weather_data", "forecasts"),
+    "attractions": ("TOP ATTRACTIONS", "attractions_data", "items"),
+    "hotels": ("HOTELS", "hotel_data", "items"),
+    "nearby": ("NEARBY PLACES", "nearby_places_data", "items")
+}
+
+# Known fields per section, most valuable first; unknown fields go last
+SECTION_FIELDS = {
+    "weather": ["date", "day", "condition", "temperature", "feels_like", "humidity", "wind_speed"],
+    "attractions": ["name", "category", "ticket_price", "currency", "duration", "rating", "description"],
+    "hotels": ["name", "star_rating", "price_per_night", "currency", "total_price", "guest_rating", "location", "amenities"],
+    "nearby": ["name", "distance_km", "transport", "recommended_duration", "estimated_cost", "famous_for"]
+}
+
+# Fields dropped one at a time, in this order, while the prompt is over budget
+FIELD_DROP_ORDER = [
+    ("attractions", "description"),
+    ("hotels", "amenities"),
+    ("nearby", "famous_for"),
+    ("weather", "humidity"),
+    ("weather", "wind_speed"),
+    ("weather", "feels_like"),
+    ("hotels", "location"),
+    ("attractions", "rating"),
+    ("hotels", "guest_rating"),
+    ("nearby", "estimated_cost"),
+    ("weather", "day"),
+    ("nearby", "recommended_duration"),
+    ("attractions", "category"),
+    ("hotels", "total_price")
+]
+
+# Fields written once in the section header when every row has the same value
+SHARED_FIELDS = ("currency",)
+
+# Sections that give up rows after fields run out, with the rows always kept
+ROW_TRIM_ORDER = [("nearby", 2), ("hotels", 2), ("attractions", 3), ("weather", 1)]
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token), good enough for budgeting."""
+    return (len(text) + 3) // 4
+
+def _format_value(value) -> str:
+    """Render one cell without padding; lists become comma-separated."""
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{round(value, 2):g}"
+    if isinstance(value, (list, tuple)):
+        return ",".join(_format_value(v) for v in value)
+    return str(value).replace("|", "/").replace("\n", " ")
+
+def collect_tables(state):
+    """Rows and initial columns for every section that has data."""
+    tables = {}
+    for name, (_, field, key) in SECTIONS.items():
+        data = state.get(field) or {}
+        rows = [row for row in data.get(key, []) if isinstance(row, dict)]
+        if not rows:
+            continue
+        seen = {}
+        for row in rows:
+            for column in row:
+                seen.setdefault(column, None)
+        known = [column for column in SECTION_FIELDS[name] if column in seen]
+        extras = [column for column in seen if column not in SECTION_FIELDS[name]]
+        tables[name] = {"rows": rows, "columns": known, "extras": extras}
+    return tables
+
+def render_table(table) -> str:
+    """Serialize one section as a header line plus one pipe-separated line per row.
+
+    A shared field (like currency) with the same value in every row is
+    written once in the header instead.
+    """
+    rows = table["rows"]
+    columns = table["columns"] + table["extras"]
+    constants = {}
+    if len(rows) > 1:
+        for column in (c for c in columns if c in SHARED_FIELDS):
+            values = {_format_value(row.get(column)) for row in rows}
+            if len(values) == 1:
+                constants[column] = values.pop()
+    varying = [column for column in columns if column not in constants]
+
+    header = "|".join(varying)
+    if constants:
+        header += " (" + ", ".join(f"{k}={v}" for k, v in constants.items()) + ")"
+    lines = [header]
+    for row in rows:
+        lines.append("|".join(_format_value(row.get(column)) for column in varying))
+    return "\n".join(lines)
+
+def render_sections(tables):
+    """Return the serialized text for every section, 'No data' where empty."""
+    return {name: render_table(tables[name]) if name in tables else "No data" for name in SECTIONS}
+
+def _reductions(tables):
+    """Yield size reductions in order of least to most valuable content."""
+    for table in tables.values():
+        if table["extras"]:
+            yield lambda table=table: table["extras"].clear()
+    for name, column in FIELD_DROP_ORDER:
+        table = tables.get(name)
+        if table is not None and column in table["columns"]:
+            yield lambda table=table, column=column: table["columns"].remove(column)
+    for name, keep in ROW_TRIM_ORDER:
+        table = tables.get(name)
+        if table is None:
+            continue
+        for _ in range(len(table["rows"]) - keep):
+            yield lambda table=table: table["rows"].pop()
+
+def fit_to_budget(tables, render, token_budget):
+    """Shrink ``tables`` until ``render(tables)`` fits ``token_budget`` tokens.
+
+    ``token_budget`` of 0 or less disables trimming. Returns the final text;
+    it may still exceed the budget once nothing more can be dropped.
+    """
+    tables = {name: dict(table, rows=list(table["rows"]), columns=list(table["columns"]),
+                         extras=list(table["extras"])) for name, table in tables.items()}
+    text = render(tables)
+    if token_budget <= 0:
+        return text
+    for reduce in _reductions(tables):
+        if estimate_tokens(text) <= token_budget:
+            break
+        reduce()
+        text = render(tables)
+    return text
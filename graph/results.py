@@ -0,0 +1,90 @@
+"""Typed tool-result slots filled as each tool finishes.
+
+Every tool result is parsed once, where it is produced (the fast workflow's
+fetch nodes and the agent loop's ToolNode), and written to the
+``tool_results`` state slot under the tool's name (the destination profile
+fills the attractions, hotels and nearby places slots at once).
+process_results_node then reads the slots directly instead of rescanning and
+re-parsing the message history and guessing each message's type from its keys.
+"""
+
+import json
+
+# Tool name -> JSON type its successful result has
+RESULT_TYPES = {
+    "get_weather_info": dict,
+    "get_top_attractions": list,
+    "get_hotel_recommendations": list,
+    "convert_currency": dict,
+    "get_nearby_places": list,
+    "get_destination_profile": dict
+}
+
+# Tools whose result holds several sections: tool name -> {section: slot}
+SECTION_SLOTS = {
+    "get_destination_profile": {
+        "attractions": "get_top_attractions",
+        "hotels": "get_hotel_recommendations",
+        "nearby_places": "get_nearby_places"
+    }
+}
+
+def parse_tool_result(tool_name: str, content):
+    """Parsed result of a known tool, or None for errors, empty or malformed output."""
+    expected = RESULT_TYPES.get(tool_name)
+    if expected is None or not isinstance(content, str):
+        return None
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return None
+    if not isinstance(data, expected) or not data:
+        return None
+    first = data[0] if isinstance(data, list) else data
+    if isinstance(first, dict) and "error" in first:
+        return None
+    return data
+
+def tool_result_update(tool_name: str, content) -> dict:
+    """State update recording one tool result in its slot (empty when there is nothing to keep)."""
+    data = parse_tool_result(tool_name, content)
+    if data is None:
+        return {}
+    sections = SECTION_SLOTS.get(tool_name)
+    if sections is None:
+        return {"tool_results": {tool_name: data}}
+    # A multi-section result fills the same slots as the single-section tools
+    slots = {slot: data[section] for section, slot in sections.items() if data.get(section)}
+    return {"tool_results": slots} if slots else {}
+
+def recorded_result(tool_name: str, tool_results: dict):
+    """What ``tool_results`` holds for a tool's output, or None if nothing was recorded."""
+    sections = SECTION_SLOTS.get(tool_name)
+    if sections is None:
+        return tool_results.get(tool_name)
+    recorded = {section: tool_results.get(slot) for section, slot in sections.items()}
+    return recorded if all(v is not None for v in recorded.values()) else None
+
+def _with_result(message):
+    """Turn a ToolMessage into a Command that also fills the tool's slot."""
+    from langchain_core.messages import ToolMessage
+    from langgraph.types import Command
+
+    if not isinstance(message, ToolMessage):
+        return message
+    update = tool_result_update(message.name, message.content)
+    if not update:
+        return message
+    return Command(update={"messages": [message], **update})
+
+def slot_tool_call(wrapper):
+    """Wrap a ToolNode ``wrap_tool_call`` so each result is also written to its slot."""
+    def wrapped(request, execute):
+        return _with_result(wrapper(request, execute))
+    return wrapped
+
+def aslot_tool_call(wrapper):
+    """Async variant of ``slot_tool_call``."""
+    async def wrapped(request, execute):
+        return _with_result(await wrapper(request, execute))
+    return wrapped
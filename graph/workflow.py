@@ -1,25 +1,52 @@
 """Trip planner workflow graph."""
 
-from langgraph.graph import StateGraph, END
+import threading
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import StateGraph, START, END
 from langgraph.prebuilt import ToolNode
-from langgraph.checkpoint.memory import MemorySaver
 
-from models.schemas import TripPlannerState
-from tools.all_tools import all_tools
-from .nodes import agent_node, should_continue, process_results_node
-from .itinerary import create_itinerary_node, calculate_expenses_node
+from config.settings import settings
+from models.state import TripPlannerState
+from utils.metrics import node_duration, timed
+from .checkpoint import create_checkpointer
+from .memo import memo_tool_call, amemo_tool_call
+from .results import slot_tool_call, aslot_tool_call
+from tools.all_tools import planning_tools
+from .nodes import agent_node, aagent_node, should_continue, process_results_node, planning_fetch_nodes
+from .itinerary import create_itinerary_node, acreate_itinerary_node, calculate_expenses_node
 
-def create_workflow():
+def timed_node(name, node):
+    """Record the node's latency under its graph node name.
+    
+    Handles plain node functions and RunnableLambda nodes with sync and async
+    variants. The ToolNode is not wrapped; each tool records its own latency.
+    """
+    if not settings.METRICS_ENABLED:
+        return node
+    if isinstance(node, RunnableLambda):
+        afunc = getattr(node, "afunc", None)
+        return RunnableLambda(
+            timed(node_duration, name)(node.func),
+            afunc=timed(node_duration, name)(afunc) if afunc is not None else None,
+            name=node.name
+        )
+    return timed(node_duration, name)(node)
+
+def create_workflow(checkpointer_backend=None):
     """Create and compile the trip planner workflow."""
     # Build workflow
     workflow = StateGraph(TripPlannerState)
     
-    # Add nodes
-    workflow.add_node("agent", agent_node)
-    workflow.add_node("tools", ToolNode(all_tools))
-    workflow.add_node("process_results", process_results_node)
-    workflow.add_node("create_itinerary", create_itinerary_node)
-    workflow.add_node("calculate_expenses", calculate_expenses_node)
+    # Add nodes (LLM-bound nodes carry an async variant used by astream)
+    workflow.add_node("agent", timed_node("agent", RunnableLambda(agent_node, afunc=aagent_node, name="agent")))
+    workflow.add_node("tools", ToolNode(
+        planning_tools(),
+        wrap_tool_call=slot_tool_call(memo_tool_call),
+        awrap_tool_call=aslot_tool_call(amemo_tool_call)
+    ))
+    workflow.add_node("process_results", timed_node("process_results", process_results_node))
+    workflow.add_node("create_itinerary", timed_node("create_itinerary", RunnableLambda(create_itinerary_node, afunc=acreate_itinerary_node, name="create_itinerary")))
+    workflow.add_node("calculate_expenses", timed_node("calculate_expenses", calculate_expenses_node))
     
     # Set entry point
     workflow.set_entry_point("agent")
@@ -31,9 +58,57 @@ def create_workflow():
     workflow.add_edge("create_itinerary", "calculate_expenses")
     workflow.add_edge("calculate_expenses", END)
     
-    # Compile with memory
-    memory = MemorySaver()
-    return workflow.compile(checkpointer=memory)
+    # Compile with the configured checkpointer
+    return workflow.compile(checkpointer=create_checkpointer(checkpointer_backend or settings.CHECKPOINTER_BACKEND))
+
+def create_fast_workflow(checkpointer_backend=None):
+    """Create the fast workflow that fans out to all tools in parallel.
+    
+    Skips the agent loop: every data-gathering tool is called once, directly
+    from the trip fields, and the branches join at process_results.
+    """
+    workflow = StateGraph(TripPlannerState)
+    
+    # Fan out to every fetch node from the start, then join
+    fetch_nodes = planning_fetch_nodes()
+    for name, node in fetch_nodes.items():
+        workflow.add_node(name, timed_node(name, node))
+        workflow.add_edge(START, name)
+    workflow.add_node("process_results", timed_node("process_results", process_results_node))
+    workflow.add_node("create_itinerary", timed_node("create_itinerary", RunnableLambda(create_itinerary_node, afunc=acreate_itinerary_node, name="create_itinerary")))
+    workflow.add_node("calculate_expenses", timed_node("calculate_expenses", calculate_expenses_node))
+    
+    workflow.add_edge(list(fetch_nodes), "process_results")
+    workflow.add_edge("process_results", "create_itinerary")
+    workflow.add_edge("create_itinerary", "calculate_expenses")
+    workflow.add_edge("calculate_expenses", END)
+    
+    return workflow.compile(checkpointer=create_checkpointer(checkpointer_backend or settings.FAST_CHECKPOINTER_BACKEND))
+
+# Workflow builders by name; graphs are compiled on first use
+GRAPH_BUILDERS = {
+    "agentic": create_workflow,
+    "fast": create_fast_workflow
+}
+
+graphs = {}
+_graphs_lock = threading.Lock()
+
+def get_graph(name: str = "agentic"):
+    """Return the compiled workflow registered under the given name, compiling it on first use."""
+    graph = graphs.get(name)
+    if graph is None:
+        builder = GRAPH_BUILDERS[name]
+        with _graphs_lock:
+            graph = graphs.get(name)
+            if graph is None:
+                graph = graphs[name] = builder()
+    return graph
 
-# Create the compiled workflow
-app_graph = create_workflow()
\ No newline at end of file
+def __getattr__(name):
+    # app_graph and fast_graph used to be compiled at import time
+    if name == "app_graph":
+        return get_graph("agentic")
+    if name == "fast_graph":
+        return get_graph("fast")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
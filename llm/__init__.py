@@ -1,3 +1,9 @@
-from .config import llm, get_llm, get_llm_with_tools
+from .config import get_llm, get_llm_with_tools, shared_llm, shared_llm_with_tools, set_llm
 
-__all__ = ['llm', 'get_llm', 'get_llm_with_tools']
\ No newline at end of file
+def __getattr__(name):
+    # The shared ``llm`` instance is created on first access
+    if name == "llm":
+        return shared_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = ['llm', 'get_llm', 'get_llm_with_tools', 'shared_llm', 'shared_llm_with_tools', 'set_llm']
@@ -0,0 +1,60 @@
+"""Callback handler that records LLM latency, call counts and token usage."""
+
+import threading
+import time
+from langchain_core.callbacks import BaseCallbackHandler
+
+from utils.metrics import llm_calls, llm_duration, llm_tokens
+
+def _usage(response):
+    """Prompt and completion token counts from an LLM result, if reported."""
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+    return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Times every LLM run and counts its tokens in the shared metrics registry."""
+
+    # Record inline instead of in an executor; the work is a few dict updates
+    run_inline = True
+
+    def __init__(self):
+        self._runs = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id, serialized, metadata):
+        model = (metadata or {}).get("ls_model_name") or (serialized or {}).get("name") or "unknown"
+        with self._lock:
+            self._runs[run_id] = (model, time.perf_counter())
+
+    def _finish(self, run_id):
+        with self._lock:
+            model, started = self._runs.pop(run_id, ("unknown", None))
+        if started is not None:
+            llm_duration.observe(time.perf_counter() - started, model)
+        return model
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, serialized, metadata)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, serialized, metadata)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        model = self._finish(run_id)
+        llm_calls.inc(model, "ok")
+        prompt_tokens, completion_tokens = _usage(response)
+        if prompt_tokens:
+            llm_tokens.inc(model, "prompt", amount=prompt_tokens)
+        if completion_tokens:
+            llm_tokens.inc(model, "completion", amount=completion_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        model = self._finish(run_id)
+        llm_calls.inc(model, "error")
+
+metrics_handler = MetricsCallbackHandler()
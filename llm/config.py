@@ -1,19 +1,119 @@
-"""LLM configuration and initialization."""
+"""LLM configuration and initialization.
 
-from langchain_groq import ChatGroq
+The shared LLM instance is built on first use (or by the API startup hook)
+rather than at import, so importing the API does not load the Groq client.
+"""
+
+import threading
 from config.settings import settings
 
-def get_llm():
-    """Initialize and return the LLM instance."""
+_llm = None
+_llm_with_tools = {}
+_llm_lock = threading.Lock()
+
+def _chat_groq(model: str):
+    from langchain_groq import ChatGroq
+
     return ChatGroq(
-        model=settings.LLM_MODEL,
-        temperature=settings.LLM_TEMPERATURE
+        model=model,
+        temperature=settings.LLM_TEMPERATURE,
+        timeout=settings.LLM_REQUEST_TIMEOUT
+    )
+
+def get_llm():
+    """Initialize and return the LLM instance.
+
+    With a fallback model or a hedge delay configured, calls are routed
+    across the models by ``llm.router.RoutedChatModel``.
+    """
+    llm = _chat_groq(settings.LLM_MODEL)
+    if not settings.LLM_FALLBACK_MODEL and not settings.LLM_HEDGE_DELAY:
+        return llm
+    from .router import RoutedChatModel
+
+    models = [llm]
+    if settings.LLM_FALLBACK_MODEL:
+        models.append(_chat_groq(settings.LLM_FALLBACK_MODEL))
+    return RoutedChatModel(
+        models=models,
+        hedge_delay=settings.LLM_HEDGE_DELAY,
+        timeout=settings.LLM_REQUEST_TIMEOUT
     )
 
+def _with_limits(llm):
+    """Put ``llm`` behind the process-wide rate limiter.
+
+    A routed model gets a limiter on each of its models instead, so every
+    attempt (hedges included) is charged and a 429 reaches the limiter
+    before the router falls back. When there is another model to fall back
+    to, the routed models leave retrying to the router.
+    """
+    if not settings.LLM_RATE_LIMIT_ENABLED:
+        return llm
+    from .ratelimit import RateLimitedChatModel, shared_rate_limiter
+    from .router import RoutedChatModel, model_name
+
+    if isinstance(llm, RoutedChatModel):
+        retries = 0 if len(set(llm.names)) > 1 else settings.LLM_RATE_LIMIT_RETRIES
+        return llm.model_copy(update={"models": [
+            RateLimitedChatModel(model=model, limiter=shared_rate_limiter(name), max_retries=retries)
+            for model, name in zip(llm.models, llm.names)
+        ]})
+    return RateLimitedChatModel(
+        model=llm,
+        limiter=shared_rate_limiter(model_name(llm)),
+        max_retries=settings.LLM_RATE_LIMIT_RETRIES
+    )
+
+def _with_metrics(llm):
+    """Attach the metrics callback so every call on ``llm`` is timed and its tokens counted."""
+    if not settings.METRICS_ENABLED:
+        return llm
+    from .callbacks import metrics_handler
+
+    callbacks = llm.callbacks or []
+    if metrics_handler not in callbacks:
+        llm.callbacks = [*callbacks, metrics_handler]
+    return llm
+
 def get_llm_with_tools(tools):
     """Get LLM instance with tools bound."""
     llm = get_llm()
     return llm.bind_tools(tools)
 
-# Global LLM instance
-llm = get_llm()
\ No newline at end of file
+def shared_llm():
+    """Return the process-wide LLM instance, creating it on first use.
+
+    Every call on it goes through the rate limiter (``llm.ratelimit``).
+    """
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                _llm = _with_metrics(_with_limits(get_llm()))
+    return _llm
+
+def shared_llm_with_tools(tools):
+    """Return the shared LLM with ``tools`` bound, binding once per tool set."""
+    key = tuple(tool.name for tool in tools)
+    bound = _llm_with_tools.get(key)
+    if bound is None:
+        llm = shared_llm()
+        with _llm_lock:
+            bound = _llm_with_tools.get(key)
+            if bound is None:
+                bound = _llm_with_tools[key] = llm.bind_tools(tools)
+    return bound
+
+def set_llm(llm):
+    """Replace the shared LLM instance, e.g. with a stand-in model for benchmarks."""
+    global _llm
+    with _llm_lock:
+        _llm = _with_metrics(_with_limits(llm))
+        _llm_with_tools.clear()
+
+def __getattr__(name):
+    # ``llm`` used to be created at import time; it is still available, lazily
+    if name == "llm":
+        return shared_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
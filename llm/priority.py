@@ -0,0 +1,31 @@
+"""Priority of the LLM calls made by the current request.
+
+The rate limiter serves waiting calls in priority order, so an interactive
+plan is not stuck behind standalone tool lookups or background work. The
+priority lives in a context variable: set it once around a request and every
+LLM call it makes, in any task or worker thread started from it, inherits it.
+"""
+
+import contextlib
+from contextvars import ContextVar
+
+INTERACTIVE = 0   # /plan-trip, /plan-trip/stream and batches a client waits on
+TOOLS = 1         # Standalone tool endpoints
+BACKGROUND = 2    # Queued plans and prewarming
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", TOOLS: "tools", BACKGROUND: "background"}
+
+_priority = ContextVar("llm_priority", default=INTERACTIVE)
+
+def current_priority() -> int:
+    """Priority of LLM calls made from the current context."""
+    return _priority.get()
+
+@contextlib.contextmanager
+def llm_priority(level: int):
+    """Run the enclosed block's LLM calls at ``level``."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
@@ -0,0 +1,424 @@
+"""Process-wide rate limiting for LLM calls.
+
+Every call on the shared LLM first takes a permit from its model's limiter
+(providers budget each model separately):
+
+- Requests-per-minute and tokens-per-minute token buckets pace calls to the
+  provider's limits, refilling continuously with at most ``BURST_SECONDS``
+  of burst. A call is charged its estimated prompt tokens plus the average
+  completion seen so far, then settled against the reported usage.
+- Waiting calls are served in priority order (see ``llm.priority``), first
+  come first served within a priority.
+- An AIMD concurrency limit tunes itself: it grows by one call per round
+  trip while latency stays near its baseline, shrinks by 10% when latency
+  climbs to ``LATENCY_FACTOR`` times the baseline, and halves on a 429.
+  A 429 also empties the buckets and pauses dispatch for any Retry-After.
+
+A call rejected with 429 waits for a new permit and is retried, so a
+throttled burst slows down instead of failing whole plans. Behind a router
+each routed model has its own limiter, and the router's fallback does the
+retrying.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from config.settings import settings
+from utils.metrics import registry, llm_queue_wait, llm_throttled
+from .priority import PRIORITY_NAMES, current_priority
+from .router import model_name, status_code
+
+# Largest burst the buckets allow, in seconds of refill
+BURST_SECONDS = 10
+# Latency over this multiple of the baseline counts as provider overload
+LATENCY_FACTOR = 2.0
+# Longest a waiter sleeps before re-checking the buckets
+MAX_POLL_SECONDS = 1.0
+# Pause after a 429 that carries no Retry-After
+DEFAULT_RETRY_AFTER = 1.0
+
+def is_throttled(error) -> bool:
+    """Whether ``error`` is the provider rejecting a call for exceeding its rate limit."""
+    return status_code(error) == 429
+
+def _retry_after(error) -> float:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", DEFAULT_RETRY_AFTER))
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+def estimate_prompt_tokens(messages) -> int:
+    """Rough prompt size (about four characters per token)."""
+    text = sum(len(m.content if isinstance(m.content, str) else str(m.content)) for m in messages)
+    return (text + 3) // 4
+
+class TokenBucket:
+    """Continuously refilling budget of ``per_minute`` units; 0 means unlimited.
+
+    Not locked; the limiter calls it under its own lock.
+    """
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, self.rate * BURST_SECONDS)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` (capped at the burst size) is available."""
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        return 0.0 if self.level >= needed else (needed - self.level) / self.rate
+
+    def take(self, amount: float):
+        """Spend ``amount``; a negative amount refunds an over-estimate. The level may go below zero."""
+        if self.rate:
+            self.level = min(self.capacity, self.level - amount)
+
+    def drain(self):
+        if self.rate:
+            self.level = min(self.level, 0.0)
+
+class AdaptiveConcurrency:
+    """AIMD limit on concurrent calls, driven by 429s and latency.
+
+    Latency is compared with a baseline per output-size class (powers of two
+    of completion tokens), so a long itinerary is not mistaken for overload.
+    The limit is cut at most once per round trip.
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1):
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.limit = float(self.maximum)
+        self._baselines = {}
+        self._ratio = 1.0
+        self._round_trip = 0.0
+        self._last_cut = 0.0
+
+    def _cut(self, factor, now):
+        if now - self._last_cut >= self._round_trip:
+            self.limit = max(self.minimum, self.limit * factor)
+            self._last_cut = now
+
+    def on_success(self, seconds: float, completion_tokens: int, now: float):
+        size = int(completion_tokens or 0).bit_length()
+        baseline = self._baselines.get(size)
+        # The baseline follows the fastest calls and drifts up slowly if the provider gets slower for good
+        baseline = seconds if baseline is None or seconds < baseline else baseline + 0.01 * (seconds - baseline)
+        self._baselines[size] = baseline
+        self._ratio += 0.2 * (seconds / max(baseline, 1e-3) - self._ratio)
+        self._round_trip += 0.2 * (seconds - self._round_trip)
+        if self._ratio > LATENCY_FACTOR:
+            self._cut(0.9, now)
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def on_throttle(self, now: float):
+        self._cut(0.5, now)
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "tokens", "granted", "cancelled", "_wake")
+
+    def __init__(self, priority, seq, tokens, wake):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.granted = False
+        self.cancelled = False
+        self._wake = wake
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def grant(self):
+        self.granted = True
+        self._wake()
+
+class Permit:
+    """One admitted call: the tokens it was charged and when it started."""
+    __slots__ = ("tokens", "started")
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.started = time.perf_counter()
+
+class LLMRateLimiter:
+    """Admits LLM calls under RPM/TPM budgets and an adaptive concurrency limit.
+
+    Usable from both event loops and worker threads.
+    """
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 max_concurrency: int = 16, min_concurrency: int = 1):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.concurrency = AdaptiveConcurrency(max_concurrency, min_concurrency)
+        self.in_flight = 0
+        self._completion_tokens = 256.0
+        self._paused_until = 0.0
+        self._waiters = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _dispatch(self) -> float:
+        """Grant permits in priority order while capacity allows.
+
+        Returns how long the first waiter must wait for the buckets, or
+        MAX_POLL_SECONDS when it is waiting on a concurrency slot.
+        """
+        now = time.monotonic()
+        while self._waiters:
+            waiter = self._waiters[0]
+            if waiter.cancelled:
+                heapq.heappop(self._waiters)
+                continue
+            if self.in_flight >= int(self.concurrency.limit):
+                return MAX_POLL_SECONDS
+            delay = max(self._paused_until - now, self.requests.wait_time(1, now), self.tokens.wait_time(waiter.tokens, now))
+            if delay > 0:
+                return min(delay, MAX_POLL_SECONDS)
+            heapq.heappop(self._waiters)
+            self.requests.take(1)
+            self.tokens.take(waiter.tokens)
+            self.in_flight += 1
+            waiter.grant()
+        return MAX_POLL_SECONDS
+
+    def _enqueue(self, prompt_tokens, wake):
+        tokens = prompt_tokens + int(self._completion_tokens)
+        waiter = _Waiter(current_priority(), next(self._seq), tokens, wake)
+        heapq.heappush(self._waiters, waiter)
+        return waiter
+
+    def _abandon(self, waiter):
+        """Forget a waiter whose caller gave up, returning its permit if it got one."""
+        with self._lock:
+            if waiter.granted:
+                self.in_flight -= 1
+                self.tokens.take(-waiter.tokens)
+            else:
+                waiter.cancelled = True
+            self._dispatch()
+
+    def _admitted(self, waiter, waited):
+        llm_queue_wait.observe(waited, PRIORITY_NAMES.get(waiter.priority, str(waiter.priority)))
+        return Permit(waiter.tokens)
+
+    async def acquire(self, prompt_tokens: int = 0) -> Permit:
+        """Wait for a permit at the current context's priority."""
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        started = time.perf_counter()
+        with self._lock:
+            waiter = self._enqueue(prompt_tokens, lambda: loop.call_soon_threadsafe(event.set))
+            delay = self._dispatch()
+        try:
+            while not waiter.granted:
+                try:
+                    await asyncio.wait_for(event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                with self._lock:
+                    delay = self._dispatch()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        return self._admitted(waiter, time.perf_counter() - started)
+
+    def acquire_blocking(self, prompt_tokens: int = 0) -> Permit:
+        """Blocking variant of ``acquire`` for calls made from worker threads."""
+        event = threading.Event()
+        started = time.perf_counter()
+        with self._lock:
+            waiter = self._enqueue(prompt_tokens, event.set)
+            delay = self._dispatch()
+        try:
+            while not waiter.granted:
+                event.wait(delay)
+                with self._lock:
+                    delay = self._dispatch()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        return self._admitted(waiter, time.perf_counter() - started)
+
+    def release(self, permit: Permit, usage=None, error=None) -> bool:
+        """Return a permit, settling its tokens against ``usage``.
+
+        Returns True when the call was throttled (429) and may be retried.
+        """
+        seconds = time.perf_counter() - permit.started
+        now = time.monotonic()
+        throttled = error is not None and is_throttled(error)
+        with self._lock:
+            self.in_flight -= 1
+            if usage:
+                completion = usage.get("output_tokens", 0)
+                self.tokens.take(usage.get("input_tokens", 0) + completion - permit.tokens)
+                self._completion_tokens += 0.2 * (completion - self._completion_tokens)
+            if throttled:
+                self.concurrency.on_throttle(now)
+                self.requests.drain()
+                self.tokens.drain()
+                self._paused_until = max(self._paused_until, now + _retry_after(error))
+            elif error is None:
+                self.concurrency.on_success(seconds, (usage or {}).get("output_tokens", 0), now)
+            self._dispatch()
+        return throttled
+
+    def stats(self) -> dict:
+        with self._lock:
+            queued = {}
+            for waiter in self._waiters:
+                if not waiter.cancelled:
+                    name = PRIORITY_NAMES.get(waiter.priority, str(waiter.priority))
+                    queued[name] = queued.get(name, 0) + 1
+            return {
+                "concurrency_limit": round(self.concurrency.limit, 2),
+                "in_flight": self.in_flight,
+                "queued": queued
+            }
+
+def _usage(message):
+    return getattr(message, "usage_metadata", None)
+
+class RateLimitedChatModel(BaseChatModel):
+    """Chat model that takes a permit from ``limiter`` for every call on ``model``.
+
+    A call rejected with 429 is retried up to ``max_retries`` times, each
+    time waiting for a new permit. ``bind_tools`` binds the wrapped model.
+    """
+
+    model: Any
+    limiter: Any
+    max_retries: int = 2
+    model_name: str = "rate-limited"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.model_name = model_name(self.model)
+
+    @property
+    def _llm_type(self):
+        return "rate-limited"
+
+    @property
+    def _identifying_params(self):
+        return {"model": self.model_name}
+
+    def bind_tools(self, tools, **kwargs):
+        return self.model_copy(update={"model": self.model.bind_tools(tools, **kwargs)})
+
+    def _should_retry(self, permit, attempt, error) -> bool:
+        """Return a failed call's permit; True if it was throttled and has retries left."""
+        if not self.limiter.release(permit, error=error):
+            return False
+        retry = attempt < self.max_retries
+        llm_throttled.inc("retried" if retry else "failed")
+        return retry
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt_tokens = estimate_prompt_tokens(messages)
+        for attempt in range(self.max_retries + 1):
+            permit = await self.limiter.acquire(prompt_tokens)
+            try:
+                # Detached from the caller's callbacks, which this run already reports
+                message = await self.model.ainvoke(messages, {"callbacks": []}, stop=stop, **kwargs)
+            except Exception as e:
+                if self._should_retry(permit, attempt, e):
+                    continue
+                raise
+            except BaseException as e:
+                self.limiter.release(permit, error=e)
+                raise
+            self.limiter.release(permit, _usage(message))
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt_tokens = estimate_prompt_tokens(messages)
+        for attempt in range(self.max_retries + 1):
+            permit = self.limiter.acquire_blocking(prompt_tokens)
+            try:
+                message = self.model.invoke(messages, {"callbacks": []}, stop=stop, **kwargs)
+            except Exception as e:
+                if self._should_retry(permit, attempt, e):
+                    continue
+                raise
+            except BaseException as e:
+                self.limiter.release(permit, error=e)
+                raise
+            self.limiter.release(permit, _usage(message))
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        """Stream under one permit; a 429 is retried only before the first chunk."""
+        prompt_tokens = estimate_prompt_tokens(messages)
+        for attempt in range(self.max_retries + 1):
+            permit = await self.limiter.acquire(prompt_tokens)
+            streamed = False
+            usage = None
+            try:
+                async for chunk in self.model.astream(messages, {"callbacks": []}, stop=stop, **kwargs):
+                    streamed = True
+                    usage = _usage(chunk) or usage
+                    yield ChatGenerationChunk(message=chunk)
+            except Exception as e:
+                if not streamed and self._should_retry(permit, attempt, e):
+                    continue
+                if streamed:
+                    self.limiter.release(permit, usage, e)
+                raise
+            except BaseException as e:
+                # Cancelled, or the consumer stopped reading
+                self.limiter.release(permit, usage, e)
+                raise
+            self.limiter.release(permit, usage)
+            return
+
+def _limiter_families():
+    stats = {model: limiter.stats() for model, limiter in sorted(rate_limiters.items())}
+    if not stats:
+        return []
+    return [
+        ("trip_planner_llm_concurrency_limit", "gauge", "Adaptive limit on concurrent LLM calls",
+         [({"model": model}, s["concurrency_limit"]) for model, s in stats.items()]),
+        ("trip_planner_llm_in_flight", "gauge", "LLM calls holding a rate-limiter permit",
+         [({"model": model}, s["in_flight"]) for model, s in stats.items()]),
+        ("trip_planner_llm_queued", "gauge", "LLM calls waiting for a permit, by priority",
+         [({"model": model, "priority": name}, count)
+          for model, s in stats.items() for name, count in sorted(s["queued"].items())])
+    ]
+
+# Process-wide limiters by model name, created with the shared LLM
+rate_limiters = {}
+_limiters_lock = threading.Lock()
+
+def shared_rate_limiter(model: str = "") -> LLMRateLimiter:
+    """Return the process-wide limiter for ``model``, creating it from the settings on first use."""
+    with _limiters_lock:
+        limiter = rate_limiters.get(model)
+        if limiter is None:
+            limiter = rate_limiters[model] = LLMRateLimiter(
+                requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+                tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+                max_concurrency=settings.LLM_MAX_CONCURRENCY,
+                min_concurrency=settings.LLM_MIN_CONCURRENCY
+            )
+        return limiter
+
+registry.register_collector(_limiter_families)
@@ -0,0 +1,316 @@
+"""Latency-aware routing over several chat models, with hedging and fallback.
+
+RoutedChatModel is a chat model that forwards each call to one of its
+``models``. Candidates are tried fastest first by a moving average of their
+observed latency; models without a measurement yet keep their configured
+order after the measured ones. A call that has not answered within
+``hedge_delay`` seconds gets a duplicate request on the next candidate (or
+the same model when there is only one), and the first answer wins. A
+timeout, 429 or 5xx moves on to the next candidate straight away.
+
+Any chat models can be routed, including local fakes, so the policy can be
+exercised offline.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from utils.metrics import registry, llm_route_events as route_events
+
+# Routed models run without the caller's callbacks, which the router's own run
+# already reports; inheriting them would stream every token twice
+_DETACHED = {"callbacks": []}
+
+# Shared worker threads for hedged calls on the blocking path
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
+
+def status_code(error):
+    """HTTP status of an API error, if it carries one."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+def is_retriable(error) -> bool:
+    """Whether another model should be tried after ``error`` (timeout, 429 or 5xx)."""
+    if isinstance(error, TimeoutError) or "Timeout" in type(error).__name__:
+        return True
+    status = status_code(error)
+    return status is not None and (status == 429 or status >= 500)
+
+class LatencyTracker:
+    """Exponentially weighted moving average of latency per model."""
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self._estimates = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            previous = self._estimates.get(name)
+            self._estimates[name] = seconds if previous is None else previous + self.alpha * (seconds - previous)
+
+    def estimate(self, name: str):
+        return self._estimates.get(name)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._estimates)
+
+# Estimates shared by every router unless one is given its own tracker
+latency_tracker = LatencyTracker()
+
+def model_name(model) -> str:
+    """Display name of a (possibly tool-bound) chat model."""
+    bound = getattr(model, "bound", model)
+    return getattr(bound, "model_name", None) or getattr(bound, "model", None) or type(bound).__name__
+
+class RoutedChatModel(BaseChatModel):
+    """Chat model routing each call across ``models`` with hedging and fallback.
+
+    ``hedge_delay`` of 0 disables hedging. ``timeout`` bounds every async
+    attempt; blocking calls rely on the routed client's own timeout.
+    ``bind_tools`` binds the tools on every routed model.
+    """
+
+    models: List[Any]
+    names: List[str] = []
+    hedge_delay: float = 0.0
+    timeout: Optional[float] = None
+    tracker: Any = None
+    model_name: str = "routed"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        if not self.names:
+            self.names = [model_name(m) for m in self.models]
+        if self.tracker is None:
+            self.tracker = latency_tracker
+        self.model_name = "|".join(dict.fromkeys(self.names))
+
+    @property
+    def _llm_type(self):
+        return "routed"
+
+    @property
+    def _identifying_params(self):
+        return {"models": self.names, "hedge_delay": self.hedge_delay, "timeout": self.timeout}
+
+    def bind_tools(self, tools, **kwargs):
+        return self.model_copy(update={"models": [m.bind_tools(tools, **kwargs) for m in self.models]})
+
+    def _attempts(self):
+        """Candidate indexes in the order they are tried."""
+        order = sorted(range(len(self.models)), key=lambda i: (
+            self.tracker.estimate(self.names[i]) is None, self.tracker.estimate(self.names[i]) or 0))
+        if self.hedge_delay and len(order) == 1:
+            # A lone model is hedged against itself
+            order = order * 2
+        return order
+
+    def _record(self, index, started, error=None):
+        name = self.names[index]
+        if error is None:
+            self.tracker.observe(name, time.perf_counter() - started)
+            route_events.inc(name, "ok")
+        elif isinstance(error, TimeoutError) or "Timeout" in type(error).__name__:
+            # Count a timeout as at least the time spent, so slow models lose priority
+            self.tracker.observe(name, max(time.perf_counter() - started, self.timeout or 0))
+            route_events.inc(name, "timeout")
+        else:
+            route_events.inc(name, "error")
+
+    async def _acall(self, index, messages, stop, kwargs):
+        started = time.perf_counter()
+        try:
+            call = self.models[index].ainvoke(messages, _DETACHED, stop=stop, **kwargs)
+            message = await (asyncio.wait_for(call, self.timeout) if self.timeout else call)
+        except Exception as e:
+            self._record(index, started, e)
+            raise
+        self._record(index, started)
+        return message
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        attempts = self._attempts()
+        position = 0
+        pending = {}
+        last_error = None
+        hedged = False
+
+        def launch():
+            nonlocal position
+            index = attempts[position]
+            position += 1
+            pending[asyncio.ensure_future(self._acall(index, messages, stop, kwargs))] = index
+
+        launch()
+        try:
+            while pending:
+                can_hedge = self.hedge_delay and not hedged and position < len(attempts)
+                done, _ = await asyncio.wait(
+                    pending, timeout=self.hedge_delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedged = True
+                    route_events.inc(self.names[attempts[position]], "hedged")
+                    launch()
+                    continue
+                for task in done:
+                    pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        return ChatResult(generations=[ChatGeneration(message=task.result())])
+                    last_error = error
+                    if is_retriable(error) and not pending and position < len(attempts):
+                        route_events.inc(self.names[attempts[position]], "fallback")
+                        launch()
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _call(self, index, messages, stop, kwargs):
+        started = time.perf_counter()
+        try:
+            message = self.models[index].invoke(messages, _DETACHED, stop=stop, **kwargs)
+        except Exception as e:
+            self._record(index, started, e)
+            raise
+        self._record(index, started)
+        return message
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        attempts = self._attempts()
+        position = 0
+        pending = {}
+        last_error = None
+        hedged = False
+
+        def launch():
+            nonlocal position
+            index = attempts[position]
+            position += 1
+            # Run in a copy of the caller's context so the call keeps its LLM priority
+            pending[_executor.submit(contextvars.copy_context().run, self._call, index, messages, stop, kwargs)] = index
+
+        launch()
+        while pending:
+            can_hedge = self.hedge_delay and not hedged and position < len(attempts)
+            done, _ = concurrent.futures.wait(
+                pending, timeout=self.hedge_delay if can_hedge else None,
+                return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            if not done:
+                hedged = True
+                route_events.inc(self.names[attempts[position]], "hedged")
+                launch()
+                continue
+            for future in done:
+                pending.pop(future)
+                error = future.exception()
+                if error is None:
+                    # Blocking calls cannot be cancelled; a losing hedge finishes in the background
+                    return ChatResult(generations=[ChatGeneration(message=future.result())])
+                last_error = error
+                if is_retriable(error) and not pending and position < len(attempts):
+                    route_events.inc(self.names[attempts[position]], "fallback")
+                    launch()
+        raise last_error
+
+    async def _aclose(self, streams):
+        """Close streams that will not be read any further."""
+        for stream in streams:
+            close = getattr(stream, "aclose", None)
+            if close is not None:
+                try:
+                    await close()
+                except Exception:
+                    pass
+
+    async def _first_chunk(self, stream):
+        first = anext(stream, None)
+        return await (asyncio.wait_for(first, self.timeout) if self.timeout else first)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        """Stream from whichever candidate sends the first chunk.
+
+        Hedging and fallback apply until a first chunk arrives; after that
+        the stream is committed to its model. Every other stream is closed
+        once the race is decided, and the winner once it ends.
+        """
+        attempts = self._attempts()
+        position = 0
+        pending = {}
+        streams = []
+        last_error = None
+        hedged = False
+        winner = None
+
+        def launch():
+            nonlocal position
+            index = attempts[position]
+            position += 1
+            stream = aiter(self.models[index].astream(messages, _DETACHED, stop=stop, **kwargs))
+            streams.append(stream)
+            pending[asyncio.ensure_future(self._first_chunk(stream))] = (index, stream, time.perf_counter())
+
+        launch()
+        try:
+            while pending and winner is None:
+                can_hedge = self.hedge_delay and not hedged and position < len(attempts)
+                done, _ = await asyncio.wait(
+                    pending, timeout=self.hedge_delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedged = True
+                    route_events.inc(self.names[attempts[position]], "hedged")
+                    launch()
+                    continue
+                for task in done:
+                    index, stream, started = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        winner = (task.result(), index, stream, started)
+                        break
+                    self._record(index, started, error)
+                    last_error = error
+                    if is_retriable(error) and not pending and position < len(attempts):
+                        route_events.inc(self.names[attempts[position]], "fallback")
+                        launch()
+        finally:
+            for task in pending:
+                task.cancel()
+            # A stream cannot be closed while its first-chunk read is running
+            await asyncio.gather(*pending, return_exceptions=True)
+            await self._aclose([s for s in streams if winner is None or s is not winner[2]])
+        if winner is None:
+            raise last_error
+
+        chunk, index, stream, started = winner
+        try:
+            while chunk is not None:
+                yield ChatGenerationChunk(message=chunk)
+                chunk = await anext(stream, None)
+        except Exception as e:
+            self._record(index, started, e)
+            raise
+        finally:
+            await self._aclose([stream])
+        self._record(index, started)
+
+def _route_families():
+    samples = [({"model": name}, round(seconds, 4)) for name, seconds in sorted(latency_tracker.snapshot().items())]
+    return [("trip_planner_llm_route_latency_seconds", "gauge", "Moving-average latency the router uses per model", samples)]
+
+registry.register_collector(_route_families)
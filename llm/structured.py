@@ -0,0 +1,112 @@
+"""Schema-validated JSON output for the LLM-backed tools.
+
+Each request asks the model for a JSON object (``{"items": [...]}`` for the
+single-section tools), constrained by the provider's structured-output mode
+(``LLM_STRUCTURED_OUTPUT``), and the reply is validated against a Pydantic
+model. A reply that does not validate gets one short repair request that
+sends back the bad JSON and the validation error, instead of a rerun of the
+whole plan.
+"""
+
+import json
+import re
+from pydantic import ValidationError
+
+from config.settings import settings
+from utils.metrics import structured_outputs
+from .config import shared_llm
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+class StructuredOutputError(ValueError):
+    """The model's reply did not validate, even after the repair attempt."""
+
+def response_format(model):
+    """Provider ``response_format`` for ``model``, or None when disabled."""
+    mode = settings.LLM_STRUCTURED_OUTPUT
+    if mode == "json_schema":
+        return {"type": "json_schema", "json_schema": {"name": model.__name__, "schema": model.model_json_schema()}}
+    if mode == "json_object":
+        return {"type": "json_object"}
+    return None
+
+def _structured_llm(model):
+    llm = shared_llm()
+    format_ = response_format(model)
+    return llm.bind(response_format=format_) if format_ else llm
+
+def content_text(content) -> str:
+    """Reply content as a string, joining the text blocks of a content-block list."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block if isinstance(block, str) else block.get("text", "")
+        for block in content
+        if isinstance(block, str) or block.get("type") == "text"
+    )
+
+def parse_output(model, content):
+    """Validate a reply against ``model``; for item lists a bare JSON array is accepted too."""
+    data = json.loads(_CODE_FENCE.sub("", content_text(content).strip()))
+    if isinstance(data, list) and "items" in model.model_fields:
+        data = {"items": data}
+    return model.model_validate(data)
+
+def _error_summary(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors()[:5])
+    return str(error)
+
+def repair_prompt(text: str, error: Exception) -> str:
+    """Short prompt asking the model to fix its own invalid JSON."""
+    return f"""This JSON does not match the required format.
+Errors: {_error_summary(error)}
+
+{text}
+
+Return ONLY the corrected JSON object, keeping the same entries."""
+
+def structured_output(tool_name: str, model, prompt: str):
+    """Ask for a ``model`` object, repairing an invalid reply once."""
+    llm = _structured_llm(model)
+    text = content_text(llm.invoke(prompt).content)
+    try:
+        result = parse_output(model, text)
+        structured_outputs.inc(tool_name, "valid")
+        return result
+    except ValueError as e:
+        error = e
+    try:
+        result = parse_output(model, llm.invoke(repair_prompt(text, error)).content)
+        structured_outputs.inc(tool_name, "repaired")
+        return result
+    except ValueError as e:
+        structured_outputs.inc(tool_name, "failed")
+        raise StructuredOutputError(f"Invalid {tool_name} output: {_error_summary(e)}") from e
+
+async def astructured_output(tool_name: str, model, prompt: str):
+    """Async variant of ``structured_output``."""
+    llm = _structured_llm(model)
+    text = content_text((await llm.ainvoke(prompt)).content)
+    try:
+        result = parse_output(model, text)
+        structured_outputs.inc(tool_name, "valid")
+        return result
+    except ValueError as e:
+        error = e
+    try:
+        result = parse_output(model, (await llm.ainvoke(repair_prompt(text, error))).content)
+        structured_outputs.inc(tool_name, "repaired")
+        return result
+    except ValueError as e:
+        structured_outputs.inc(tool_name, "failed")
+        raise StructuredOutputError(f"Invalid {tool_name} output: {_error_summary(e)}") from e
+
+def structured_items(tool_name: str, list_model, prompt: str):
+    """Items of a ``list_model`` reply as plain dicts."""
+    return [item.model_dump(mode="json") for item in structured_output(tool_name, list_model, prompt).items]
+
+async def astructured_items(tool_name: str, list_model, prompt: str):
+    """Async variant of ``structured_items``."""
+    result = await astructured_output(tool_name, list_model, prompt)
+    return [item.model_dump(mode="json") for item in result.items]
@@ -1,11 +1,21 @@
 from .schemas import (
-    TripRequest, WeatherRequest, AttractionRequest,
+    TripRequest, BatchTripRequest, WeatherRequest, AttractionRequest,
     HotelRequest, CurrencyRequest, NearbyPlacesRequest,
-    TripPlannerState
+    BulkExportRequest
 )
+from .places import Attraction, Hotel, NearbyPlace, AttractionList, HotelList, NearbyPlaceList, DestinationProfile
+
+def __getattr__(name):
+    # TripPlannerState pulls in LangGraph, so it is only imported when used
+    if name == "TripPlannerState":
+        from .state import TripPlannerState
+        return TripPlannerState
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
-    'TripRequest', 'WeatherRequest', 'AttractionRequest',
+    'TripRequest', 'BatchTripRequest', 'WeatherRequest', 'AttractionRequest',
     'HotelRequest', 'CurrencyRequest', 'NearbyPlacesRequest',
-    'TripPlannerState'
-]
\ No newline at end of file
+    'BulkExportRequest', 'TripPlannerState',
+    'Attraction', 'Hotel', 'NearbyPlace', 'AttractionList', 'HotelList', 'NearbyPlaceList',
+    'DestinationProfile'
+]
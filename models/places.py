@@ -0,0 +1,46 @@
+"""Pydantic models for the items LLM-backed tools return."""
+
+from pydantic import BaseModel, Field
+from typing import List, Optional, Union
+
+class Attraction(BaseModel):
+    name: str = Field(..., description="Attraction name")
+    description: str = Field(default="", description="Brief description (1 sentence)")
+    category: str = Field(default="", description="Type (Museum, Park, Monument, etc.)")
+    ticket_price: float = Field(default=0, ge=0, description="Estimated ticket price in local currency, 0 if free")
+    currency: str = Field(default="USD", description="Currency code (USD, EUR, INR, etc.)")
+    duration: str = Field(default="", description='Recommended visit time (e.g., "2 hours", "Half day")')
+    rating: Optional[float] = Field(default=None, ge=0, le=5, description="Tourist rating out of 5")
+
+class Hotel(BaseModel):
+    name: str = Field(..., description="Hotel name")
+    star_rating: Optional[float] = Field(default=None, ge=0, le=5, description="Star rating")
+    price_per_night: float = Field(..., ge=0, description="Price per night")
+    currency: str = Field(default="USD", description="Currency code")
+    guest_rating: Optional[float] = Field(default=None, ge=0, le=10, description="Guest rating")
+    amenities: List[str] = Field(default_factory=list, description="Amenities")
+    location: str = Field(default="", description="Neighbourhood or address")
+    total_price: float = Field(..., ge=0, description="Price for the whole stay")
+
+class NearbyPlace(BaseModel):
+    name: str = Field(..., description="City or place name")
+    distance_km: float = Field(..., ge=0, description="Distance in kilometres")
+    transport: str = Field(default="", description="How to get there")
+    famous_for: str = Field(default="", description="What it is known for")
+    recommended_duration: str = Field(default="", description="Time to spend there")
+    estimated_cost: Union[float, str] = Field(default="", description="Estimated cost of the trip")
+
+class AttractionList(BaseModel):
+    items: List[Attraction] = Field(..., min_length=1)
+
+class HotelList(BaseModel):
+    items: List[Hotel] = Field(..., min_length=1)
+
+class NearbyPlaceList(BaseModel):
+    items: List[NearbyPlace] = Field(..., min_length=1)
+
+class DestinationProfile(BaseModel):
+    """Attractions, hotels and nearby places for one city, from a single LLM call."""
+    attractions: List[Attraction] = Field(..., min_length=1)
+    hotels: List[Hotel] = Field(..., min_length=1)
+    nearby_places: List[NearbyPlace] = Field(..., min_length=1)
@@ -1,8 +1,8 @@
 """Pydantic models for API requests and responses."""
 
+from datetime import datetime
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict
-from langgraph.graph import MessagesState
+from typing import Optional, List, Dict, Literal
 
 class TripRequest(BaseModel):
     from_city: str = Field(..., description="Origin city")
@@ -12,6 +12,13 @@ class TripRequest(BaseModel):
     arrival_time: str = Field(default="10:00 AM", description="Arrival time")
     num_adults: int = Field(..., ge=1, description="Number of adults")
     num_kids: int = Field(default=0, ge=0, description="Number of children")
+    workflow: Literal["agentic", "fast"] = Field(
+        default="agentic",
+        description="'agentic' lets the LLM choose tool calls, 'fast' calls all tools in parallel"
+    )
+
+class BatchTripRequest(BaseModel):
+    trips: List[TripRequest] = Field(..., min_length=1, description="Trips to plan together")
 
 class WeatherRequest(BaseModel):
     city: str
@@ -34,19 +41,20 @@ class CurrencyRequest(BaseModel):
 class NearbyPlacesRequest(BaseModel):
     city: str
 
-class TripPlannerState(MessagesState):
-    """State class for the trip planner workflow."""
-    from_city: str = ""
-    to_city: str = ""
-    arrival_date: str = ""
-    num_days: int = 3
-    arrival_time: str = "10:00 AM"
-    num_adults: int = 2
-    num_kids: int = 0
-    weather_data: dict = {}
-    attractions_data: dict = {}
-    hotel_data: dict = {}
-    currency_info: str = ""
-    nearby_places_data: dict = {}
-    itinerary: str = ""
-    expenses_data: dict = {}
\ No newline at end of file
+class BulkExportRequest(BaseModel):
+    trip_ids: Optional[List[str]] = Field(default=None, description="Trips to export; omit to select by filter")
+    from_city: Optional[str] = Field(default=None, description="Only trips from this city")
+    to_city: Optional[str] = Field(default=None, description="Only trips to this city")
+    since: Optional[datetime] = Field(default=None, description="Only trips stored at or after this time")
+    format: Literal["zip", "xlsx", "csv"] = Field(
+        default="zip",
+        description="'zip' of per-trip workbooks, one consolidated 'xlsx', or a 'csv' set zipped together"
+    )
+    limit: int = Field(default=1000, ge=1, le=10000, description="Maximum number of trips to export")
+
+def __getattr__(name):
+    # TripPlannerState pulls in LangGraph, so it is only imported when used
+    if name == "TripPlannerState":
+        from .state import TripPlannerState
+        return TripPlannerState
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
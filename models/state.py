@@ -0,0 +1,28 @@
+"""Graph state for the trip planner workflow."""
+
+from typing import Annotated
+from langgraph.graph import MessagesState
+
+def merge_tool_results(left: dict, right: dict) -> dict:
+    """Reducer for tool_results: parallel tool calls each add their own slot."""
+    return {**(left or {}), **(right or {})}
+
+class TripPlannerState(MessagesState):
+    """State class for the trip planner workflow."""
+    from_city: str = ""
+    to_city: str = ""
+    arrival_date: str = ""
+    num_days: int = 3
+    arrival_time: str = "10:00 AM"
+    num_adults: int = 2
+    num_kids: int = 0
+    # Parsed tool results keyed by tool name, filled as each tool finishes
+    tool_results: Annotated[dict, merge_tool_results] = {}
+    weather_data: dict = {}
+    attractions_data: dict = {}
+    hotel_data: dict = {}
+    currency_info: str = ""
+    nearby_places_data: dict = {}
+    itinerary: str = ""
+    itinerary_prompt_tokens: int = 0
+    expenses_data: dict = {}
\ No newline at end of file
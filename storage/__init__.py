@@ -0,0 +1,9 @@
+from .trip_store import (
+    TripStore, MemoryTripStore, SQLiteTripStore,
+    create_trip_store, serialize_trip, trip_version
+)
+
+__all__ = [
+    'TripStore', 'MemoryTripStore', 'SQLiteTripStore',
+    'create_trip_store', 'serialize_trip', 'trip_version'
+]
\ No newline at end of file
@@ -0,0 +1,238 @@
+"""Bounded, persistent storage for completed trip plans."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from config.settings import settings
+
+# State fields kept for a stored trip; the message history is dropped
+TRIP_FIELDS = (
+    "from_city", "to_city", "arrival_date", "num_days", "arrival_time",
+    "num_adults", "num_kids", "weather_data", "attractions_data", "hotel_data",
+    "currency_info", "nearby_places_data", "itinerary", "expenses_data"
+)
+
+def serialize_trip(state):
+    """Reduce a final graph state to the compact record that gets stored."""
+    return {key: state.get(key) for key in TRIP_FIELDS if key in state}
+
+def trip_version(record):
+    """Version of a stored record; changes whenever the trip is stored again."""
+    return record.get("stored_at")
+
+class TripStore(ABC):
+    """Interface for trip plan storage backends.
+
+    Records carry a ``stored_at`` timestamp that doubles as their version.
+    """
+
+    @abstractmethod
+    def put(self, trip_id, state):
+        """Store the compact record for a trip's final state."""
+
+    @abstractmethod
+    def get(self, trip_id):
+        """Return the stored record for a trip, or None."""
+
+    @abstractmethod
+    def delete(self, trip_id):
+        """Remove a trip if present."""
+
+    @abstractmethod
+    def find(self, from_city=None, to_city=None, since=None, limit=1000):
+        """Return ids of stored trips matching the filters, newest first.
+
+        City filters are case-insensitive; ``since`` is a Unix timestamp.
+        """
+
+    def __contains__(self, trip_id):
+        return self.get(trip_id) is not None
+
+class MemoryTripStore(TripStore):
+    """In-process LRU store bounded by entry count and age."""
+
+    def __init__(self, max_entries=1000, max_age=None):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._records = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, trip_id, state, stored_at=None):
+        stored_at = stored_at or time.time()
+        record = dict(serialize_trip(state), stored_at=stored_at)
+        with self._lock:
+            self._records[trip_id] = (record, stored_at)
+            self._records.move_to_end(trip_id)
+            while len(self._records) > self.max_entries:
+                self._records.popitem(last=False)
+
+    def get(self, trip_id):
+        with self._lock:
+            entry = self._records.get(trip_id)
+            if entry is None:
+                return None
+            record, stored_at = entry
+            if self.max_age is not None and time.time() - stored_at > self.max_age:
+                del self._records[trip_id]
+                return None
+            self._records.move_to_end(trip_id)
+            return record
+
+    def delete(self, trip_id):
+        with self._lock:
+            self._records.pop(trip_id, None)
+
+    def find(self, from_city=None, to_city=None, since=None, limit=1000):
+        now = time.time()
+        with self._lock:
+            entries = list(self._records.items())
+        matches = []
+        for trip_id, (record, stored_at) in entries:
+            if self.max_age is not None and now - stored_at > self.max_age:
+                continue
+            if since is not None and stored_at < since:
+                continue
+            if from_city and (record.get("from_city") or "").casefold() != from_city.casefold():
+                continue
+            if to_city and (record.get("to_city") or "").casefold() != to_city.casefold():
+                continue
+            matches.append((stored_at, trip_id))
+        matches.sort(reverse=True)
+        return [trip_id for _, trip_id in matches[:limit]]
+
+    def __len__(self):
+        return len(self._records)
+
+class SQLiteTripStore(TripStore):
+    """SQLite-backed store with an in-memory LRU front cache.
+
+    Records are stored as zlib-compressed JSON. Trips older than ``max_age``
+    seconds, and the oldest trips beyond ``max_entries``, are pruned every
+    ``prune_every`` writes.
+    """
+
+    def __init__(self, db_path, max_entries=50000, max_age=None, cache_size=256, prune_every=100):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.prune_every = prune_every
+        self._front = MemoryTripStore(max_entries=cache_size, max_age=max_age)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._writes_since_prune = 0
+
+    def _connect(self):
+        """Open the database and create the table on first use."""
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS trips ("
+                "trip_id TEXT PRIMARY KEY, stored_at REAL NOT NULL, "
+                "from_city TEXT, to_city TEXT, data BLOB NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS trips_stored_at ON trips (stored_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS trips_to_city ON trips (to_city COLLATE NOCASE)")
+            self._conn.commit()
+        return self._conn
+
+    def put(self, trip_id, state):
+        stored_at = time.time()
+        record = dict(serialize_trip(state), stored_at=stored_at)
+        data = zlib.compress(json.dumps(record, separators=(",", ":"), default=str).encode("utf-8"))
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO trips (trip_id, stored_at, from_city, to_city, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (trip_id, stored_at, record.get("from_city"), record.get("to_city"), data)
+            )
+            conn.commit()
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= self.prune_every:
+                self._prune(stored_at)
+        self._front.put(trip_id, record, stored_at=stored_at)
+
+    def get(self, trip_id):
+        record = self._front.get(trip_id)
+        if record is not None:
+            return record
+
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT data, stored_at FROM trips WHERE trip_id = ?", (trip_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        data, stored_at = row
+        if self.max_age is not None and time.time() - stored_at > self.max_age:
+            return None
+
+        record = json.loads(zlib.decompress(data))
+        self._front.put(trip_id, record, stored_at=stored_at)
+        return record
+
+    def delete(self, trip_id):
+        self._front.delete(trip_id)
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM trips WHERE trip_id = ?", (trip_id,))
+            conn.commit()
+
+    def find(self, from_city=None, to_city=None, since=None, limit=1000):
+        clauses, params = [], []
+        if from_city:
+            clauses.append("from_city = ? COLLATE NOCASE")
+            params.append(from_city)
+        if to_city:
+            clauses.append("to_city = ? COLLATE NOCASE")
+            params.append(to_city)
+        if since is not None:
+            clauses.append("stored_at >= ?")
+            params.append(since)
+        if self.max_age is not None:
+            clauses.append("stored_at >= ?")
+            params.append(time.time() - self.max_age)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT trip_id FROM trips {where} ORDER BY stored_at DESC LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def _prune(self, now):
+        """Drop expired trips and trim the table to ``max_entries``."""
+        self._writes_since_prune = 0
+        conn = self._conn
+        if self.max_age is not None:
+            conn.execute("DELETE FROM trips WHERE stored_at < ?", (now - self.max_age,))
+        conn.execute(
+            "DELETE FROM trips WHERE trip_id IN ("
+            "SELECT trip_id FROM trips ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+        conn.commit()
+
+def create_trip_store():
+    """Build the trip store selected by TRIP_STORE_BACKEND."""
+    if settings.TRIP_STORE_BACKEND == "memory":
+        return MemoryTripStore(
+            max_entries=settings.TRIP_STORE_MAX_ENTRIES,
+            max_age=settings.TRIP_STORE_MAX_AGE
+        )
+    return SQLiteTripStore(
+        db_path=settings.TRIP_STORE_DB_PATH,
+        max_entries=settings.TRIP_STORE_MAX_ENTRIES,
+        max_age=settings.TRIP_STORE_MAX_AGE,
+        cache_size=settings.TRIP_STORE_CACHE_SIZE
+    )
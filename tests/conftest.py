@@ -0,0 +1,75 @@
+"""Shared fixtures: the app runs against the benchmark fake LLM and stub APIs."""
+
+import asyncio
+import os
+
+import pytest
+
+from benchmarks.fake_llm import FakeChatModel
+from benchmarks.stubs import StubAPIServer
+
+_stub = StubAPIServer(latency=0)
+
+def pytest_configure(config):
+    # Settings are read at import time, so point them at the stubs before any app import
+    _stub.start()
+    os.environ.update(_stub.env())
+    os.environ.update({
+        "CACHE_ENABLED": "false",
+        "CACHE_DB_PATH": "",
+        "TRIP_STORE_BACKEND": "memory",
+        "WARMUP_ON_STARTUP": "false",
+        "METRICS_ENABLED": "true"
+    })
+
+def pytest_unconfigure(config):
+    _stub.stop()
+
+@pytest.fixture
+def stub():
+    return _stub
+
+@pytest.fixture
+def fake_llm():
+    """Install a zero-latency FakeChatModel as the shared LLM."""
+    from llm.config import set_llm
+
+    model = FakeChatModel(latency=0)
+    set_llm(model)
+    return model
+
+@pytest.fixture
+def api(fake_llm):
+    """Run ``scenario(client)`` against a started app in a fresh event loop.
+
+    ``timeout`` bounds the whole scenario, so a hang fails the test instead of stalling the run.
+    """
+    import httpx
+    from api.app import create_app
+
+    def run(scenario, timeout=30):
+        async def main():
+            app = create_app()
+            async with app.router.lifespan_context(app):
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=timeout) as client:
+                    return await asyncio.wait_for(scenario(client), timeout)
+        return asyncio.run(main())
+
+    return run
+
+@pytest.fixture
+def trip_body():
+    """Build a valid trip request body."""
+    def build(to_city="Paris", workflow="fast", **fields):
+        return {
+            "from_city": "Mumbai",
+            "to_city": to_city,
+            "arrival_date": "2026-11-01",
+            "num_days": 2,
+            "num_adults": 2,
+            "num_kids": 0,
+            "workflow": workflow,
+            **fields
+        }
+    return build
@@ -0,0 +1,46 @@
+import asyncio
+import threading
+
+from utils.cache import ResultCache
+
+def _accessed_at(cache, full_key):
+    return cache._conn.execute("SELECT accessed_at FROM cache WHERE key = ?", (full_key,)).fetchone()[0]
+
+def _cold(tmp_path):
+    """A cache whose disk tier holds one entry its memory tier has forgotten."""
+    cache = ResultCache(db_path=str(tmp_path / "cache.sqlite3"), memory_max_entries=1)
+    cache.set("geocode", "paris", {"country": "FR"})
+    cache.set("geocode", "rome", {"country": "IT"})
+    return cache
+
+def test_disk_hit_defers_access_time_to_next_store(tmp_path):
+    cache = _cold(tmp_path)
+    stored = _accessed_at(cache, "geocode:paris")
+
+    assert cache.get("geocode", "paris") == {"country": "FR"}
+    assert not cache._conn.in_transaction
+    assert _accessed_at(cache, "geocode:paris") == stored
+
+    cache.set("geocode", "tokyo", {"country": "JP"})
+    assert _accessed_at(cache, "geocode:paris") > stored
+    assert cache.stats()["namespaces"]["geocode"]["disk_hits"] == 1
+
+def test_async_access_runs_disk_tier_off_the_loop(tmp_path):
+    cache = _cold(tmp_path)
+    threads = []
+    read_disk = cache._get_disk
+
+    def get_disk(*args):
+        threads.append(threading.current_thread())
+        return read_disk(*args)
+
+    cache._get_disk = get_disk
+
+    async def scenario():
+        assert await cache.aset_if_valid("geocode", "oslo", {"country": "NO"})
+        assert not await cache.aset_if_valid("geocode", "nowhere", {"error": "not found"})
+        return await cache.aget("geocode", "paris"), await cache.aget("geocode", "nowhere")
+
+    assert asyncio.run(scenario()) == ({"country": "FR"}, None)
+    assert threads and threading.main_thread() not in threads
+    assert ResultCache(db_path=cache.db_path).get("geocode", "oslo") == {"country": "NO"}
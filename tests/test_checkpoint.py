@@ -0,0 +1,43 @@
+import operator
+from typing import Annotated, TypedDict
+
+from langgraph.graph import END, START, StateGraph
+
+from graph.checkpoint import BoundedMemorySaver, create_sqlite_checkpointer
+
+class State(TypedDict):
+    steps: Annotated[list, operator.add]
+
+def _graph(checkpointer):
+    builder = StateGraph(State)
+    builder.add_node("first", lambda state: {"steps": ["first"]})
+    builder.add_node("second", lambda state: {"steps": ["second"]})
+    builder.add_edge(START, "first")
+    builder.add_edge("first", "second")
+    builder.add_edge("second", END)
+    return builder.compile(checkpointer=checkpointer)
+
+def _run(graph, thread_id):
+    return graph.invoke({"steps": []}, {"configurable": {"thread_id": thread_id}})
+
+def test_bounded_saver_keeps_latest_checkpoint_of_recent_threads():
+    saver = BoundedMemorySaver(max_threads=2)
+    graph = _graph(saver)
+    for thread_id in ("a", "b", "c"):
+        assert _run(graph, thread_id)["steps"] == ["first", "second"]
+
+    assert saver.stats()["threads"] == 2
+    assert saver.stats()["checkpoints"] == 2
+    assert graph.get_state({"configurable": {"thread_id": "a"}}).values == {}
+    assert graph.get_state({"configurable": {"thread_id": "c"}}).values["steps"] == ["first", "second"]
+
+def test_sqlite_saver_prunes_to_latest_checkpoint(tmp_path):
+    saver = create_sqlite_checkpointer(str(tmp_path / "checkpoints.sqlite3"), max_threads=2, prune_every=1000)
+    graph = _graph(saver)
+    for thread_id in ("a", "b", "c"):
+        _run(graph, thread_id)
+    saver.prune_all()
+
+    rows = saver.conn.execute("SELECT thread_id, COUNT(*) FROM checkpoints GROUP BY thread_id").fetchall()
+    assert sorted(rows) == [("b", 1), ("c", 1)]
+    assert graph.get_state({"configurable": {"thread_id": "c"}}).values["steps"] == ["first", "second"]
@@ -0,0 +1,39 @@
+import json
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from graph.compaction import compact_messages
+from graph.results import tool_result_update
+
+HOTELS = [{"name": f"Hotel {i}", "price_per_night": 100 + i} for i in range(5)]
+
+def _round(i, name, content):
+    call_id = f"call_{i}"
+    return [
+        AIMessage(content="", tool_calls=[{"name": name, "args": {"city": "Lisbon"}, "id": call_id}]),
+        ToolMessage(content=content, name=name, tool_call_id=call_id)
+    ]
+
+def _history(*rounds):
+    return [SystemMessage(content="You plan trips."), HumanMessage(content="Plan Lisbon.")] + [m for r in rounds for m in r]
+
+def test_recorded_output_becomes_receipt_and_errors_stay():
+    content = json.dumps(HOTELS)
+    results = tool_result_update("get_hotel_recommendations", content)["tool_results"]
+    error = json.dumps({"error": "API key not configured"})
+    messages = _history(_round(0, "get_hotel_recommendations", content), _round(1, "get_weather_info", error))
+
+    compacted = compact_messages(messages, results)
+
+    assert compacted[3].content == "OK: 5 results recorded for the itinerary (full output omitted)."
+    assert compacted[3].tool_call_id == "call_0"
+    assert compacted[5].content == error
+    assert messages[3].content == content
+
+def test_old_rounds_are_dropped_whole_over_budget():
+    rounds = [_round(i, "get_nearby_places", "x" * 400) for i in range(3)]
+    compacted = compact_messages(_history(*rounds), token_budget=150)
+
+    assert "Completed tools: get_nearby_places" in compacted[2].content
+    assert [m.tool_call_id for m in compacted if isinstance(m, ToolMessage)] == ["call_2"]
+    assert isinstance(compacted[3], AIMessage) and compacted[3].tool_calls[0]["id"] == "call_2"
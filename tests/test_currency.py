@@ -0,0 +1,19 @@
+import asyncio
+import json
+import logging
+
+from tools.currency import convert_currency
+
+def _convert(from_city, to_city):
+    return json.loads(convert_currency.invoke({"from_city": from_city, "to_city": to_city}))
+
+def test_aliases_and_country_names_resolve():
+    result = _convert("Goa", "Springfield")
+    assert (result["from_currency"], result["to_currency"]) == ("INR", "USD")
+    assert _convert("Mumbai", "Japan")["to_currency"] == "JPY"
+
+def test_unknown_city_is_logged_not_priced_in_usd(caplog):
+    with caplog.at_level(logging.WARNING, logger="tools.currency"):
+        result = json.loads(asyncio.run(convert_currency.ainvoke({"from_city": "Paris", "to_city": "Atlantis"})))
+    assert result == {"error": "Unknown currency for Atlantis"}
+    assert "Atlantis" in caplog.text
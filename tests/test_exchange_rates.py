@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from tools.exchange_rates import ExchangeRateTable, ExchangeRateUnavailable
+
+def _wait_for(predicate, timeout=1):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+class FakeUpstream:
+    """Stand-in for ``_fetch_table`` that counts fetches and can be made to fail."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.fetches = 0
+        self.failing = False
+        self.eur = 0.9
+
+    def __call__(self):
+        self.fetches += 1
+        time.sleep(self.delay)
+        if self.failing:
+            raise ExchangeRateUnavailable("API unavailable")
+        return {"USD": 1.0, "EUR": self.eur, "INR": 83.0}
+
+def _table(upstream, **options):
+    table = ExchangeRateTable("http://unused", **options)
+    table._fetch_table = upstream
+    return table
+
+def test_cold_start_fetches_from_stub(stub):
+    before = stub.hits["rates"]
+    table = ExchangeRateTable(stub.env()["EXCHANGE_RATE_API_URL"])
+    assert table.rate("EUR", "INR") > 0
+    assert asyncio.run(table.arate("INR", "EUR")) > 0
+    assert stub.hits["rates"] - before == 1
+
+def test_concurrent_callers_share_one_fetch():
+    upstream = FakeUpstream(delay=0.05)
+    table = _table(upstream)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(table.rate("USD", "EUR"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [0.9] * 8
+    assert upstream.fetches == 1
+
+def test_stale_table_refreshes_in_background():
+    upstream = FakeUpstream()
+    table = _table(upstream, ttl=0)
+    assert table.rate("USD", "EUR") == 0.9
+
+    upstream.eur = 0.95
+    # The stale rate is answered at once while the refresh runs
+    assert table.rate("USD", "EUR") == 0.9
+    _wait_for(lambda: table.status()["fetch_count"] == 2)
+    assert table.rate("USD", "EUR") == 0.95
+
+def test_failed_refresh_keeps_stale_table_until_retry_window_ends():
+    upstream = FakeUpstream()
+    table = _table(upstream, ttl=0, retry_after=60)
+    table.rate("USD", "EUR")
+
+    upstream.failing = True
+    assert table.rate("USD", "EUR") == 0.9
+    _wait_for(lambda: table.status()["last_error"] is not None)
+    for _ in range(5):
+        assert table.rate("USD", "EUR") == 0.9
+    time.sleep(0.05)
+    assert upstream.fetches == 2
+    assert table.status()["stale"]
+
+def test_cold_start_failure_is_not_retried_inside_window():
+    upstream = FakeUpstream()
+    upstream.failing = True
+    table = _table(upstream, retry_after=60)
+    for _ in range(3):
+        with pytest.raises(ExchangeRateUnavailable):
+            table.rate("USD", "EUR")
+    assert upstream.fetches == 1
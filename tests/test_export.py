@@ -0,0 +1,50 @@
+import csv
+import io
+import zipfile
+
+import openpyxl
+
+def _plan_and_export(api, trip_body, requests):
+    """Plan a Paris and a Rome trip, then send each export request."""
+    async def scenario(client):
+        ids = []
+        for city in ("Paris", "Rome"):
+            response = await client.post("/plan-trip", json=trip_body(city))
+            response.raise_for_status()
+            ids.append(response.json()["trip_id"])
+        responses = []
+        for method, path, body in requests(ids):
+            response = await client.request(method, path, json=body)
+            responses.append((response.status_code, response.headers.get("content-type"), response.content))
+        return ids, responses
+
+    return api(scenario)
+
+def test_single_trip_workbook(api, trip_body):
+    ids, [(status, _, content)] = _plan_and_export(api, trip_body, lambda ids: [("GET", f"/trip/{ids[0]}/export", None)])
+    assert status == 200
+    wb = openpyxl.load_workbook(io.BytesIO(content))
+    assert wb.sheetnames[0] == "Trip Summary"
+
+def test_bulk_export_formats(api, trip_body):
+    def requests(ids):
+        return [("POST", "/trips/export", {"trip_ids": ids, "format": format_}) for format_ in ("zip", "xlsx", "csv")] + [
+            ("POST", "/trips/export", {"trip_ids": ["missing"]})
+        ]
+
+    ids, [zipped, workbook, csvs, missing] = _plan_and_export(api, trip_body, requests)
+
+    assert zipped[0] == 200 and zipped[1] == "application/zip"
+    assert sorted(zipfile.ZipFile(io.BytesIO(zipped[2])).namelist()) == sorted(f"trip_plan_{i}.xlsx" for i in ids)
+
+    assert workbook[0] == 200
+    sheet = openpyxl.load_workbook(io.BytesIO(workbook[2]))["Trips"]
+    assert [row[0] for row in sheet.iter_rows(min_row=2, values_only=True)] == ids
+
+    assert csvs[0] == 200
+    archive = zipfile.ZipFile(io.BytesIO(csvs[2]))
+    assert "attractions.csv" in archive.namelist()
+    trips = list(csv.DictReader(io.TextIOWrapper(archive.open("trips.csv"), encoding="utf-8")))
+    assert [(row["trip_id"], row["to_city"]) for row in trips] == list(zip(ids, ("Paris", "Rome")))
+
+    assert missing[0] == 404
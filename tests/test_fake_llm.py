@@ -0,0 +1,24 @@
+import asyncio
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.messages import HumanMessage
+
+from benchmarks.fake_llm import FakeChatModel
+
+class TokenCollector(AsyncCallbackHandler):
+    def __init__(self):
+        self.tokens = []
+
+    async def on_llm_new_token(self, token, **kwargs):
+        self.tokens.append(token)
+
+def test_streamed_tokens_are_reported_once():
+    collector = TokenCollector()
+
+    async def scenario():
+        stream = FakeChatModel(latency=0).astream([HumanMessage(content="Plan a day in Lisbon.")],
+                                                  {"callbacks": [collector]})
+        return [chunk.content async for chunk in stream]
+
+    chunks = asyncio.run(scenario())
+    assert chunks and collector.tokens == chunks
@@ -0,0 +1,22 @@
+from tools.gazetteer import get_gazetteer, normalize
+from tools.weather import geocode
+
+def test_ambiguous_city_resolves_to_most_prominent():
+    assert get_gazetteer().currency_for("Kingston") == "JMD"
+
+def test_country_hint_picks_between_same_named_cities():
+    gazetteer = get_gazetteer()
+    assert gazetteer.currency_for("Kingston, Canada") == "CAD"
+    assert gazetteer.lookup("Kingston", country="CA").country == "CA"
+
+def test_lookup_ignores_case_and_accents():
+    gazetteer = get_gazetteer()
+    assert gazetteer.currency_for("sao paulo") == "BRL"
+    assert gazetteer.currency_for("ZÜRICH") == "CHF"
+    assert normalize("São Paulo") == normalize("SAO PAULO")
+
+def test_geocode_uses_gazetteer_without_calling_api(stub):
+    before = stub.hits["geocode"]
+    place = get_gazetteer().lookup("Lisbon")
+    assert geocode("Lisbon", "unused") == {"lat": place.lat, "lon": place.lon, "country": "PT"}
+    assert stub.hits["geocode"] == before
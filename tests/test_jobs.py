@@ -0,0 +1,50 @@
+import asyncio
+
+from api import routes
+
+async def _status(client, trip_id):
+    return (await client.get(f"/trip/{trip_id}/status")).json()["status"]
+
+async def _wait_status(client, trip_id, wanted):
+    while (status := await _status(client, trip_id)) not in wanted:
+        await asyncio.sleep(0.01)
+    return status
+
+def test_background_plans_queue_and_report_status(api, trip_body, monkeypatch):
+    queue = routes.planning_queue
+    monkeypatch.setattr(queue, "max_concurrency", 1)
+    monkeypatch.setattr(queue, "max_depth", 1)
+    gates = {}
+
+    async def handler(trip_id, request):
+        # Each job runs until the test opens its gate
+        await gates[request.to_city].wait()
+        if request.to_city == "Rome":
+            raise RuntimeError("planning failed")
+        return await routes.execute_queued_plan(trip_id, request)
+
+    monkeypatch.setattr(queue, "handler", handler)
+
+    async def scenario(client):
+        gates.update(Paris=asyncio.Event(), Rome=asyncio.Event())
+        first = await client.post("/plan-trip?background=true", json=trip_body("Paris"))
+        assert first.status_code == 202
+        paris = first.json()["trip_id"]
+        assert first.json()["status_url"] == f"/trip/{paris}/status"
+        await _wait_status(client, paris, {"running"})
+
+        rome = (await client.post("/plan-trip?background=true", json=trip_body("Rome"))).json()["trip_id"]
+        assert await _status(client, rome) == "queued"
+
+        full = await client.post("/plan-trip?background=true", json=trip_body("Tokyo"))
+        assert full.status_code == 429
+        assert full.headers["retry-after"] == str(routes.settings.PLAN_QUEUE_RETRY_AFTER)
+
+        gates["Paris"].set()
+        gates["Rome"].set()
+        assert await _wait_status(client, paris, {"completed", "failed"}) == "completed"
+        assert await _wait_status(client, rome, {"completed", "failed"}) == "failed"
+        assert (await client.get(f"/trip/{rome}/status")).json()["error"] == "planning failed"
+        assert (await client.get(f"/trip/{paris}")).status_code == 200
+
+    api(scenario)
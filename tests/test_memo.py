@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import time
+
+from graph.memo import ToolCallMemo
+
+def test_acall_runs_each_input_once():
+    memo = ToolCallMemo()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(memo.acall("get_weather_info", {"city": "Paris"}, fetch) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["result"] * 5
+    assert len(calls) == 1
+    assert memo.stats() == {"tool_calls": 1, "shared_calls": 4}
+
+def test_call_shares_result_between_threads():
+    memo = ToolCallMemo()
+    release = threading.Event()
+    results = []
+
+    def slow():
+        release.wait(1)
+        return "result"
+
+    threads = [threading.Thread(target=lambda: results.append(memo.call("t", {"a": 1}, slow))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == ["result"] * 3
+    assert memo.stats()["tool_calls"] == 1
+
+def test_mixed_batch_completes(api, trip_body):
+    """A fast and an agentic trip to the same city share tool results without stalling."""
+    async def scenario(client):
+        response = await client.post("/plan-trips/batch", json={"trips": [
+            trip_body("Lisbon", "fast"), trip_body("Lisbon", "agentic")
+        ]})
+        return response.json()
+
+    body = api(scenario, timeout=20)
+    assert body["status"] == "completed", body
+    assert body["tool_calls"]["shared_calls"] > 0
+    assert [t["workflow"] for t in body["trips"]] == ["fast", "agentic"]
+
+def test_call_runs_itself_when_owner_stalls():
+    memo = ToolCallMemo()
+    release = threading.Event()
+    owner = threading.Thread(target=memo.call, args=("t", {"a": 1}, lambda: release.wait(5) and "owner"))
+    owner.start()
+    while not memo.calls:
+        time.sleep(0.001)
+    try:
+        assert memo.call("t", {"a": 1}, lambda: "own call", timeout=0.05) == "own call"
+    finally:
+        release.set()
+        owner.join()
@@ -0,0 +1,59 @@
+from graph.prompt import ROW_TRIM_ORDER, collect_tables, fit_to_budget, render_sections
+
+def _state():
+    return {
+        "weather_data": {"forecasts": [
+            {"date": f"2026-11-0{i + 1}", "day": "Monday", "condition": "Clear Sky", "temperature": 18.5,
+             "feels_like": 17.0, "humidity": 60, "wind_speed": 3.2} for i in range(5)
+        ]},
+        "attractions_data": {"items": [
+            {"name": f"Museum {i}", "category": "Museum", "ticket_price": 12, "currency": "EUR", "duration": "2h",
+             "rating": 4.5, "description": "A long description of the collection and its history.", "source": "guide"}
+            for i in range(6)
+        ]},
+        "hotel_data": {"items": [
+            {"name": f"Hotel {i}", "star_rating": 4, "price_per_night": 120.0, "currency": "EUR", "total_price": 360.0,
+             "guest_rating": 8.7, "location": "Old Town", "amenities": ["WiFi", "Pool", "Gym"]} for i in range(5)
+        ]},
+        "nearby_places_data": {"items": [
+            {"name": f"Town {i}", "distance_km": 40, "transport": "Train", "recommended_duration": "1 day",
+             "estimated_cost": "30 EUR", "famous_for": "Castles and wine"} for i in range(6)
+        ]}
+    }
+
+def _render(tables):
+    return "\n\n".join(render_sections(tables).values())
+
+def _rows(text, header_prefix):
+    """Data lines of the section whose header starts with ``header_prefix``."""
+    block = next(b for b in text.split("\n\n") if b.startswith(header_prefix))
+    return block.split("\n")[1:]
+
+def test_generous_budget_keeps_every_column():
+    text = fit_to_budget(collect_tables(_state()), _render, 100000)
+    assert "|description|source (currency=EUR)" in text
+    assert "amenities" in text and "famous_for" in text
+    assert len(_rows(text, "name|category")) == 6
+
+def test_tight_budget_drops_description_before_any_row():
+    tables = collect_tables(_state())
+    trimmed = collect_tables(_state())
+    trimmed["attractions"]["extras"].clear()
+    trimmed["attractions"]["columns"].remove("description")
+    budget = (len(_render(trimmed)) + 3) // 4
+
+    text = fit_to_budget(tables, _render, budget)
+    assert text == _render(trimmed)
+    assert "amenities" in text
+    assert len(_rows(text, "name|category")) == 6
+    assert len(_rows(text, "name|distance_km")) == 6
+    # The caller's tables are left untouched
+    assert "description" in tables["attractions"]["columns"]
+
+def test_row_minimums_are_respected():
+    text = fit_to_budget(collect_tables(_state()), _render, 1)
+    minimums = dict(ROW_TRIM_ORDER)
+    assert len(_rows(text, "date")) == minimums["weather"]
+    assert len(_rows(text, "name|ticket_price")) == minimums["attractions"]
+    assert len(_rows(text, "name|star_rating")) == minimums["hotels"]
+    assert len(_rows(text, "name|distance_km")) == minimums["nearby"]
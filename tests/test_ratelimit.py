@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.fake_llm import FakeChatModel, FakeRateLimitError
+from llm import ratelimit
+from llm.config import _with_limits
+from llm.ratelimit import LLMRateLimiter, RateLimitedChatModel
+from llm.router import LatencyTracker, RoutedChatModel
+
+PROMPT = [HumanMessage(content="Plan a short day in Lisbon.")]
+
+# Calls each ThrottledOnceFake has answered with a 429
+throttled = []
+
+class ThrottledFake(FakeChatModel):
+    def _admit(self):
+        raise FakeRateLimitError("Rate limit reached for requests per minute")
+
+class ThrottledOnceFake(FakeChatModel):
+    def _admit(self):
+        if not throttled:
+            throttled.append(self.latency)
+            raise FakeRateLimitError("Rate limit reached for requests per minute")
+
+def test_throttle_halves_concurrency_and_pauses():
+    limiter = LLMRateLimiter(max_concurrency=8)
+
+    async def scenario():
+        permit = await limiter.acquire(10)
+        return limiter.release(permit, error=FakeRateLimitError("slow down"))
+
+    assert asyncio.run(scenario())
+    assert limiter.concurrency.limit == 4
+    assert limiter.in_flight == 0
+    assert limiter._paused_until > time.monotonic()
+
+def test_throttled_call_is_retried_after_pause(monkeypatch):
+    monkeypatch.setattr(ratelimit, "DEFAULT_RETRY_AFTER", 0.05)
+    throttled.clear()
+    limiter = LLMRateLimiter(max_concurrency=8)
+    model = RateLimitedChatModel(model=ThrottledOnceFake(latency=0), limiter=limiter, max_retries=1)
+
+    assert asyncio.run(model.ainvoke(PROMPT)).content
+    assert throttled == [0]
+    assert limiter.concurrency.limit < 8
+
+def test_routed_429_reaches_limiter_before_fallback(monkeypatch):
+    monkeypatch.setattr(ratelimit, "rate_limiters", {})
+    router = RoutedChatModel(models=[ThrottledFake(latency=0), FakeChatModel(latency=0)],
+                             names=["primary", "secondary"], tracker=LatencyTracker())
+    limited = _with_limits(router)
+
+    assert asyncio.run(limited.ainvoke(PROMPT)).content
+    limiters = ratelimit.rate_limiters
+    assert limiters["primary"].concurrency.limit < limiters["primary"].concurrency.maximum
+    assert limiters["secondary"].concurrency.limit == limiters["secondary"].concurrency.maximum
+    assert all(limiter.in_flight == 0 for limiter in limiters.values())
@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.fake_llm import FakeChatModel, FakeRateLimitError
+from llm.router import LatencyTracker, RoutedChatModel
+
+PROMPT = [HumanMessage(content="Plan a short day in Lisbon.")]
+
+# Latency of every fake whose stream was closed
+closed = []
+
+class RateLimitedFake(FakeChatModel):
+    def _admit(self):
+        raise FakeRateLimitError("Rate limit reached for requests per minute")
+
+class ClosingFake(FakeChatModel):
+    async def astream(self, input, config=None, **kwargs):
+        try:
+            async for chunk in super().astream(input, config, **kwargs):
+                yield chunk
+        finally:
+            closed.append(self.latency)
+
+def _router(models, names, **fields):
+    return RoutedChatModel(models=models, names=names, tracker=LatencyTracker(), **fields)
+
+def test_falls_back_on_rate_limit():
+    router = _router([RateLimitedFake(latency=0), FakeChatModel(latency=0)], ["primary", "secondary"])
+    assert router.invoke(PROMPT).content
+    assert asyncio.run(router.ainvoke(PROMPT)).content
+    assert router.tracker.estimate("primary") is None
+    assert router.tracker.estimate("secondary") is not None
+
+def test_hedge_answers_before_slow_model():
+    router = _router([FakeChatModel(latency=2), FakeChatModel(latency=0)], ["slow", "fast"], hedge_delay=0.05)
+    started = time.perf_counter()
+    assert asyncio.run(router.ainvoke(PROMPT)).content
+    assert time.perf_counter() - started < 1
+    assert router.tracker.estimate("fast") is not None
+
+def test_stream_closes_loser_and_abandoned_winner():
+    closed.clear()
+    router = _router([ClosingFake(latency=2), ClosingFake(latency=0)], ["slow", "fast"], hedge_delay=0.05)
+
+    async def scenario():
+        stream = router._astream(PROMPT)
+        first = await anext(stream)
+        await stream.aclose()
+        # Checked before the loop finalizes leftover generators
+        return first.message.content, sorted(closed)
+
+    content, closed_on_return = asyncio.run(scenario())
+    assert content
+    assert closed_on_return == [0, 2]
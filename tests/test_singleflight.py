@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import time
+
+from utils.singleflight import SingleFlight
+
+def _wait_for(predicate, timeout=1):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+def test_async_callers_share_one_call():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flights.ado("weather", "paris", fetch) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["result"] * 5
+    assert len(calls) == 1
+    assert flights.stats() == {"namespaces": {"weather": {"calls": 1, "coalesced": 4}}, "in_flight": 0, "coalesced": 4}
+
+def test_threads_share_one_call():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def slow():
+        calls.append(1)
+        release.wait(1)
+        return "result"
+
+    threads = [threading.Thread(target=lambda: results.append(flights.do("weather", "paris", slow))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    # Hold the leader until every other thread has joined its call
+    _wait_for(lambda: flights.stats()["coalesced"] == 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == ["result"] * 4
+    assert len(calls) == 1
+    assert flights.stats()["namespaces"]["weather"] == {"calls": 1, "coalesced": 3}
+
+def test_cancelled_leader_still_settles_followers():
+    flights = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        leader = asyncio.ensure_future(flights.ado("weather", "paris", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.ado("weather", "paris", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return leader, await follower
+
+    leader, result = asyncio.run(main())
+    assert leader.cancelled()
+    assert result == "result"
+    assert flights.stats()["in_flight"] == 0
+
+def test_finished_calls_are_not_reused():
+    flights = SingleFlight()
+    calls = []
+    fetch = flights.wrap("weather", lambda city: calls.append(city) or len(calls))
+
+    assert [fetch("Paris"), fetch(city="Paris")] == [1, 2]
+    assert flights.stats()["namespaces"]["weather"] == {"calls": 2, "coalesced": 0}
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from benchmarks.fake_llm import FakeChatModel
+from llm.config import set_llm
+from llm.router import LatencyTracker, RoutedChatModel
+
+def _parse(body):
+    """(event, data) pairs of a Server-Sent Events body."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+@pytest.mark.parametrize("routed", [False, True], ids=["direct", "routed"])
+def test_stream_sends_each_token_once_in_order(api, trip_body, routed):
+    if routed:
+        set_llm(RoutedChatModel(models=[FakeChatModel(latency=0)], hedge_delay=5, tracker=LatencyTracker()))
+
+    async def scenario(client):
+        response = await client.post("/plan-trip/stream", json=trip_body("Lisbon"))
+        events = _parse(response.text)
+        stored = (await client.get(f"/trip/{events[-1][1]['trip_id']}")).json()
+        return events, stored
+
+    events, stored = api(scenario)
+    names = [name for name, _ in events]
+
+    assert names[0] == "start" and names[-1] == "done"
+    first_token, last_token = names.index("token"), len(names) - 1 - names[::-1].index("token")
+    assert {"node", "weather", "currency"} <= set(names[1:first_token])
+    assert set(names[first_token:last_token + 1]) == {"token"}
+    assert events[last_token + 1] == ("node", {"node": "create_itinerary"})
+    assert names[last_token + 2] == "itinerary"
+    assert "error" not in names
+
+    tokens = "".join(data["content"] for name, data in events if name == "token")
+    itinerary = next(data for name, data in events if name == "itinerary")
+    assert tokens == itinerary == stored["itinerary"]
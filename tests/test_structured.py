@@ -0,0 +1,47 @@
+import asyncio
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from benchmarks.fake_llm import FakeChatModel
+from llm.config import set_llm
+from llm.structured import astructured_items, structured_items
+from models.places import AttractionList
+from tools.attractions import _attractions_prompt
+
+# Prompts the RepairingFake has answered, and the valid reply it withheld
+prompts = []
+valid = []
+
+class BlockFake(FakeChatModel):
+    """Answers with a list of content blocks instead of a string."""
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        reply = self._reply(messages, kwargs.get("response_format"))
+        blocks = [{"type": "reasoning", "reasoning": "{"}, {"type": "text", "text": reply.content}]
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=blocks))])
+
+class RepairingFake(FakeChatModel):
+    """Truncates its first reply, then answers the repair request with the full one."""
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompts.append(messages[-1].content)
+        if len(prompts) > 1:
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=valid[0]))])
+        reply = self._reply(messages, kwargs.get("response_format"))
+        valid.append(reply.content)
+        reply.content = reply.content[:40]
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+def test_content_blocks_are_joined_before_parsing(fake_llm):
+    set_llm(BlockFake(latency=0))
+    items = structured_items("get_top_attractions", AttractionList, _attractions_prompt("Lisbon", 3))
+    assert len(items) == 3 and items[0]["name"].startswith("Lisbon")
+
+def test_invalid_reply_is_repaired_once(fake_llm):
+    prompts.clear()
+    valid.clear()
+    set_llm(RepairingFake(latency=0))
+    items = asyncio.run(astructured_items("get_top_attractions", AttractionList, _attractions_prompt("Lisbon", 3)))
+    assert len(items) == 3
+    assert len(prompts) == 2 and "does not match the required format" in prompts[1]
@@ -0,0 +1,30 @@
+import pytest
+
+from storage.trip_store import MemoryTripStore, SQLiteTripStore, TripStore
+
+STATE = {"from_city": "Mumbai", "to_city": "Paris", "num_days": 2, "messages": ["dropped"]}
+
+def test_incomplete_backend_fails_at_creation():
+    class Partial(TripStore):
+        def get(self, trip_id):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+def test_memory_store_evicts_oldest():
+    store = MemoryTripStore(max_entries=2)
+    for trip_id in ("a", "b", "c"):
+        store.put(trip_id, STATE)
+    assert "a" not in store
+    assert store.get("c")["to_city"] == "Paris"
+    assert "messages" not in store.get("c")
+
+def test_sqlite_store_round_trip_and_prune(tmp_path):
+    store = SQLiteTripStore(str(tmp_path / "trips.sqlite3"), max_entries=2, cache_size=1, prune_every=1)
+    for trip_id in ("a", "b", "c"):
+        store.put(trip_id, STATE)
+    assert store.find(to_city="paris") == ["c", "b"]
+    # "b" is no longer in the one-entry front cache, so this reads the database
+    assert store.get("b")["from_city"] == "Mumbai"
+    assert store.get("a") is None
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from tools import weather
+from tools.weather import get_weather_info
+from utils.cache import ResultCache
+
+CITY = "Atlantis"
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """Enable a fresh disk-backed tool cache for the weather tool."""
+    def install():
+        cache = ResultCache(db_path=str(tmp_path / "cache.sqlite3"), ttls={"geocode": 3600})
+        monkeypatch.setattr(weather, "tool_cache", cache)
+        return cache
+    return install
+
+def _hits(stub):
+    return stub.hits["geocode"], stub.hits["forecast"]
+
+def _weather():
+    return json.loads(get_weather_info.invoke({"city": CITY}))
+
+def test_repeat_lookup_does_not_touch_network(stub, cache):
+    cache()
+    before = _hits(stub)
+    first = _weather()
+    assert first["forecasts"]
+    assert _weather() == first
+    assert [a - b for a, b in zip(_hits(stub), before)] == [1, 1]
+
+    # A restarted process reads both entries back from disk
+    cache()
+    assert _weather() == first
+    assert [a - b for a, b in zip(_hits(stub), before)] == [1, 1]
+
+def test_forecast_expires_with_its_slot(stub, cache, monkeypatch):
+    store = cache()
+    slot, remaining = weather._forecast_slot()
+    _weather()
+    before = _hits(stub)
+
+    [expires_at] = [expires_at for key, (_, expires_at) in store._memory.items() if key.startswith("forecast:")]
+    assert abs(expires_at - (slot + 1) * weather.FORECAST_SLOT_SECONDS) < 5
+
+    monkeypatch.setattr(weather, "_forecast_slot", lambda: (slot + 1, remaining))
+    _weather()
+    assert [a - b for a, b in zip(_hits(stub), before)] == [0, 1]
@@ -1,8 +1,25 @@
-from .all_tools import all_tools
-from .weather import get_weather_info
-from .attractions import get_top_attractions, get_nearby_places
-from .hotels import get_hotel_recommendations
-from .currency import convert_currency
+import importlib
+
+# Tools are imported on first access so that importing the package (for
+# example for tools.exchange_rates) does not load LangChain
+_EXPORTS = {
+    'get_weather_info': '.weather',
+    'get_top_attractions': '.attractions',
+    'get_hotel_recommendations': '.hotels',
+    'convert_currency': '.currency',
+    'get_nearby_places': '.attractions',
+    'get_destination_profile': '.destination',
+    'all_tools': '.all_tools',
+    'profile_tools': '.all_tools',
+    'planning_tools': '.all_tools',
+    'get_gazetteer': '.gazetteer'
+}
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
 
 __all__ = [
     'get_weather_info',
@@ -10,5 +27,9 @@ __all__ = [
     'get_hotel_recommendations',
     'convert_currency',
     'get_nearby_places',
-    'all_tools'
-]
\ No newline at end of file
+    'get_destination_profile',
+    'all_tools',
+    'profile_tools',
+    'planning_tools',
+    'get_gazetteer'
+]
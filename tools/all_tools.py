@@ -1,9 +1,11 @@
 """All tools for the travel planner."""
 
+from config.settings import settings
 from .weather import get_weather_info
 from .attractions import get_top_attractions, get_nearby_places
 from .hotels import get_hotel_recommendations
 from .currency import convert_currency
+from .destination import get_destination_profile
 
 # Export all tools
 all_tools = [
@@ -14,11 +16,26 @@ all_tools = [
     get_nearby_places
 ]
 
+# Planning tool set when DESTINATION_PROFILE_ENABLED: one LLM call covers
+# attractions, hotels and nearby places
+profile_tools = [
+    get_weather_info,
+    get_destination_profile,
+    convert_currency
+]
+
+def planning_tools():
+    """Tools the planning workflows use under the current settings."""
+    return profile_tools if settings.DESTINATION_PROFILE_ENABLED else all_tools
+
 __all__ = [
     'get_weather_info',
     'get_top_attractions',
     'get_hotel_recommendations',
     'convert_currency',
     'get_nearby_places',
-    'all_tools'
+    'get_destination_profile',
+    'all_tools',
+    'profile_tools',
+    'planning_tools'
 ]
\ No newline at end of file
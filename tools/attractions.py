@@ -1,14 +1,16 @@
 """Attractions and places tools."""
 
 import json
-import re
-from langchain.tools import tool
-from llm.config import llm
+from langchain_core.tools import StructuredTool
+from llm.structured import structured_items, astructured_items
+from models.places import AttractionList, NearbyPlaceList
+from utils.cache import tool_cache, cache_key
+from utils.singleflight import tool_flights
+from utils.metrics import instrument_tool
 
-@tool
-def get_top_attractions(city: str, num_days: int = 3) -> str:
-    """Get top attractions for a city."""
-    prompt = f"""List the top {min(num_days * 3, 10)} attractions in {city}.
+def _attractions_prompt(city: str, count: int) -> str:
+    """Build the attractions prompt."""
+    return f"""List the top {count} attractions in {city}.
 
 For each attraction, provide:
 - name: Attraction name
@@ -19,27 +21,91 @@ For each attraction, provide:
 - duration: Recommended visit time (e.g., "2 hours", "Half day")
 - rating: Tourist rating out of 5
 
-Return ONLY a valid JSON array."""
+Return ONLY a JSON object of the form {{"items": [...]}}."""
+
+def _nearby_prompt(city: str) -> str:
+    """Build the nearby places prompt."""
+    return f"""List 6 cities near {city}. For each: name, distance_km, transport, famous_for, recommended_duration, estimated_cost. Return ONLY a JSON object of the form {{"items": [...]}}."""
+
+def attractions_key(city: str, num_days: int):
+    """Number of attractions to ask for and the cache key for that request."""
+    count = min(num_days * 3, 10)
+    return count, cache_key(city, count=count)
+
+def nearby_key(city: str) -> str:
+    """Cache key for a nearby places request."""
+    return cache_key(city)
+
+def _store_items(tool_name: str, key: str, items) -> str:
+    """Cache validated items and return them as the tool's JSON result."""
+    tool_cache.set_if_valid(tool_name, key, items)
+    return json.dumps(items)
+
+async def _astore_items(tool_name: str, key: str, items) -> str:
+    """Async variant of _store_items."""
+    await tool_cache.aset_if_valid(tool_name, key, items)
+    return json.dumps(items)
+
+def _get_top_attractions(city: str, num_days: int = 3) -> str:
+    """Get top attractions for a city."""
+    count, key = attractions_key(city, num_days)
+    cached = tool_cache.get("get_top_attractions", key)
+    if cached is not None:
+        return json.dumps(cached)
     
     try:
-        response = llm.invoke(prompt)
-        content = response.content
-        json_match = re.search(r'\[.*\]', content, re.DOTALL)
-        
-        if json_match:
-            return json_match.group()
-        return json.dumps([{"error": "No data"}])
+        items = structured_items("get_top_attractions", AttractionList, _attractions_prompt(city, count))
+        return _store_items("get_top_attractions", key, items)
     except Exception as e:
         return json.dumps([{"error": str(e)}])
 
-@tool
-def get_nearby_places(city: str) -> str:
+async def _aget_top_attractions(city: str, num_days: int = 3) -> str:
+    """Get top attractions for a city."""
+    count, key = attractions_key(city, num_days)
+    cached = await tool_cache.aget("get_top_attractions", key)
+    if cached is not None:
+        return json.dumps(cached)
+    
+    try:
+        items = await astructured_items("get_top_attractions", AttractionList, _attractions_prompt(city, count))
+        return await _astore_items("get_top_attractions", key, items)
+    except Exception as e:
+        return json.dumps([{"error": str(e)}])
+
+def _get_nearby_places(city: str) -> str:
     """Get nearby places worth visiting."""
-    prompt = f"""List 6 cities near {city}. For each: name, distance_km, transport, famous_for, recommended_duration, estimated_cost. Return JSON array."""
+    key = nearby_key(city)
+    cached = tool_cache.get("get_nearby_places", key)
+    if cached is not None:
+        return json.dumps(cached)
     
     try:
-        response = llm.invoke(prompt)
-        json_match = re.search(r'\[.*\]', response.content, re.DOTALL)
-        return json_match.group() if json_match else json.dumps([{"error": "No data"}])
+        items = structured_items("get_nearby_places", NearbyPlaceList, _nearby_prompt(city))
+        return _store_items("get_nearby_places", key, items)
     except Exception as e:
-        return json.dumps([{"error": str(e)}])
\ No newline at end of file
+        return json.dumps([{"error": str(e)}])
+
+async def _aget_nearby_places(city: str) -> str:
+    """Get nearby places worth visiting."""
+    key = nearby_key(city)
+    cached = await tool_cache.aget("get_nearby_places", key)
+    if cached is not None:
+        return json.dumps(cached)
+    
+    try:
+        items = await astructured_items("get_nearby_places", NearbyPlaceList, _nearby_prompt(city))
+        return await _astore_items("get_nearby_places", key, items)
+    except Exception as e:
+        return json.dumps([{"error": str(e)}])
+
+get_top_attractions = StructuredTool.from_function(
+    func=instrument_tool("get_top_attractions", tool_flights.wrap("get_top_attractions", _get_top_attractions)),
+    coroutine=instrument_tool("get_top_attractions", tool_flights.wrap("get_top_attractions", _aget_top_attractions)),
+    name="get_top_attractions"
+)
+
+get_nearby_places = StructuredTool.from_function(
+    func=instrument_tool("get_nearby_places", tool_flights.wrap("get_nearby_places", _get_nearby_places)),
+    coroutine=instrument_tool("get_nearby_places", tool_flights.wrap("get_nearby_places", _aget_nearby_places)),
+    name="get_nearby_places"
+)
\ No newline at end of file
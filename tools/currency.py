@@ -1,98 +1,107 @@
 """Currency conversion tools."""
 
 import json
-import requests
-from langchain.tools import tool
+import logging
+import os
+from langchain_core.tools import StructuredTool
+from utils.metrics import instrument_tool
+from .gazetteer import get_gazetteer
+from .exchange_rates import exchange_rates
+from .weather import geocode, ageocode
 
-@tool
-def convert_currency(from_city: str, to_city: str) -> str:
+logger = logging.getLogger(__name__)
+
+def _known_currency(city: str):
+    """Currency from the gazetteer, by city or by country name, or None."""
+    gazetteer = get_gazetteer()
+    currency = gazetteer.currency_for(city)
+    if currency is None:
+        currency = gazetteer.currency_for_country(gazetteer.country_code(city))
+    return currency
+
+def _location_currency(city: str, location):
+    """Currency of a geocoded location's country; logs a city nobody could place."""
+    currency = get_gazetteer().currency_for_country(location.get("country")) if location else None
+    if currency is None:
+        logger.warning("No currency found for %r: not in the gazetteer and not geocoded", city)
+    return currency
+
+def _currency_for_city(city: str):
+    """Currency for a city from the gazetteer, else from its geocoded country, else None."""
+    currency = _known_currency(city)
+    if currency is not None:
+        return currency
+    api_key = os.environ.get("OPENWEATHER_API_KEY")
+    return _location_currency(city, geocode(city, api_key) if api_key else None)
+
+async def _acurrency_for_city(city: str):
+    """Async variant of _currency_for_city."""
+    currency = _known_currency(city)
+    if currency is not None:
+        return currency
+    api_key = os.environ.get("OPENWEATHER_API_KEY")
+    return _location_currency(city, await ageocode(city, api_key) if api_key else None)
+
+def _currency_pair(from_city: str, to_city: str):
+    """Resolve the currencies used in both cities."""
+    return _currency_for_city(from_city), _currency_for_city(to_city)
+
+async def _acurrency_pair(from_city: str, to_city: str):
+    """Async variant of _currency_pair."""
+    return await _acurrency_for_city(from_city), await _acurrency_for_city(to_city)
+
+def _unknown_currency_result(from_city: str, to_city: str, from_curr, to_curr) -> str:
+    """Error result naming the cities whose currency could not be found."""
+    unknown = [city for city, curr in ((from_city, from_curr), (to_city, to_curr)) if curr is None]
+    return json.dumps({"error": f"Unknown currency for {' and '.join(unknown)}"})
+
+def _same_currency_result(from_city: str, to_city: str, from_curr: str, to_curr: str) -> str:
+    """Result for two cities that share a currency."""
+    return json.dumps({
+        "from_city": from_city, "to_city": to_city,
+        "from_currency": from_curr, "to_currency": to_curr,
+        "exchange_rate": 1.0, "message": f"Both cities use {from_curr}"
+    })
+
+def _conversion_result(from_city: str, to_city: str, from_curr: str, to_curr: str, rate: float) -> str:
+    """Result for a conversion between two different currencies."""
+    return json.dumps({
+        "from_city": from_city, "to_city": to_city,
+        "from_currency": from_curr, "to_currency": to_curr,
+        "exchange_rate": round(rate, 4),
+        "message": f"1 {from_curr} = {rate:.4f} {to_curr}"
+    })
+
+def _convert_currency(from_city: str, to_city: str) -> str:
     """Get currency conversion information."""
-    city_to_currency = {
-        # United States
-        "new york": "USD", "los angeles": "USD", "chicago": "USD", "san francisco": "USD",
-        "boston": "USD", "seattle": "USD", "miami": "USD", "las vegas": "USD", "philadelphia": "USD",
-        "washington": "USD", "atlanta": "USD", "denver": "USD", "phoenix": "USD", "detroit": "USD",
-        
-        # India
-        "mumbai": "INR", "delhi": "INR", "bangalore": "INR", "chennai": "INR", "kolkata": "INR",
-        "hyderabad": "INR", "pune": "INR", "ahmedabad": "INR", "surat": "INR", "jaipur": "INR",
-        "lucknow": "INR", "kanpur": "INR", "nagpur": "INR", "indore": "INR", "thane": "INR",
-        "bhopal": "INR", "visakhapatnam": "INR", "pimpri-chinchwad": "INR", "patna": "INR",
-        "vadodara": "INR", "ghaziabad": "INR", "ludhiana": "INR", "agra": "INR", "nashik": "INR",
-        "faridabad": "INR", "meerut": "INR", "rajkot": "INR", "kalyan-dombivali": "INR",
-        "vasai-virar": "INR", "varanasi": "INR", "srinagar": "INR", "aurangabad": "INR",
-        "dhanbad": "INR", "amritsar": "INR", "navi mumbai": "INR", "allahabad": "INR",
-        "howrah": "INR", "ranchi": "INR", "gwalior": "INR", "jabalpur": "INR", "coimbatore": "INR",
-        
-        # United Kingdom
-        "london": "GBP", "manchester": "GBP", "edinburgh": "GBP", "birmingham": "GBP",
-        "liverpool": "GBP", "bristol": "GBP", "glasgow": "GBP", "leeds": "GBP",
-        
-        # European Union
-        "paris": "EUR", "berlin": "EUR", "rome": "EUR", "madrid": "EUR", "barcelona": "EUR",
-        "amsterdam": "EUR", "vienna": "EUR", "brussels": "EUR", "milan": "EUR", "munich": "EUR",
-        "prague": "EUR", "budapest": "EUR", "warsaw": "EUR", "dublin": "EUR", "helsinki": "EUR",
-        
-        # Other countries
-        "tokyo": "JPY", "osaka": "JPY", "kyoto": "JPY", "yokohama": "JPY",
-        "singapore": "SGD", "dubai": "AED", "abu dhabi": "AED",
-        "sydney": "AUD", "melbourne": "AUD", "brisbane": "AUD", "perth": "AUD",
-        "toronto": "CAD", "vancouver": "CAD", "montreal": "CAD", "calgary": "CAD",
-        "beijing": "CNY", "shanghai": "CNY", "guangzhou": "CNY", "shenzhen": "CNY",
-        "moscow": "RUB", "st petersburg": "RUB",
-        "sao paulo": "BRL", "rio de janeiro": "BRL",
-        "mexico city": "MXN", "guadalajara": "MXN",
-        "cairo": "EGP", "lagos": "NGN", "johannesburg": "ZAR", "cape town": "ZAR"
-    }
-    
-    def get_currency_for_city(city_name):
-        """Get currency for a city with fallback logic."""
-        city_lower = city_name.lower()
-        
-        # Direct lookup first
-        if city_lower in city_to_currency:
-            return city_to_currency[city_lower]
-        
-        # Fallback patterns for common countries
-        indian_patterns = ['nagar', 'abad', 'pur', 'ganj', 'garh', 'kota', 'puram']
-        us_patterns = ['ville', 'ton', 'burg', 'field', 'wood', 'land', 'city']
-        
-        # Check if city name suggests Indian city
-        for pattern in indian_patterns:
-            if pattern in city_lower:
-                return "INR"
-        
-        # Check if city name suggests US city  
-        for pattern in us_patterns:
-            if pattern in city_lower:
-                return "USD"
+    try:
+        from_curr, to_curr = _currency_pair(from_city, to_city)
+        if from_curr is None or to_curr is None:
+            return _unknown_currency_result(from_city, to_city, from_curr, to_curr)
+        if from_curr == to_curr:
+            return _same_currency_result(from_city, to_city, from_curr, to_curr)
         
-        # Default fallback
-        return "USD"
-    
-    from_curr = get_currency_for_city(from_city)
-    to_curr = get_currency_for_city(to_city)
-    
-    if from_curr == to_curr:
-        return json.dumps({
-            "from_city": from_city, "to_city": to_city,
-            "from_currency": from_curr, "to_currency": to_curr,
-            "exchange_rate": 1.0, "message": f"Both cities use {from_curr}"
-        })
-    
+        rate = exchange_rates.rate(from_curr, to_curr)
+        return _conversion_result(from_city, to_city, from_curr, to_curr, rate)
+    except Exception as e:
+        return json.dumps({"error": str(e)})
+
+async def _aconvert_currency(from_city: str, to_city: str) -> str:
+    """Get currency conversion information."""
     try:
-        url = f"https://api.exchangerate-api.com/v4/latest/{from_curr}"
-        response = requests.get(url, timeout=10)
+        from_curr, to_curr = await _acurrency_pair(from_city, to_city)
+        if from_curr is None or to_curr is None:
+            return _unknown_currency_result(from_city, to_city, from_curr, to_curr)
+        if from_curr == to_curr:
+            return _same_currency_result(from_city, to_city, from_curr, to_curr)
         
-        if response.status_code == 200:
-            data = response.json()
-            rate = data['rates'].get(to_curr, 1.0)
-            return json.dumps({
-                "from_city": from_city, "to_city": to_city,
-                "from_currency": from_curr, "to_currency": to_curr,
-                "exchange_rate": round(rate, 4),
-                "message": f"1 {from_curr} = {rate:.4f} {to_curr}"
-            })
-        return json.dumps({"error": "API unavailable"})
+        rate = await exchange_rates.arate(from_curr, to_curr)
+        return _conversion_result(from_city, to_city, from_curr, to_curr, rate)
     except Exception as e:
-        return json.dumps({"error": str(e)})
\ No newline at end of file
+        return json.dumps({"error": str(e)})
+
+convert_currency = StructuredTool.from_function(
+    func=instrument_tool("convert_currency", _convert_currency),
+    coroutine=instrument_tool("convert_currency", _aconvert_currency),
+    name="convert_currency"
+)
\ No newline at end of file
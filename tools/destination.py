@@ -0,0 +1,108 @@
+"""Destination profile tool: attractions, hotels and nearby places in one LLM call."""
+
+import json
+from langchain_core.tools import StructuredTool
+from llm.structured import structured_output, astructured_output
+from models.places import DestinationProfile
+from utils.cache import tool_cache
+from utils.singleflight import tool_flights
+from utils.metrics import instrument_tool
+from .attractions import attractions_key, nearby_key
+from .hotels import hotels_key
+
+# Profile section -> tool whose cache (and result slot) holds it
+SECTION_TOOLS = {
+    "attractions": "get_top_attractions",
+    "hotels": "get_hotel_recommendations",
+    "nearby_places": "get_nearby_places"
+}
+
+def _profile_prompt(city: str, count: int, num_adults: int, num_kids: int, num_days: int) -> str:
+    """Build the destination profile prompt."""
+    return f"""Build a travel profile of {city} for {num_adults} adults and {num_kids} kids staying {num_days} nights.
+
+Return ONLY a JSON object with three arrays:
+- attractions: the top {count} attractions, each with name, description (1 sentence), category, ticket_price (number in local currency, 0 if free), currency, duration, rating (out of 5)
+- hotels: 5 hotels, each with name, star_rating, price_per_night, currency, guest_rating, amenities (array), location, total_price
+- nearby_places: 6 cities near {city}, each with name, distance_km, transport, famous_for, recommended_duration, estimated_cost"""
+
+def _section_keys(city: str, num_adults: int, num_kids: int, num_days: int):
+    """Attractions count plus the cache key of each section, matching the single-section tools."""
+    count, key = attractions_key(city, num_days)
+    return count, {
+        "attractions": key,
+        "hotels": hotels_key(city, num_adults, num_kids, num_days),
+        "nearby_places": nearby_key(city)
+    }
+
+def _cached_profile(keys):
+    """The whole profile from the single-section caches, or None if any section is missing."""
+    profile = {}
+    for section, key in keys.items():
+        cached = tool_cache.get(SECTION_TOOLS[section], key)
+        if cached is None:
+            return None
+        profile[section] = cached
+    return profile
+
+def _store_profile(keys, profile) -> str:
+    """Cache each section under its single-section tool and return the profile JSON."""
+    sections = profile.model_dump(mode="json")
+    for section, key in keys.items():
+        tool_cache.set_if_valid(SECTION_TOOLS[section], key, sections[section])
+    return json.dumps(sections)
+
+async def _acached_profile(keys):
+    """Async variant of _cached_profile."""
+    profile = {}
+    for section, key in keys.items():
+        cached = await tool_cache.aget(SECTION_TOOLS[section], key)
+        if cached is None:
+            return None
+        profile[section] = cached
+    return profile
+
+async def _astore_profile(keys, profile) -> str:
+    """Async variant of _store_profile."""
+    sections = profile.model_dump(mode="json")
+    for section, key in keys.items():
+        await tool_cache.aset_if_valid(SECTION_TOOLS[section], key, sections[section])
+    return json.dumps(sections)
+
+def _get_destination_profile(city: str, num_adults: int, num_kids: int, num_days: int) -> str:
+    """Get attractions, hotels and nearby places for a city in one request."""
+    count, keys = _section_keys(city, num_adults, num_kids, num_days)
+    cached = _cached_profile(keys)
+    if cached is not None:
+        return json.dumps(cached)
+    
+    try:
+        profile = structured_output(
+            "get_destination_profile", DestinationProfile,
+            _profile_prompt(city, count, num_adults, num_kids, num_days)
+        )
+        return _store_profile(keys, profile)
+    except Exception as e:
+        return json.dumps({"error": str(e)})
+
+async def _aget_destination_profile(city: str, num_adults: int, num_kids: int, num_days: int) -> str:
+    """Get attractions, hotels and nearby places for a city in one request."""
+    count, keys = _section_keys(city, num_adults, num_kids, num_days)
+    cached = await _acached_profile(keys)
+    if cached is not None:
+        return json.dumps(cached)
+    
+    try:
+        profile = await astructured_output(
+            "get_destination_profile", DestinationProfile,
+            _profile_prompt(city, count, num_adults, num_kids, num_days)
+        )
+        return await _astore_profile(keys, profile)
+    except Exception as e:
+        return json.dumps({"error": str(e)})
+
+get_destination_profile = StructuredTool.from_function(
+    func=instrument_tool("get_destination_profile", tool_flights.wrap("get_destination_profile", _get_destination_profile)),
+    coroutine=instrument_tool("get_destination_profile", tool_flights.wrap("get_destination_profile", _aget_destination_profile)),
+    name="get_destination_profile"
+)
@@ -0,0 +1,143 @@
+"""Shared exchange-rate table with cross-rate derivation."""
+
+import asyncio
+import threading
+import time
+
+from config.settings import settings
+from utils.http import get_session
+
+class ExchangeRateUnavailable(Exception):
+    """Raised when no rate table could be obtained from the upstream API."""
+
+class ExchangeRateTable:
+    """Process-wide table of rates against one base currency.
+
+    Any pair is derived from the single base table, so one upstream fetch
+    serves every conversion. Once the table is older than ``ttl`` it keeps
+    being served while a background thread refreshes it; if that refresh
+    fails the stale table stays in use. Concurrent refreshes share one fetch.
+    """
+
+    def __init__(self, api_url, base_currency="USD", ttl=3600, timeout=5, retry_after=60):
+        self.api_url = api_url.rstrip("/")
+        self.base_currency = base_currency
+        self.ttl = ttl
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._rates = None
+        self._fetched_at = 0.0
+        self._failed_at = None
+        self._last_error = None
+        self._inflight = None
+        self._fetch_count = 0
+        self._lock = threading.Lock()
+
+    def _fetch_table(self):
+        """Fetch the base table from the upstream API."""
+        response = get_session().get(f"{self.api_url}/{self.base_currency}", timeout=self.timeout)
+        if response.status_code != 200:
+            raise ExchangeRateUnavailable("API unavailable")
+        rates = dict(response.json()["rates"])
+        rates[self.base_currency] = 1.0
+        return rates
+
+    def refresh(self):
+        """Refresh the table; callers arriving during a fetch wait for it instead."""
+        with self._lock:
+            event = self._inflight
+            leader = event is None
+            if leader:
+                event = self._inflight = threading.Event()
+
+        if not leader:
+            event.wait(self.timeout + 1)
+            return
+
+        try:
+            rates = self._fetch_table()
+            with self._lock:
+                self._rates = rates
+                self._fetched_at = time.monotonic()
+                self._failed_at = None
+                self._last_error = None
+                self._fetch_count += 1
+        except Exception as e:
+            with self._lock:
+                self._failed_at = time.monotonic()
+                self._last_error = e
+        finally:
+            with self._lock:
+                self._inflight = None
+            event.set()
+
+    def _refresh_in_background(self):
+        """Start a background refresh unless one is running or recently failed."""
+        with self._lock:
+            if self._inflight is not None or self._recently_failed():
+                return
+        threading.Thread(target=self.refresh, name="exchange-rate-refresh", daemon=True).start()
+
+    def _recently_failed(self):
+        """Return True while the last failed fetch is inside the retry window."""
+        return self._failed_at is not None and time.monotonic() - self._failed_at < self.retry_after
+
+    def _current_rates(self):
+        """Return the current table, fetching synchronously only on a cold start."""
+        with self._lock:
+            rates, fetched_at, recently_failed = self._rates, self._fetched_at, self._recently_failed()
+
+        if rates is None:
+            if not recently_failed:
+                self.refresh()
+            with self._lock:
+                rates, error = self._rates, self._last_error
+            if rates is None:
+                raise ExchangeRateUnavailable(str(error) if error else "API unavailable")
+        elif time.monotonic() - fetched_at > self.ttl:
+            self._refresh_in_background()
+        return rates
+
+    def rate(self, from_currency: str, to_currency: str) -> float:
+        """Return how many units of ``to_currency`` one ``from_currency`` buys."""
+        if from_currency == to_currency:
+            return 1.0
+        rates = self._current_rates()
+        if from_currency not in rates or to_currency not in rates:
+            raise ExchangeRateUnavailable(f"No rate for {from_currency} -> {to_currency}")
+        return rates[to_currency] / rates[from_currency]
+
+    async def arate(self, from_currency: str, to_currency: str) -> float:
+        """Async variant of rate; a cold-start fetch runs in a worker thread."""
+        with self._lock:
+            warm = self._rates is not None
+        if warm or from_currency == to_currency:
+            return self.rate(from_currency, to_currency)
+        return await asyncio.to_thread(self.rate, from_currency, to_currency)
+
+    def warm(self):
+        """Start loading the table in the background if it is still empty."""
+        with self._lock:
+            empty = self._rates is None
+        if empty:
+            self._refresh_in_background()
+
+    def status(self):
+        """Return table freshness information."""
+        with self._lock:
+            return {
+                "base_currency": self.base_currency,
+                "currencies": len(self._rates or {}),
+                "age_seconds": round(time.monotonic() - self._fetched_at, 1) if self._rates else None,
+                "stale": bool(self._rates) and time.monotonic() - self._fetched_at > self.ttl,
+                "fetch_count": self._fetch_count,
+                "last_error": str(self._last_error) if self._last_error else None
+            }
+
+# Shared rate table
+exchange_rates = ExchangeRateTable(
+    api_url=settings.EXCHANGE_RATE_API_URL,
+    base_currency=settings.EXCHANGE_RATE_BASE_CURRENCY,
+    ttl=settings.EXCHANGE_RATE_TTL,
+    timeout=settings.EXCHANGE_RATE_TIMEOUT
+)
@@ -0,0 +1,219 @@
+"""Precompiled city gazetteer: city -> ISO country -> currency, plus coordinates.
+
+The gazetteer is a packed, gzip-compressed tab-separated file loaded once per
+process into flat lists and one dict keyed by normalized name, so a lookup is
+a string normalization and a dict hit. Names are matched case-folded and
+accent-insensitive ("São Paulo", "sao paulo" and "SAO PAULO" are the same
+key), aliases are indexed alongside primary names, and "City, Country" input
+uses the country part to pick between cities that share a name.
+
+Cities are stored in priority order (by population when built from GeoNames),
+so an ambiguous name resolves to the most prominent city unless a country is
+given. The bundled file is a curated seed of about 1,800 cities (capitals,
+large cities and common destinations, with aliases such as "Goa" for
+Panaji); a larger one can be built from the GeoNames dumps with::
+
+    python -m tools.gazetteer cities15000.txt countryInfo.txt -o tools/data/gazetteer.tsv.gz
+"""
+
+import argparse
+import gzip
+import os
+import re
+import threading
+import unicodedata
+from collections import namedtuple
+
+from config.settings import settings
+
+BUNDLED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gazetteer.tsv.gz")
+FORMAT_HEADER = "# gazetteer v1"
+
+Place = namedtuple("Place", ["name", "country", "currency", "lat", "lon"])
+
+# Letters NFKD does not decompose into a base letter plus accents
+_TRANSLITERATE = str.maketrans({
+    "ø": "o", "Ø": "o", "æ": "ae", "Æ": "ae", "œ": "oe", "Œ": "oe", "ł": "l", "Ł": "l",
+    "đ": "d", "Đ": "d", "ð": "d", "Ð": "d", "þ": "th", "Þ": "th", "ı": "i", "ħ": "h", "Ħ": "h"
+})
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+# Spelling variants folded to one token
+_TOKENS = {"saint": "st", "sankt": "st", "sainte": "ste", "mount": "mt", "fort": "ft"}
+
+def normalize(name: str) -> str:
+    """Lookup key for a place name: accents stripped, case-folded, punctuation collapsed."""
+    text = unicodedata.normalize("NFKD", name.translate(_TRANSLITERATE))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    tokens = _NON_ALNUM.sub(" ", text).split()
+    return " ".join(_TOKENS.get(token, token) for token in tokens)
+
+class Gazetteer:
+    """In-memory index over a packed gazetteer.
+
+    ``countries`` maps ISO 3166-1 alpha-2 codes to ``(currency, names)`` and
+    ``cities`` is a list of ``(name, country, lat, lon, aliases)`` in priority
+    order.
+    """
+
+    def __init__(self, countries, cities):
+        self._currencies = {}
+        self._country_keys = {}
+        for code, (currency, names) in countries.items():
+            self._currencies[code] = currency
+            self._country_keys[normalize(code)] = code
+            for name in names:
+                self._country_keys.setdefault(normalize(name), code)
+
+        self._names, self._countries, self._coords = [], [], []
+        # Key -> index of the highest-priority city; ambiguous keys also keep all indexes
+        self._index = {}
+        self._alternatives = {}
+        for name, country, lat, lon, aliases in cities:
+            position = len(self._names)
+            self._names.append(name)
+            self._countries.append(country)
+            self._coords.append((lat, lon))
+            for key in {normalize(n) for n in (name, *aliases)}:
+                if not key:
+                    continue
+                first = self._index.setdefault(key, position)
+                if first != position:
+                    self._alternatives.setdefault(key, [first]).append(position)
+
+    def __len__(self):
+        return len(self._names)
+
+    def country_code(self, name: str):
+        """ISO code for a country name, alias or code, or None."""
+        return self._country_keys.get(normalize(name))
+
+    def currency_for_country(self, code: str):
+        """Currency code used in a country, or None."""
+        return self._currencies.get((code or "").upper())
+
+    def _place(self, position):
+        country = self._countries[position]
+        lat, lon = self._coords[position]
+        return Place(self._names[position], country, self._currencies.get(country), lat, lon)
+
+    def lookup(self, query: str, country: str = None):
+        """Return the Place for a city, or None.
+
+        ``query`` may carry a country after a comma ("Kingston, Canada" or
+        "Kingston, CA"); ``country`` does the same explicitly. Without one,
+        the highest-priority city with that name wins.
+        """
+        city, _, hint = query.partition(",")
+        key = normalize(city)
+        position = self._index.get(key)
+        if position is None:
+            return None
+        hint = country or hint.strip()
+        code = self.country_code(hint) if hint else None
+        if code is not None and self._countries[position] != code:
+            for candidate in self._alternatives.get(key, ()):
+                if self._countries[candidate] == code:
+                    return self._place(candidate)
+        return self._place(position)
+
+    def currency_for(self, query: str):
+        """Currency of the country a city is in, or None if the city is unknown."""
+        place = self.lookup(query)
+        return place.currency if place else None
+
+    @classmethod
+    def load(cls, path: str):
+        """Read a packed gazetteer file."""
+        countries, cities = {}, []
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = f.readline().rstrip("\n")
+            if header != FORMAT_HEADER:
+                raise ValueError(f"{path} is not a packed gazetteer ({header!r})")
+            for line in f:
+                fields = line.rstrip("\n").split("\t")
+                if fields[0] == "C":
+                    _, code, currency, names = fields
+                    countries[code] = (currency, names.split("|") if names else [])
+                elif fields[0] == "P":
+                    _, name, country, lat, lon, aliases = fields
+                    cities.append((name, country, float(lat), float(lon), aliases.split("|") if aliases else []))
+        return cls(countries, cities)
+
+def pack(countries, cities, path: str):
+    """Write a packed gazetteer; ``cities`` must already be in priority order."""
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=9) as f:
+        f.write(FORMAT_HEADER + "\n")
+        for code, (currency, names) in sorted(countries.items()):
+            f.write(f"C\t{code}\t{currency}\t{'|'.join(names)}\n")
+        for name, country, lat, lon, aliases in cities:
+            f.write(f"P\t{name}\t{country}\t{lat:.4f}\t{lon:.4f}\t{'|'.join(aliases)}\n")
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+def get_gazetteer():
+    """Return the process-wide gazetteer, loading GAZETTEER_PATH on first use."""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer.load(settings.GAZETTEER_PATH or BUNDLED_PATH)
+    return _gazetteer
+
+def _is_latin(text: str) -> bool:
+    return all(not ch.isalpha() or unicodedata.name(ch, "").startswith("LATIN") for ch in text)
+
+def _latin_aliases(alternate_names, name, limit):
+    """Distinct Latin-script alternate names, skipping short codes and repeats of ``name``."""
+    seen = {normalize(name)}
+    aliases = []
+    for alias in alternate_names.split(","):
+        key = normalize(alias)
+        if len(key) < 3 or key in seen or not _is_latin(alias):
+            continue
+        seen.add(key)
+        aliases.append(alias)
+        if len(aliases) == limit:
+            break
+    return aliases
+
+def read_geonames(cities_path: str, country_info_path: str, min_population: int = 0, max_aliases: int = 6):
+    """Countries and priority-ordered cities from GeoNames ``cities*.txt`` and ``countryInfo.txt``."""
+    countries = {}
+    with open(country_info_path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            fields = line.rstrip("\n").split("\t")
+            code, name, currency = fields[0], fields[4], fields[10]
+            if currency:
+                countries[code] = (currency, [name, fields[1]])
+
+    rows = []
+    with open(cities_path, encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            name, ascii_name, alternates, lat, lon, country = fields[1], fields[2], fields[3], fields[4], fields[5], fields[8]
+            population = int(fields[14] or 0)
+            if country not in countries or population < min_population:
+                continue
+            aliases = ([ascii_name] if normalize(ascii_name) != normalize(name) else [])
+            aliases += _latin_aliases(alternates, name, max_aliases)
+            rows.append((population, (name, country, float(lat), float(lon), aliases)))
+    rows.sort(key=lambda row: row[0], reverse=True)
+    return countries, [city for _, city in rows]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pack a gazetteer from GeoNames dumps")
+    parser.add_argument("cities", help="GeoNames cities file, e.g. cities15000.txt")
+    parser.add_argument("country_info", help="GeoNames countryInfo.txt")
+    parser.add_argument("-o", "--output", default=BUNDLED_PATH, help="Packed gazetteer to write")
+    parser.add_argument("--min-population", type=int, default=0, help="Skip smaller cities")
+    parser.add_argument("--max-aliases", type=int, default=6, help="Alternate names kept per city")
+    args = parser.parse_args(argv)
+    countries, cities = read_geonames(args.cities, args.country_info, args.min_population, args.max_aliases)
+    pack(countries, cities, args.output)
+    print(f"Packed {len(cities)} cities in {len(countries)} countries into {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,64 @@
 """Hotel recommendation tools."""
 
 import json
-import re
-from langchain.tools import tool
-from llm.config import llm
+from langchain_core.tools import StructuredTool
+from llm.structured import structured_items, astructured_items
+from models.places import HotelList
+from utils.cache import tool_cache, cache_key
+from utils.singleflight import tool_flights
+from utils.metrics import instrument_tool
 
-@tool
-def get_hotel_recommendations(city: str, num_adults: int, num_kids: int, num_days: int) -> str:
-    """Get hotel recommendations."""
-    prompt = f"""Suggest 5 hotels in {city} for {num_adults} adults and {num_kids} kids for {num_days} nights.
+def _hotels_prompt(city: str, num_adults: int, num_kids: int, num_days: int) -> str:
+    """Build the hotel recommendations prompt."""
+    return f"""Suggest 5 hotels in {city} for {num_adults} adults and {num_kids} kids for {num_days} nights.
 
 For each hotel, provide:
 - name, star_rating, price_per_night, currency, guest_rating, amenities (array), location, total_price
 
-Return ONLY a valid JSON array."""
+Return ONLY a JSON object of the form {{"items": [...]}}."""
+
+def hotels_key(city: str, num_adults: int, num_kids: int, num_days: int) -> str:
+    """Cache key for a hotel recommendations request."""
+    return cache_key(city, num_adults=num_adults, num_kids=num_kids, num_days=num_days)
+
+def _store_hotels(key: str, items) -> str:
+    """Cache validated hotels and return them as the tool's JSON result."""
+    tool_cache.set_if_valid("get_hotel_recommendations", key, items)
+    return json.dumps(items)
+
+async def _astore_hotels(key: str, items) -> str:
+    """Async variant of _store_hotels."""
+    await tool_cache.aset_if_valid("get_hotel_recommendations", key, items)
+    return json.dumps(items)
+
+def _get_hotel_recommendations(city: str, num_adults: int, num_kids: int, num_days: int) -> str:
+    """Get hotel recommendations."""
+    key = hotels_key(city, num_adults, num_kids, num_days)
+    cached = tool_cache.get("get_hotel_recommendations", key)
+    if cached is not None:
+        return json.dumps(cached)
+    
+    try:
+        items = structured_items("get_hotel_recommendations", HotelList, _hotels_prompt(city, num_adults, num_kids, num_days))
+        return _store_hotels(key, items)
+    except Exception as e:
+        return json.dumps([{"error": str(e)}])
+
+async def _aget_hotel_recommendations(city: str, num_adults: int, num_kids: int, num_days: int) -> str:
+    """Get hotel recommendations."""
+    key = hotels_key(city, num_adults, num_kids, num_days)
+    cached = await tool_cache.aget("get_hotel_recommendations", key)
+    if cached is not None:
+        return json.dumps(cached)
     
     try:
-        response = llm.invoke(prompt)
-        content = response.content
-        json_match = re.search(r'\[.*\]', content, re.DOTALL)
-        
-        if json_match:
-            return json_match.group()
-        return json.dumps([{"error": "No data"}])
+        items = await astructured_items("get_hotel_recommendations", HotelList, _hotels_prompt(city, num_adults, num_kids, num_days))
+        return await _astore_hotels(key, items)
     except Exception as e:
-        return json.dumps([{"error": str(e)}])
\ No newline at end of file
+        return json.dumps([{"error": str(e)}])
+
+get_hotel_recommendations = StructuredTool.from_function(
+    func=instrument_tool("get_hotel_recommendations", tool_flights.wrap("get_hotel_recommendations", _get_hotel_recommendations)),
+    coroutine=instrument_tool("get_hotel_recommendations", tool_flights.wrap("get_hotel_recommendations", _aget_hotel_recommendations)),
+    name="get_hotel_recommendations"
+)
\ No newline at end of file
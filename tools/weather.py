@@ -2,64 +2,189 @@
 
 import json
 import os
-import requests
+import time
 from datetime import datetime
-from langchain.tools import tool
+from typing import Optional
+from langchain_core.tools import StructuredTool
+from config.settings import settings
+from utils.cache import tool_cache, cache_key
+from utils.singleflight import tool_flights
+from utils.metrics import instrument_tool
+from utils.http import get_session, get_async_client
+from .gazetteer import get_gazetteer
 
-@tool
-def get_weather_info(city: str, date: str = None) -> str:
+FORECAST_SLOT_SECONDS = 3 * 3600
+GEO_URL = f"{settings.OPENWEATHER_API_URL}/geo/1.0/direct"
+FORECAST_URL = f"{settings.OPENWEATHER_API_URL}/data/2.5/forecast"
+
+def _reduce_forecast(data):
+    """Reduce the 3-hourly forecast list to one midday entry per day."""
+    forecasts = []
+    seen_dates = set()
+    
+    for item in data['list'][:40]:
+        dt = datetime.fromtimestamp(item['dt'])
+        date_str = dt.strftime('%Y-%m-%d')
+        
+        if date_str not in seen_dates and dt.hour in [12, 13, 14, 15]:
+            seen_dates.add(date_str)
+            forecasts.append({
+                "date": date_str,
+                "day": dt.strftime('%A'),
+                "temperature": round(item['main']['temp'], 1),
+                "feels_like": round(item['main']['feels_like'], 1),
+                "condition": item['weather'][0]['description'].title(),
+                "humidity": item['main']['humidity'],
+                "wind_speed": round(item['wind']['speed'], 1)
+            })
+        
+        if len(forecasts) == 5:
+            break
+    return forecasts
+
+def _parse_geocode(geo_response):
+    """Resolved location from a geocoding response, or None."""
+    if geo_response.status_code != 200 or not geo_response.json():
+        return None
+    
+    geo_data = geo_response.json()
+    return {
+        "lat": geo_data[0]['lat'],
+        "lon": geo_data[0]['lon'],
+        "country": geo_data[0].get('country', 'Unknown')
+    }
+
+def _store_geocode(key: str, geo_response):
+    """Parse a geocoding response and cache the resolved location."""
+    location = _parse_geocode(geo_response)
+    tool_cache.set_if_valid("geocode", key, location)
+    return location
+
+def _forecast_slot():
+    """Return the current 3-hour forecast slot and the seconds left in it."""
+    now = time.time()
+    slot = int(now // FORECAST_SLOT_SECONDS)
+    return slot, (slot + 1) * FORECAST_SLOT_SECONDS - now
+
+def _forecast_key(lat: float, lon: float, slot: int):
+    """Cache key for a forecast: coordinates rounded to ~1 km plus the slot."""
+    return cache_key(round(lat, 2), round(lon, 2), slot=slot)
+
+def _parse_forecast(weather_response):
+    """Reduced forecasts from a forecast response, or None."""
+    if weather_response.status_code != 200:
+        return None
+    return _reduce_forecast(weather_response.json())
+
+def _store_forecast(key: str, slot_remaining: float, weather_response):
+    """Reduce a forecast response and cache it until the slot ends."""
+    forecasts = _parse_forecast(weather_response)
+    tool_cache.set_if_valid("forecast", key, forecasts, ttl=slot_remaining)
+    return forecasts
+
+def _known_location(city: str):
+    """Location from the bundled gazetteer, or None if the city is not in it."""
+    place = get_gazetteer().lookup(city)
+    if place is None:
+        return None
+    return {"lat": place.lat, "lon": place.lon, "country": place.country}
+
+def geocode(city: str, api_key: str):
+    """Resolve a city to coordinates via the gazetteer, then the geocode cache, then the API."""
+    location = _known_location(city)
+    if location is not None:
+        return location
+    key = cache_key(city)
+    cached = tool_cache.get("geocode", key)
+    if cached is not None:
+        return cached
+    
+    geo_params = {"q": city, "limit": 1, "appid": api_key}
+    geo_response = get_session().get(GEO_URL, params=geo_params, timeout=10)
+    return _store_geocode(key, geo_response)
+
+async def ageocode(city: str, api_key: str):
+    """Async variant of geocode using the shared async client."""
+    location = _known_location(city)
+    if location is not None:
+        return location
+    key = cache_key(city)
+    cached = await tool_cache.aget("geocode", key)
+    if cached is not None:
+        return cached
+    
+    geo_params = {"q": city, "limit": 1, "appid": api_key}
+    geo_response = await get_async_client().get(GEO_URL, params=geo_params, timeout=10)
+    location = _parse_geocode(geo_response)
+    await tool_cache.aset_if_valid("geocode", key, location)
+    return location
+
+def _forecast(lat: float, lon: float, api_key: str):
+    """Return the reduced forecast for a location, cached per 3-hour forecast slot."""
+    slot, slot_remaining = _forecast_slot()
+    key = _forecast_key(lat, lon, slot)
+    cached = tool_cache.get("forecast", key)
+    if cached is not None:
+        return cached
+    
+    weather_params = {"lat": lat, "lon": lon, "appid": api_key, "units": "metric"}
+    weather_response = get_session().get(FORECAST_URL, params=weather_params, timeout=10)
+    return _store_forecast(key, slot_remaining, weather_response)
+
+async def _aforecast(lat: float, lon: float, api_key: str):
+    """Async variant of _forecast using the shared async client."""
+    slot, slot_remaining = _forecast_slot()
+    key = _forecast_key(lat, lon, slot)
+    cached = await tool_cache.aget("forecast", key)
+    if cached is not None:
+        return cached
+    
+    weather_params = {"lat": lat, "lon": lon, "appid": api_key, "units": "metric"}
+    weather_response = await get_async_client().get(FORECAST_URL, params=weather_params, timeout=10)
+    forecasts = _parse_forecast(weather_response)
+    await tool_cache.aset_if_valid("forecast", key, forecasts, ttl=slot_remaining)
+    return forecasts
+
+def _weather_result(city: str, location, forecasts):
+    """Build the tool's JSON result from the resolved location and forecast."""
+    if location is None:
+        return json.dumps({"error": "City not found"})
+    if forecasts is None:
+        return json.dumps({"error": "Weather API error"})
+    return json.dumps({
+        "city": city,
+        "country": location["country"],
+        "forecasts": forecasts
+    })
+
+def _get_weather_info(city: str, date: Optional[str] = None) -> str:
     """Get weather information for a city."""
     try:
         api_key = os.environ.get("OPENWEATHER_API_KEY")
         if not api_key:
             return json.dumps({"error": "API key not configured"})
         
-        # Get coordinates
-        geo_url = "http://api.openweathermap.org/geo/1.0/direct"
-        geo_params = {"q": city, "limit": 1, "appid": api_key}
-        geo_response = requests.get(geo_url, params=geo_params, timeout=10)
-        
-        if geo_response.status_code != 200 or not geo_response.json():
-            return json.dumps({"error": "City not found"})
-        
-        geo_data = geo_response.json()
-        lat, lon = geo_data[0]['lat'], geo_data[0]['lon']
-        
-        # Get weather forecast
-        weather_url = "http://api.openweathermap.org/data/2.5/forecast"
-        weather_params = {"lat": lat, "lon": lon, "appid": api_key, "units": "metric"}
-        weather_response = requests.get(weather_url, params=weather_params, timeout=10)
-        
-        if weather_response.status_code == 200:
-            data = weather_response.json()
-            forecasts = []
-            seen_dates = set()
-            
-            for item in data['list'][:40]:
-                dt = datetime.fromtimestamp(item['dt'])
-                date_str = dt.strftime('%Y-%m-%d')
-                
-                if date_str not in seen_dates and dt.hour in [12, 13, 14, 15]:
-                    seen_dates.add(date_str)
-                    forecasts.append({
-                        "date": date_str,
-                        "day": dt.strftime('%A'),
-                        "temperature": round(item['main']['temp'], 1),
-                        "feels_like": round(item['main']['feels_like'], 1),
-                        "condition": item['weather'][0]['description'].title(),
-                        "humidity": item['main']['humidity'],
-                        "wind_speed": round(item['wind']['speed'], 1)
-                    })
-                
-                if len(forecasts) == 5:
-                    break
-            
-            return json.dumps({
-                "city": city,
-                "country": geo_data[0].get('country', 'Unknown'),
-                "forecasts": forecasts
-            })
+        location = geocode(city, api_key)
+        forecasts = _forecast(location["lat"], location["lon"], api_key) if location else None
+        return _weather_result(city, location, forecasts)
+    except Exception as e:
+        return json.dumps({"error": str(e)})
+
+async def _aget_weather_info(city: str, date: Optional[str] = None) -> str:
+    """Get weather information for a city."""
+    try:
+        api_key = os.environ.get("OPENWEATHER_API_KEY")
+        if not api_key:
+            return json.dumps({"error": "API key not configured"})
         
-        return json.dumps({"error": "Weather API error"})
+        location = await ageocode(city, api_key)
+        forecasts = await _aforecast(location["lat"], location["lon"], api_key) if location else None
+        return _weather_result(city, location, forecasts)
     except Exception as e:
-        return json.dumps({"error": str(e)})
\ No newline at end of file
+        return json.dumps({"error": str(e)})
+
+get_weather_info = StructuredTool.from_function(
+    func=instrument_tool("get_weather_info", tool_flights.wrap("get_weather_info", _get_weather_info)),
+    coroutine=instrument_tool("get_weather_info", tool_flights.wrap("get_weather_info", _aget_weather_info)),
+    name="get_weather_info"
+)
\ No newline at end of file
@@ -1,3 +1,9 @@
-from .export import export_to_excel
+from .export import export_to_excel, export_to_excel_bytes, ExportCache
+from .cache import ResultCache, tool_cache, cache_key
+from .singleflight import SingleFlight, tool_flights
+from .metrics import MetricsRegistry, registry
 
-__all__ = ['export_to_excel']
\ No newline at end of file
+__all__ = [
+    'export_to_excel', 'export_to_excel_bytes', 'ExportCache', 'ResultCache', 'tool_cache', 'cache_key',
+    'SingleFlight', 'tool_flights', 'MetricsRegistry', 'registry'
+]
\ No newline at end of file
@@ -0,0 +1,273 @@
+"""Two-tier (memory + SQLite) cache for tool results.
+
+Async callers use ``aget`` / ``aset_if_valid``, which serve the memory tier
+inline and run SQLite reads and writes in a worker thread, off the event loop.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from config.settings import settings
+
+def _normalize(value):
+    """Normalize a key component so equivalent inputs share an entry."""
+    if isinstance(value, str):
+        return " ".join(value.casefold().split())
+    return value
+
+def cache_key(*parts, **params):
+    """Build a stable cache key from positional parts and keyword parameters."""
+    return json.dumps(
+        [[_normalize(p) for p in parts], {k: _normalize(v) for k, v in sorted(params.items())}],
+        separators=(",", ":"),
+        ensure_ascii=False
+    )
+
+def is_cacheable(value):
+    """Return True for non-empty results that are not error fallbacks."""
+    if isinstance(value, dict):
+        return bool(value) and "error" not in value
+    if isinstance(value, list):
+        return bool(value) and all(isinstance(v, dict) and "error" not in v for v in value)
+    return False
+
+class ResultCache:
+    """LRU memory tier in front of a SQLite tier, with TTLs per namespace.
+
+    Namespaces are usually tool names. Values are stored as JSON, so only
+    JSON-serializable results can be cached.
+    """
+
+    def __init__(self, db_path=None, memory_max_entries=512, disk_max_entries=10000,
+                 ttls=None, default_ttl=3600, enabled=True):
+        self.enabled = enabled
+        self.db_path = db_path
+        self.memory_max_entries = memory_max_entries
+        self.disk_max_entries = disk_max_entries
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._writes_since_prune = 0
+        # Disk-hit access times not yet written: full key -> time
+        self._accessed = {}
+        self._stats = defaultdict(lambda: {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0})
+        self._evictions = {"memory": 0, "disk": 0}
+
+    def _connect(self):
+        """Open the SQLite tier on first use."""
+        if self._conn is None and self.db_path:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, namespace TEXT NOT NULL, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+            self._conn.commit()
+        return self._conn
+
+    def ttl_for(self, namespace):
+        """Return the TTL in seconds for a namespace."""
+        return self.ttls.get(namespace, self.default_ttl)
+
+    def _get_memory(self, namespace, full_key, now):
+        """Memory-tier lookup; counts a hit. Call with the lock held."""
+        entry = self._memory.get(full_key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > now:
+                self._memory.move_to_end(full_key)
+                self._stats[namespace]["memory_hits"] += 1
+                return value
+            del self._memory[full_key]
+        return None
+
+    def _get_disk(self, namespace, full_key, now):
+        """SQLite-tier lookup, promoting a hit to memory; counts the hit or miss.
+        
+        The access time is only recorded here and written with the next
+        store, so a hit costs one SELECT and no commit. Expired rows are left
+        for the next prune.
+        """
+        with self._lock:
+            conn = self._connect()
+            if conn is not None:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM cache WHERE key = ?", (full_key,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    self._accessed[full_key] = now
+                    value = json.loads(row[0])
+                    self._remember(full_key, value, row[1])
+                    self._stats[namespace]["disk_hits"] += 1
+                    return value
+            self._stats[namespace]["misses"] += 1
+            return None
+
+    def get(self, namespace, key):
+        """Return the cached value or None when missing or expired."""
+        if not self.enabled:
+            return None
+        full_key = f"{namespace}:{key}"
+        now = time.time()
+        with self._lock:
+            value = self._get_memory(namespace, full_key, now)
+        if value is not None:
+            return value
+        return self._get_disk(namespace, full_key, now)
+
+    async def aget(self, namespace, key):
+        """Async ``get``: the SQLite tier is read in a worker thread."""
+        if not self.enabled:
+            return None
+        full_key = f"{namespace}:{key}"
+        now = time.time()
+        with self._lock:
+            value = self._get_memory(namespace, full_key, now)
+            if value is None and not self.db_path:
+                self._stats[namespace]["misses"] += 1
+                return None
+        if value is not None:
+            return value
+        return await asyncio.to_thread(self._get_disk, namespace, full_key, now)
+
+    def _set_memory(self, namespace, key, value, ttl):
+        """Store in the memory tier; returns the full key, expiry and time for the disk write."""
+        full_key = f"{namespace}:{key}"
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.ttl_for(namespace))
+        with self._lock:
+            self._remember(full_key, value, expires_at)
+            self._stats[namespace]["stores"] += 1
+        return full_key, expires_at, now
+
+    def _set_disk(self, namespace, full_key, value, expires_at, now):
+        """Write one entry, plus any pending access times, to the SQLite tier."""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            self._flush_accessed(conn)
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, namespace, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (full_key, namespace, json.dumps(value), expires_at, now)
+            )
+            conn.commit()
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= 100:
+                self._prune_disk(now)
+
+    def set(self, namespace, key, value, ttl=None):
+        """Store a value in both tiers."""
+        if not self.enabled:
+            return
+        full_key, expires_at, now = self._set_memory(namespace, key, value, ttl)
+        if self.db_path:
+            self._set_disk(namespace, full_key, value, expires_at, now)
+
+    async def aset(self, namespace, key, value, ttl=None):
+        """Async ``set``: the SQLite tier is written in a worker thread."""
+        if not self.enabled:
+            return
+        full_key, expires_at, now = self._set_memory(namespace, key, value, ttl)
+        if self.db_path:
+            await asyncio.to_thread(self._set_disk, namespace, full_key, value, expires_at, now)
+
+    def set_if_valid(self, namespace, key, value, ttl=None):
+        """Store a value only if it is a valid, non-error result."""
+        if is_cacheable(value):
+            self.set(namespace, key, value, ttl)
+            return True
+        return False
+
+    async def aset_if_valid(self, namespace, key, value, ttl=None):
+        """Async ``set_if_valid``."""
+        if is_cacheable(value):
+            await self.aset(namespace, key, value, ttl)
+            return True
+        return False
+
+    def set_json_if_valid(self, namespace, key, text, ttl=None):
+        """Parse a raw JSON string and store it only if it is a valid result."""
+        try:
+            value = json.loads(text)
+        except ValueError:
+            return False
+        return self.set_if_valid(namespace, key, value, ttl)
+
+    def _remember(self, full_key, value, expires_at):
+        """Insert into the memory tier, evicting least recently used entries."""
+        self._memory[full_key] = (value, expires_at)
+        self._memory.move_to_end(full_key)
+        while len(self._memory) > self.memory_max_entries:
+            self._memory.popitem(last=False)
+            self._evictions["memory"] += 1
+
+    def _flush_accessed(self, conn):
+        """Write access times recorded by disk hits since the last store."""
+        if self._accessed:
+            conn.executemany("UPDATE cache SET accessed_at = ? WHERE key = ?",
+                             [(at, key) for key, at in self._accessed.items()])
+            self._accessed.clear()
+
+    def _prune_disk(self, now):
+        """Drop expired rows and trim the SQLite tier to its size bound."""
+        self._writes_since_prune = 0
+        conn = self._conn
+        self._flush_accessed(conn)
+        conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        count = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        excess = count - self.disk_max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY accessed_at ASC LIMIT ?)", (excess,)
+            )
+            self._evictions["disk"] += excess
+        conn.commit()
+
+    def clear(self):
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._accessed.clear()
+            conn = self._connect()
+            if conn is not None:
+                conn.execute("DELETE FROM cache")
+                conn.commit()
+
+    def stats(self):
+        """Return hit/miss counters per namespace plus tier sizes."""
+        with self._lock:
+            namespaces = {}
+            for namespace, counts in self._stats.items():
+                lookups = counts["memory_hits"] + counts["disk_hits"] + counts["misses"]
+                hits = counts["memory_hits"] + counts["disk_hits"]
+                namespaces[namespace] = dict(counts, hit_rate=round(hits / lookups, 4) if lookups else 0.0)
+            return {
+                "namespaces": namespaces,
+                "memory_entries": len(self._memory),
+                "evictions": dict(self._evictions)
+            }
+
+# Shared cache for tool results
+tool_cache = ResultCache(
+    db_path=settings.CACHE_DB_PATH or None,
+    memory_max_entries=settings.CACHE_MEMORY_MAX_ENTRIES,
+    disk_max_entries=settings.CACHE_DISK_MAX_ENTRIES,
+    ttls=settings.CACHE_TTLS,
+    default_ttl=settings.CACHE_DEFAULT_TTL,
+    enabled=settings.CACHE_ENABLED
+)
@@ -1,9 +1,19 @@
 """Utility functions for exporting and data processing."""
 
-import pandas as pd
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill
-from openpyxl.utils.dataframe import dataframe_to_rows
+import csv
+import io
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+from functools import lru_cache
+
+from utils.metrics import export_duration, timed
+
+# openpyxl is imported on first export, so the API starts without loading it
+HEADER_COLOR = "CCCCCC"
+TOTAL_COLOR = "FFFF00"
+XLSX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
 
 def clean_data_for_excel(data_items):
     """Clean data items by converting lists to comma-separated strings."""
@@ -20,131 +30,298 @@ def clean_data_for_excel(data_items):
         cleaned_items.append(cleaned_item)
     return cleaned_items
 
-def export_to_excel(state, filename: str):
-    """Export trip plan to Excel"""
+def _columns(items):
+    """Column names in first-seen order across all items."""
+    columns = {}
+    for item in items:
+        for key in item:
+            columns.setdefault(key, None)
+    return list(columns)
+
+@lru_cache(maxsize=None)
+def _fill(color):
+    """Solid fill for a background color."""
+    from openpyxl.styles import PatternFill
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+def _styled_row(ws, values, bold=False, size=None, fill=None):
+    """Build a row of write-only cells sharing one style."""
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    font = Font(size=size, bold=bold) if bold or size else None
+    row = []
+    for value in values:
+        cell = WriteOnlyCell(ws, value=value)
+        if font is not None:
+            cell.font = font
+        if fill is not None:
+            cell.fill = _fill(fill)
+        row.append(cell)
+    return row
+
+def _write_table(wb, sheet_name, title, items, merge_range, highlight_last=False):
+    """Write a titled table sheet: title row, header row, then one row per item."""
+    ws = wb.create_sheet(sheet_name)
+    ws.merged_cells.add(merge_range)
+    ws.append(_styled_row(ws, [title], bold=True, size=14))
+
+    columns = _columns(items)
+    ws.append(_styled_row(ws, columns, bold=True, fill=HEADER_COLOR))
+    for idx, item in enumerate(items):
+        values = [item.get(column) for column in columns]
+        if highlight_last and idx == len(items) - 1:
+            ws.append(_styled_row(ws, values, bold=True, fill=TOTAL_COLOR))
+        else:
+            ws.append(values)
+
+def write_workbook(state, fileobj):
+    """Write the trip plan workbook for ``state`` into a binary file object.
+
+    Uses openpyxl's write-only mode, so rows are streamed out as they are
+    added instead of building the whole sheet model in memory.
+    """
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+
+    # Trip Summary
+    ws = wb.create_sheet("Trip Summary")
+    ws.column_dimensions['A'].width = 20
+    ws.column_dimensions['B'].width = 30
+    ws.merged_cells.add('A1:D1')
+    ws.append(_styled_row(
+        ws,
+        [f"Trip Plan: {state.get('from_city', 'N/A')} → {state.get('to_city', 'N/A')}"],
+        bold=True,
+        size=16
+    ))
+    ws.append([])
+
+    summary_data = [
+        ["From", state.get('from_city', 'N/A')],
+        ["To", state.get('to_city', 'N/A')],
+        ["Arrival Date", state.get('arrival_date', 'N/A')],
+        ["Duration", f"{state.get('num_days', 0)} days"],
+        ["Travelers", f"{state.get('num_adults', 0)} adults, {state.get('num_kids', 0)} children"]
+    ]
+    for label, value in summary_data:
+        ws.append(_styled_row(ws, [label], bold=True) + [value])
+
+    # Weather Sheet
+    if state.get("weather_data") and "forecasts" in state["weather_data"]:
+        _write_table(wb, "Weather Forecast", "5-Day Weather Forecast",
+                     state["weather_data"]["forecasts"], 'A1:G1')
+
+    # Attractions Sheet
+    if state.get("attractions_data") and "items" in state["attractions_data"]:
+        _write_table(wb, "Top Attractions", "Top Attractions",
+                     clean_data_for_excel(state["attractions_data"]["items"]), 'A1:H1')
+
+    # Hotels Sheet
+    if state.get("hotel_data") and "items" in state["hotel_data"]:
+        _write_table(wb, "Hotel Recommendations", "Hotel Recommendations",
+                     clean_data_for_excel(state["hotel_data"]["items"]), 'A1:H1')
+
+    # Expenses Sheet (the last item is the total row)
+    if state.get("expenses_data") and "items" in state["expenses_data"]:
+        _write_table(wb, "Trip Expenses", "Trip Expenses Breakdown",
+                     clean_data_for_excel(state["expenses_data"]["items"]), 'A1:D1',
+                     highlight_last=True)
+
+    # Itinerary Sheet
+    if state.get("itinerary"):
+        itinerary_ws = wb.create_sheet("Detailed Itinerary")
+        itinerary_ws.column_dimensions['A'].width = 100
+        itinerary_ws.append(_styled_row(itinerary_ws, ["Detailed Day-by-Day Itinerary"], bold=True, size=14))
+        itinerary_ws.append([])
+        for line in state["itinerary"].split('\n'):
+            itinerary_ws.append([line])
+
+    wb.save(fileobj)
+
+@timed(export_duration, "trip_xlsx")
+def export_to_excel_bytes(state) -> bytes:
+    """Build the trip plan workbook in memory and return its bytes."""
     try:
-        wb = openpyxl.Workbook()
-        if 'Sheet' in wb.sheetnames:
-            wb.remove(wb['Sheet'])
-        
-        # Trip Summary
-        ws = wb.create_sheet("Trip Summary")
-        ws['A1'] = f"Trip Plan: {state.get('from_city', 'N/A')} → {state.get('to_city', 'N/A')}"
-        ws['A1'].font = Font(size=16, bold=True)
-        ws.merge_cells('A1:D1')
-        
-        summary_data = [
-            ["From", state.get('from_city', 'N/A')],
-            ["To", state.get('to_city', 'N/A')],
-            ["Arrival Date", state.get('arrival_date', 'N/A')],
-            ["Duration", f"{state.get('num_days', 0)} days"],
-            ["Travelers", f"{state.get('num_adults', 0)} adults, {state.get('num_kids', 0)} children"]
-        ]
-        
-        for idx, row in enumerate(summary_data, start=3):
-            ws[f'A{idx}'] = row[0]
-            ws[f'B{idx}'] = row[1]
-            ws[f'A{idx}'].font = Font(bold=True)
-        
-        ws.column_dimensions['A'].width = 20
-        ws.column_dimensions['B'].width = 30
-        
-        # Weather Sheet
-        if state.get("weather_data") and "forecasts" in state["weather_data"]:
-            weather_ws = wb.create_sheet("Weather Forecast")
-            weather_df = pd.DataFrame(state["weather_data"]["forecasts"])
-            
-            # Add headers
-            weather_ws['A1'] = "5-Day Weather Forecast"
-            weather_ws['A1'].font = Font(size=14, bold=True)
-            weather_ws.merge_cells('A1:G1')
-            
-            # Add data
-            for r in dataframe_to_rows(weather_df, index=False, header=True):
-                weather_ws.append(r)
-            
-            # Format headers
-            for cell in weather_ws[3]:
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
-        
-        # Attractions Sheet
-        if state.get("attractions_data") and "items" in state["attractions_data"]:
-            attractions_ws = wb.create_sheet("Top Attractions")
-            # Clean attractions data - convert any lists to strings
-            attractions_items = clean_data_for_excel(state["attractions_data"]["items"])
-            attractions_df = pd.DataFrame(attractions_items)
-            
-            attractions_ws['A1'] = "Top Attractions"
-            attractions_ws['A1'].font = Font(size=14, bold=True)
-            attractions_ws.merge_cells('A1:H1')
-            
-            for r in dataframe_to_rows(attractions_df, index=False, header=True):
-                attractions_ws.append(r)
-            
-            for cell in attractions_ws[3]:
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
-        
-        # Hotels Sheet
-        if state.get("hotel_data") and "items" in state["hotel_data"]:
-            hotels_ws = wb.create_sheet("Hotel Recommendations")
-            # Clean hotel data - convert any lists (like amenities) to strings
-            hotel_items = clean_data_for_excel(state["hotel_data"]["items"])
-            hotels_df = pd.DataFrame(hotel_items)
-            
-            hotels_ws['A1'] = "Hotel Recommendations"
-            hotels_ws['A1'].font = Font(size=14, bold=True)
-            hotels_ws.merge_cells('A1:H1')
-            
-            for r in dataframe_to_rows(hotels_df, index=False, header=True):
-                hotels_ws.append(r)
-            
-            for cell in hotels_ws[3]:
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
-        
-        # Expenses Sheet
-        if state.get("expenses_data") and "items" in state["expenses_data"]:
-            expenses_ws = wb.create_sheet("Trip Expenses")
-            # Clean expenses data - convert any lists to strings
-            expense_items = clean_data_for_excel(state["expenses_data"]["items"])
-            expenses_df = pd.DataFrame(expense_items)
-            
-            expenses_ws['A1'] = "Trip Expenses Breakdown"
-            expenses_ws['A1'].font = Font(size=14, bold=True)
-            expenses_ws.merge_cells('A1:D1')
-            
-            for r in dataframe_to_rows(expenses_df, index=False, header=True):
-                expenses_ws.append(r)
-            
-            for cell in expenses_ws[3]:
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
-            
-            # Highlight total row
-            total_row = len(expenses_df) + 3
-            for cell in expenses_ws[total_row]:
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
-        
-        # Itinerary Sheet
-        if state.get("itinerary"):
-            itinerary_ws = wb.create_sheet("Detailed Itinerary")
-            itinerary_ws['A1'] = "Detailed Day-by-Day Itinerary"
-            itinerary_ws['A1'].font = Font(size=14, bold=True)
-            
-            # Split itinerary into lines and add to sheet
-            lines = state["itinerary"].split('\n')
-            for idx, line in enumerate(lines, start=3):
-                itinerary_ws[f'A{idx}'] = line
-            
-            itinerary_ws.column_dimensions['A'].width = 100
-        
-        wb.save(filename)
-        return filename
-        
+        buffer = io.BytesIO()
+        write_workbook(state, buffer)
+        return buffer.getvalue()
     except Exception as e:
         # Log the error and re-raise with more context
         error_msg = f"Error exporting to Excel: {str(e)}"
-        raise ValueError(error_msg) from e
\ No newline at end of file
+        raise ValueError(error_msg) from e
+
+def export_to_excel(state, filename: str):
+    """Export trip plan to Excel"""
+    content = export_to_excel_bytes(state)
+    with open(filename, "wb") as f:
+        f.write(content)
+    return filename
+
+class ExportCache:
+    """LRU cache of finished workbooks keyed by trip id and state version.
+
+    A trip keeps at most one cached artifact; a new version replaces it.
+    The cache is bounded by the total size of the stored workbooks.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, trip_id, version):
+        """Return cached workbook bytes for this trip version, or None."""
+        with self._lock:
+            entry = self._entries.get(trip_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(trip_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, trip_id, version, content):
+        """Store workbook bytes, evicting least recently used workbooks past the size bound."""
+        with self._lock:
+            previous = self._entries.pop(trip_id, None)
+            if previous is not None:
+                self._size -= len(previous[1])
+            if len(content) > self.max_bytes:
+                return
+            self._entries[trip_id] = (version, content)
+            self._size += len(content)
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get_or_build(self, trip_id, version, state):
+        """Return the workbook for a trip version, building and caching it on a miss."""
+        content = self.get(trip_id, version)
+        if content is None:
+            content = export_to_excel_bytes(state)
+            self.put(trip_id, version, content)
+        return content
+
+def iter_chunks(content: bytes, chunk_size: int = 64 * 1024):
+    """Yield ``content`` in fixed-size chunks for a streaming response."""
+    for start in range(0, len(content), chunk_size):
+        yield content[start:start + chunk_size]
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable write target that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        """Return and forget the bytes written so far."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def iter_workbook_zip(trips, build_workbook):
+    """Stream a ZIP archive holding one workbook per trip.
+
+    ``trips`` yields ``(trip_id, record)`` pairs and ``build_workbook`` turns
+    one into xlsx bytes. Only one workbook is held in memory at a time.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for trip_id, record in trips:
+            archive.writestr(f"trip_plan_{trip_id}.xlsx", build_workbook(trip_id, record))
+            yield sink.drain()
+    yield sink.drain()
+
+# Columns of each CSV in the bulk CSV export; every row starts with trip_id
+CSV_SECTIONS = {
+    "trips.csv": (None, [
+        "from_city", "to_city", "arrival_date", "num_days", "arrival_time",
+        "num_adults", "num_kids", "currency_info", "total_expenses", "expenses_currency", "itinerary"
+    ]),
+    "weather.csv": (("weather_data", "forecasts"), [
+        "date", "day", "temperature", "feels_like", "condition", "humidity", "wind_speed"
+    ]),
+    "attractions.csv": (("attractions_data", "items"), [
+        "name", "description", "category", "ticket_price", "currency", "duration", "rating"
+    ]),
+    "hotels.csv": (("hotel_data", "items"), [
+        "name", "star_rating", "price_per_night", "currency", "guest_rating", "amenities", "location", "total_price"
+    ]),
+    "nearby_places.csv": (("nearby_places_data", "items"), [
+        "name", "distance_km", "transport", "famous_for", "recommended_duration", "estimated_cost"
+    ]),
+    "expenses.csv": (("expenses_data", "items"), [
+        "category", "description", "amount", "currency"
+    ])
+}
+
+def _section_rows(record, source):
+    """Rows one trip contributes to a CSV section."""
+    if source is None:
+        expenses = record.get("expenses_data") or {}
+        return [dict(record, total_expenses=expenses.get("total"), expenses_currency=expenses.get("currency"))]
+    field, key = source
+    return clean_data_for_excel((record.get(field) or {}).get(key, []))
+
+def iter_csv_zip(load_trips):
+    """Stream a ZIP archive of CSV files with one block of rows per trip.
+
+    ``load_trips`` is called once per CSV file and must return a fresh
+    iterable of ``(trip_id, record)`` pairs, so no file is built in memory.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for filename, (source, columns) in CSV_SECTIONS.items():
+            with archive.open(filename, mode="w") as raw:
+                text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+                writer = csv.DictWriter(text, fieldnames=["trip_id"] + columns, extrasaction="ignore")
+                writer.writeheader()
+                for trip_id, record in load_trips():
+                    for row in _section_rows(record, source):
+                        writer.writerow(dict(row, trip_id=trip_id))
+                    text.flush()
+                    yield sink.drain()
+                text.flush()
+                text.detach()
+            yield sink.drain()
+    yield sink.drain()
+
+def iter_consolidated_workbook(load_trips, chunk_size=64 * 1024):
+    """Stream one workbook with a sheet per section and a row block per trip.
+
+    ``load_trips`` is called once per sheet, like in ``iter_csv_zip``. The
+    workbook is written in write-only mode to a spooled temporary file, so
+    memory stays bounded however many trips are exported.
+    """
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    for filename, (source, columns) in CSV_SECTIONS.items():
+        ws = wb.create_sheet(filename[:-len(".csv")].replace("_", " ").title())
+        header = ["trip_id"] + columns
+        ws.append(_styled_row(ws, header, bold=True, fill=HEADER_COLOR))
+        for trip_id, record in load_trips():
+            for row in _section_rows(record, source):
+                row = dict(row, trip_id=trip_id)
+                ws.append([row.get(column) for column in header])
+
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as spool:
+        wb.save(spool)
+        spool.seek(0)
+        while True:
+            chunk = spool.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
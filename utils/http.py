@@ -0,0 +1,81 @@
+"""Shared HTTP clients with keep-alive connection pools."""
+
+import threading
+import time
+from urllib.parse import urlsplit
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import settings
+from utils.metrics import record_upstream
+
+_session = None
+_session_lock = threading.Lock()
+_async_client = None
+
+def _record_response(response, *args, **kwargs):
+    """requests response hook: record the upstream status code and latency."""
+    record_upstream(urlsplit(response.url).hostname, response.status_code, response.elapsed.total_seconds())
+
+async def _mark_request(request):
+    """httpx request hook: note when the request was sent."""
+    request.extensions["sent_at"] = time.perf_counter()
+
+async def _record_async_response(response):
+    """httpx response hook: record the upstream status code and time to headers."""
+    request = response.request
+    sent_at = request.extensions.get("sent_at")
+    record_upstream(request.url.host, response.status_code, time.perf_counter() - sent_at if sent_at else 0.0)
+
+def get_session():
+    """Return the process-wide requests session used by sync tool paths."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=settings.HTTP_MAX_KEEPALIVE,
+                    pool_maxsize=settings.HTTP_MAX_CONNECTIONS
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                if settings.METRICS_ENABLED:
+                    session.hooks["response"].append(_record_response)
+                _session = session
+    return _session
+
+def _create_async_client():
+    """Build an httpx client sized from the HTTP pool settings."""
+    event_hooks = {"request": [_mark_request], "response": [_record_async_response]} if settings.METRICS_ENABLED else None
+    return httpx.AsyncClient(
+        timeout=settings.HTTP_TIMEOUT,
+        event_hooks=event_hooks,
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE
+        )
+    )
+
+def get_async_client():
+    """Return the shared async client, creating it if startup has not run."""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = _create_async_client()
+    return _async_client
+
+async def startup():
+    """Open the shared connection pools (FastAPI startup hook)."""
+    get_async_client()
+    get_session()
+
+async def shutdown():
+    """Close the shared connection pools (FastAPI shutdown hook)."""
+    global _async_client, _session
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    if _session is not None:
+        _session.close()
+        _session = None
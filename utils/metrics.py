@@ -0,0 +1,254 @@
+"""Low-overhead Prometheus-style metrics.
+
+Counters and histograms keep one small record per label set and update it
+under a lock, so recording is a dict lookup and a few additions. Nothing is
+formatted until ``/metrics`` is scraped, when ``registry.render()`` writes
+the Prometheus text exposition format. Caches and the single-flight layer
+already count their own hits; they are read at scrape time by collectors.
+"""
+
+import bisect
+import functools
+import inspect
+import threading
+import time
+
+from config.settings import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+def _format_sample(name, labels, value) -> str:
+    if not labels:
+        return f"{name} {_format_number(value)}"
+    pairs = ",".join(f'{key}="{_escape(val)}"' for key, val in labels)
+    return f"{name}{{{pairs}}} {_format_number(value)}"
+
+class Counter:
+    """Monotonic counter with optional labels, e.g. ``calls.inc("get_weather_info", "ok")``."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield self.name, list(zip(self.labelnames, labels)), value
+
+class Histogram:
+    """Latency histogram with fixed buckets, e.g. ``duration.observe(0.12, "agent")``."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                # Per-bucket counts (last one is +Inf), sum, count
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = sorted((labels, (list(counts), total, count)) for labels, (counts, total, count) in self._values.items())
+        for labels, (counts, total, count) in items:
+            base = list(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", base + [("le", _format_number(bound))], cumulative
+            yield f"{self.name}_sum", base, total
+            yield f"{self.name}_count", base, count
+
+class MetricsRegistry:
+    """Metrics owned by the app plus collectors that report other components' counters."""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collect):
+        """Add a scrape-time source.
+
+        ``collect()`` returns ``(name, kind, documentation, samples)`` tuples,
+        where ``samples`` is a list of ``(labels dict, value)``.
+        """
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(_format_sample(*sample) for sample in metric.samples())
+        for collect in self._collectors:
+            for name, kind, documentation, samples in collect():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(_format_sample(name, list(labels.items()), value) for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+node_duration = registry.histogram(
+    "trip_planner_node_duration_seconds", "Time spent in each graph node", ("node",))
+tool_duration = registry.histogram(
+    "trip_planner_tool_duration_seconds", "Tool call latency, including time waiting on a coalesced call", ("tool",))
+tool_calls = registry.counter(
+    "trip_planner_tool_calls_total", "Tool calls by outcome (ok or error)", ("tool", "outcome"))
+llm_duration = registry.histogram(
+    "trip_planner_llm_duration_seconds", "LLM request latency", ("model",))
+llm_calls = registry.counter(
+    "trip_planner_llm_calls_total", "LLM requests by outcome (ok or error)", ("model", "outcome"))
+llm_tokens = registry.counter(
+    "trip_planner_llm_tokens_total", "LLM tokens by kind (prompt or completion)", ("model", "kind"))
+llm_route_events = registry.counter(
+    "trip_planner_llm_route_events_total", "Routed LLM attempts by model and event (ok, error, timeout, hedged, fallback)", ("model", "event"))
+llm_queue_wait = registry.histogram(
+    "trip_planner_llm_queue_wait_seconds", "Time LLM calls wait for the rate limiter, by priority", ("priority",))
+llm_throttled = registry.counter(
+    "trip_planner_llm_throttled_total", "LLM calls rejected with 429, by whether they were retried", ("outcome",))
+structured_outputs = registry.counter(
+    "trip_planner_structured_outputs_total", "LLM tool replies by validation result (valid, repaired or failed)", ("tool", "result"))
+upstream_duration = registry.histogram(
+    "trip_planner_upstream_duration_seconds", "Upstream HTTP time to response headers", ("host",))
+upstream_responses = registry.counter(
+    "trip_planner_upstream_responses_total", "Upstream HTTP responses by status code", ("host", "status"))
+export_duration = registry.histogram(
+    "trip_planner_export_duration_seconds", "Time to build an export", ("format",))
+
+def _is_error(result) -> bool:
+    """Whether a tool's JSON string result reports an error."""
+    return isinstance(result, str) and result.startswith(('{"error"', '[{"error"'))
+
+def timed(histogram, *labels):
+    """Decorator recording each call's duration (sync or async) in ``histogram``."""
+    def decorate(func):
+        if not settings.METRICS_ENABLED:
+            return func
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - started, *labels)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, *labels)
+        return wrapper
+    return decorate
+
+def instrument_tool(name, func):
+    """Wrap a tool function (sync or async) to record its latency and outcome."""
+    if not settings.METRICS_ENABLED:
+        return func
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await func(*args, **kwargs)
+                outcome = "error" if _is_error(result) else "ok"
+                return result
+            finally:
+                tool_duration.observe(time.perf_counter() - started, name)
+                tool_calls.inc(name, outcome)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = func(*args, **kwargs)
+            outcome = "error" if _is_error(result) else "ok"
+            return result
+        finally:
+            tool_duration.observe(time.perf_counter() - started, name)
+            tool_calls.inc(name, outcome)
+    return wrapper
+
+def timed_iter(histogram, iterable, *labels):
+    """Yield from ``iterable``, recording the time until it is exhausted or closed."""
+    started = time.perf_counter()
+    try:
+        yield from iterable
+    finally:
+        histogram.observe(time.perf_counter() - started, *labels)
+
+def record_upstream(host, status, seconds):
+    """Record one upstream HTTP response."""
+    if settings.METRICS_ENABLED:
+        upstream_duration.observe(seconds, host)
+        upstream_responses.inc(host, str(status))
+
+def _cache_families():
+    from utils.cache import tool_cache
+    from utils.singleflight import tool_flights
+
+    lookups, ratios, flights = [], [], []
+    for namespace, counts in tool_cache.stats()["namespaces"].items():
+        for result in ("memory_hits", "disk_hits", "misses"):
+            lookups.append(({"namespace": namespace, "result": result}, counts[result]))
+        ratios.append(({"namespace": namespace}, counts["hit_rate"]))
+    for namespace, counts in tool_flights.stats()["namespaces"].items():
+        flights.append(({"tool": namespace, "result": "executed"}, counts["calls"]))
+        flights.append(({"tool": namespace, "result": "coalesced"}, counts["coalesced"]))
+    return [
+        ("trip_planner_cache_lookups_total", "counter", "Tool result cache lookups by result", lookups),
+        ("trip_planner_cache_hit_ratio", "gauge", "Tool result cache hit ratio since startup", ratios),
+        ("trip_planner_tool_flights_total", "counter", "Tool calls executed or coalesced onto an in-flight call", flights)
+    ]
+
+registry.register_collector(_cache_families)
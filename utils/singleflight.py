@@ -0,0 +1,110 @@
+"""Single-flight coalescing of concurrent identical calls."""
+
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+import threading
+from collections import defaultdict
+
+from utils.cache import cache_key
+
+class SingleFlight:
+    """Runs at most one call per key at a time and shares its result with concurrent callers.
+
+    The first caller for a key (the leader) computes the result; callers that
+    arrive while it is in flight wait for that same result instead of making
+    their own call. Once the call finishes the key is released, so this only
+    coalesces overlapping calls and never serves stale results.
+
+    In-flight calls are tracked as ``concurrent.futures.Future`` objects, so
+    sync callers in worker threads and async callers on the event loop can
+    wait on each other. A sync caller must not run on the event loop thread
+    while an async leader for the same key is in flight there.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {"calls": 0, "coalesced": 0})
+
+    def _join(self, namespace, key):
+        """Return ``(future, is_leader)`` for a key, registering a new call if none is in flight."""
+        full_key = f"{namespace}:{key}"
+        with self._lock:
+            future = self._calls.get(full_key)
+            if future is not None:
+                self._stats[namespace]["coalesced"] += 1
+                return future, False
+            future = self._calls[full_key] = concurrent.futures.Future()
+            self._stats[namespace]["calls"] += 1
+            return future, True
+
+    def _release(self, namespace, key):
+        """Forget a finished call so the next caller starts a fresh one."""
+        with self._lock:
+            self._calls.pop(f"{namespace}:{key}", None)
+
+    def do(self, namespace, key, func):
+        """Return ``func()``, sharing the result with concurrent callers of the same key."""
+        future, leader = self._join(namespace, key)
+        if leader:
+            try:
+                future.set_result(func())
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                self._release(namespace, key)
+        return future.result()
+
+    async def ado(self, namespace, key, coro_func):
+        """Async variant of ``do``; ``coro_func`` returns the awaitable to run."""
+        future, leader = self._join(namespace, key)
+        if leader:
+            # Run as its own task so a cancelled leader does not fail its followers
+            task = asyncio.ensure_future(coro_func())
+            task.add_done_callback(functools.partial(self._settle, namespace, key, future))
+            return await asyncio.shield(task)
+        return await asyncio.wrap_future(future)
+
+    def _settle(self, namespace, key, future, task):
+        """Copy a finished leader task's outcome into the shared future."""
+        self._release(namespace, key)
+        if task.cancelled():
+            future.set_exception(asyncio.CancelledError())
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    def wrap(self, namespace, func):
+        """Wrap a sync or async function so concurrent calls with equal arguments coalesce."""
+        signature = inspect.signature(func)
+
+        def key_for(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return cache_key(**bound.arguments)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await self.ado(namespace, key_for(args, kwargs), lambda: func(*args, **kwargs))
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return self.do(namespace, key_for(args, kwargs), lambda: func(*args, **kwargs))
+        return wrapper
+
+    def stats(self):
+        """Return leader call and coalesced call counts per namespace."""
+        with self._lock:
+            return {
+                "namespaces": {namespace: dict(counts) for namespace, counts in self._stats.items()},
+                "in_flight": len(self._calls),
+                "coalesced": sum(counts["coalesced"] for counts in self._stats.values())
+            }
+
+# Shared single-flight table for tool calls
+tool_flights = SingleFlight()